@@ -2,6 +2,8 @@
 美股期权卖方推荐工具配置文件
 Configuration for US Options Selling Recommendation Tool
 """
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Tuple
 
 # API配置
 API_CONFIG = {
@@ -11,49 +13,84 @@ API_CONFIG = {
 }
 
 # 期权筛选参数
-SCREENING_CONFIG = {
-    "min_days_to_expiry": 7,       # 最少到期天数
-    "max_days_to_expiry": 60,      # 最多到期天数
-    "min_open_interest": 100,      # 最少持仓量
-    "min_volume": 50,              # 最少成交量
-    "min_delta": 0.1,              # 最小Delta值
-    "max_delta": 0.5,              # 最大Delta值
-    "min_iv_rank": 20,             # 最小隐含波动率排名
-    "target_dte_range": [14, 45],  # 目标到期时间范围
-}
+@dataclass(frozen=True, slots=True)
+class ScreeningConfig:
+    """期权筛选参数（只读，热路径按属性访问）"""
+    min_days_to_expiry: int = 7           # 最少到期天数
+    max_days_to_expiry: int = 60          # 最多到期天数
+    min_open_interest: int = 100          # 最少持仓量
+    min_volume: int = 50                  # 最少成交量
+    min_delta: float = 0.1                # 最小Delta值
+    max_delta: float = 0.5                # 最大Delta值
+    min_iv_rank: float = 20               # 最小隐含波动率排名
+    target_dte_range: Tuple[int, int] = (14, 45)  # 目标到期时间范围
+
 
 # 风险管理参数
-RISK_CONFIG = {
-    "max_portfolio_risk": 0.05,    # 最大组合风险（占总资产比例）
-    "max_single_position": 0.02,   # 单个头寸最大风险
-    "margin_buffer": 1.2,          # 保证金缓冲倍数
-    "stop_loss_pct": 0.5,          # 止损百分比（收到权利金的倍数）
-}
+@dataclass(frozen=True, slots=True)
+class RiskConfig:
+    """风险管理参数"""
+    max_portfolio_risk: float = 0.05      # 最大组合风险（占总资产比例）
+    max_single_position: float = 0.02     # 单个头寸最大风险
+    margin_buffer: float = 1.2            # 保证金缓冲倍数
+    stop_loss_pct: float = 0.5            # 止损百分比（收到权利金的倍数）
+
 
 # 策略参数
-STRATEGY_CONFIG = {
-    "covered_call": {
-        "enabled": True,
-        "min_stock_price": 10,
-        "max_stock_price": 500,
-        "target_delta": 0.3,
-    },
-    "cash_secured_put": {
-        "enabled": True,
-        "min_stock_price": 10,
-        "max_stock_price": 500,
-        "target_delta": -0.3,
-    },
-    "iron_condor": {
-        "enabled": True,
-        "wing_width": 5,
-        "target_prob_profit": 0.7,
-    },
-    "strangle": {
-        "enabled": True,
-        "target_prob_profit": 0.6,
-    }
-}
+@dataclass(frozen=True, slots=True)
+class CoveredCallCfg:
+    """备兑看涨参数"""
+    enabled: bool = True
+    min_stock_price: float = 10
+    max_stock_price: float = 500
+    target_delta: float = 0.3
+
+
+@dataclass(frozen=True, slots=True)
+class CSPCfg:
+    """现金担保看跌参数"""
+    enabled: bool = True
+    min_stock_price: float = 10
+    max_stock_price: float = 500
+    target_delta: float = -0.3
+
+
+@dataclass(frozen=True, slots=True)
+class IronCondorCfg:
+    """铁鹰参数"""
+    enabled: bool = True
+    wing_width: float = 5
+    target_prob_profit: float = 0.7
+
+
+@dataclass(frozen=True, slots=True)
+class StrangleCfg:
+    """宽跨式参数"""
+    enabled: bool = True
+    target_prob_profit: float = 0.6
+
+
+@dataclass(frozen=True, slots=True)
+class StrategyConfig:
+    """各策略参数集合"""
+    covered_call: CoveredCallCfg = field(default_factory=CoveredCallCfg)
+    cash_secured_put: CSPCfg = field(default_factory=CSPCfg)
+    iron_condor: IronCondorCfg = field(default_factory=IronCondorCfg)
+    strangle: StrangleCfg = field(default_factory=StrangleCfg)
+
+
+# 模块加载时实例化一次
+SCREENING = ScreeningConfig()
+RISK = RiskConfig()
+STRATEGY = StrategyConfig()
+
+# 兼容旧的字典形式访问
+SCREENING_CONFIG = asdict(SCREENING)
+RISK_CONFIG = asdict(RISK)
+STRATEGY_CONFIG = asdict(STRATEGY)
+
+# 可视化配色常量
+COLOR_PROFIT, COLOR_LOSS, COLOR_NEUTRAL, COLOR_BG = "#00CC96", "#FF6692", "#FFA15A", "#2F3136"
 
 # 可视化配置
 VISUALIZATION_CONFIG = {
@@ -61,16 +98,16 @@ VISUALIZATION_CONFIG = {
     "default_height": 600,
     "default_width": 800,
     "color_scheme": {
-        "profit": "#00CC96",
-        "loss": "#FF6692",
-        "neutral": "#FFA15A",
-        "background": "#2F3136"
+        "profit": COLOR_PROFIT,
+        "loss": COLOR_LOSS,
+        "neutral": COLOR_NEUTRAL,
+        "background": COLOR_BG
     }
 }
 
-# 数据源配置
+# 数据源配置（代码列表使用元组，作为常量只构建一次且不可变）
 DATA_CONFIG = {
-    "popular_stocks": [
+    "popular_stocks": (
         # 科技股
         "AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX", "CRM", "ADBE",
         "ORCL", "INTC", "AMD", "QCOM", "AVGO", "PYPL", "SHOP", "SQ", "ZOOM", "ROKU",
@@ -82,12 +119,12 @@ DATA_CONFIG = {
         "JNJ", "PG", "KO", "PEP", "WMT", "HD", "MCD", "DIS", "IBM", "GE",
         
         # 医疗生物技术
-        "UNH", "PFE", "JNJ", "ABT", "TMO", "DHR", "BMY", "ABBV", "LLY", "MRK",
+        "UNH", "PFE", "ABT", "TMO", "DHR", "BMY", "ABBV", "LLY", "MRK",
         
         # 能源股
         "XOM", "CVX", "COP", "SLB", "HAL", "OXY", "MPC", "VLO", "PSX", "EOG"
-    ],
-    "etf_list": [
+    ),
+    "etf_list": (
         # 市场指数ETF
         "SPY", "QQQ", "IWM", "DIA", "VTI", "ITOT", "VEA", "VWO", "EEM", "EFA",
         
@@ -102,17 +139,17 @@ DATA_CONFIG = {
         
         # 波动率和反向ETF
         "VIX", "UVXY", "SVXY", "SQQQ", "TQQQ", "SPXU", "UPRO", "TZA", "TNA", "LABU"
-    ],
+    ),
     "stock_categories": {
-        "🏯 科技股": ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX"],
-        "🏦 金融股": ["JPM", "BAC", "WFC", "C", "GS", "MS", "V", "MA"],
-        "🏭 传统蓝筹": ["JNJ", "PG", "KO", "PEP", "WMT", "HD", "MCD", "DIS"],
-        "💊 医疗生物": ["UNH", "PFE", "ABT", "TMO", "DHR", "BMY", "ABBV", "LLY"],
-        "⚡ 能源股": ["XOM", "CVX", "COP", "SLB", "HAL", "OXY", "MPC", "VLO"],
-        "💹 市场指数": ["SPY", "QQQ", "IWM", "DIA", "VTI", "ITOT"],
-        "📊 行业ETF": ["XLF", "XLE", "XLK", "XLV", "XLI", "XLU", "XLP", "XLY"],
-        "🥇 大宗商品": ["GLD", "SLV", "USO", "UNG", "DBC", "PDBC"],
-        "📈 波动率": ["VIX", "UVXY", "SVXY", "SQQQ", "TQQQ", "SPXU"]
+        "🏯 科技股": ("AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX"),
+        "🏦 金融股": ("JPM", "BAC", "WFC", "C", "GS", "MS", "V", "MA"),
+        "🏭 传统蓝筹": ("JNJ", "PG", "KO", "PEP", "WMT", "HD", "MCD", "DIS"),
+        "💊 医疗生物": ("UNH", "PFE", "ABT", "TMO", "DHR", "BMY", "ABBV", "LLY"),
+        "⚡ 能源股": ("XOM", "CVX", "COP", "SLB", "HAL", "OXY", "MPC", "VLO"),
+        "💹 市场指数": ("SPY", "QQQ", "IWM", "DIA", "VTI", "ITOT"),
+        "📊 行业ETF": ("XLF", "XLE", "XLK", "XLV", "XLI", "XLU", "XLP", "XLY"),
+        "🥇 大宗商品": ("GLD", "SLV", "USO", "UNG", "DBC", "PDBC"),
+        "📈 波动率": ("VIX", "UVXY", "SVXY", "SQQQ", "TQQQ", "SPXU")
     }
 }
 
@@ -143,3 +180,17 @@ LOGGING_CONFIG = {
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     "file": "logs/options_tool.log"
 }
+
+# 热门列表顺序即精选股票池的优先级，保持原顺序，仅保证无重复
+assert len(DATA_CONFIG["popular_stocks"]) == len(set(DATA_CONFIG["popular_stocks"])), "popular_stocks 存在重复代码"
+assert len(DATA_CONFIG["etf_list"]) == len(set(DATA_CONFIG["etf_list"])), "etf_list 存在重复代码"
+
+# 已知代码集合（用于 O(1) 校验）
+KNOWN_SYMBOLS: frozenset = frozenset(DATA_CONFIG["popular_stocks"]) | frozenset(DATA_CONFIG["etf_list"])
+
+# 代码 -> 分类 反向索引（导入时构建一次）
+SYMBOL_TO_CATEGORY: Dict[str, str] = {
+    symbol: category
+    for category, symbols in DATA_CONFIG["stock_categories"].items()
+    for symbol in symbols
+}
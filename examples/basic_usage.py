@@ -2,18 +2,52 @@
 美股期权卖方推荐工具使用示例
 Usage examples for US Options Selling Recommendation Tool
 """
+import logging
 import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.data_collector.data_manager import DataManager
 from src.screening.screener import OptionsScreener
 from src.risk_management.risk_manager import RiskManager
 from src.visualization.charts import OptionsVisualizer
+from src.types import Contract, Greeks, Opportunity, Probabilities, Returns
 import pandas as pd
 
+# 期权数据格式示例（模块级单例，只构建一次）
+EXAMPLE_OPTION = Contract(
+    type='call',
+    strike=150.0,
+    lastPrice=2.50,
+    bid=2.45,
+    ask=2.55,
+    volume=150,
+    openInterest=500,
+    impliedVolatility=0.25,
+    inTheMoney=False,
+    contractSymbol='AAPL240119C00150000'
+)
+
+def _fmt_opp(index: int, opp: dict, kind: str) -> str:
+    """格式化单个机会的多行文本块"""
+    symbol, strike, expiry = opp['symbol'], opp['strike'], opp['expiry_date']
+    annualized_yield = opp['returns']['annualized_yield']
+    prob_profit = opp['probabilities']['prob_profit_short']
+    return (
+        f"\n{index}. {symbol} ${strike:.0f} {kind}\n"
+        f"   到期日: {expiry}\n"
+        f"   年化收益率: {annualized_yield:.1f}%\n"
+        f"   盈利概率: {prob_profit:.1f}%\n"
+        f"   得分: {opp.get('score', 0):.1f}\n"
+    )
+
 def example_basic_screening():
     """基础筛选示例"""
+    out = sys.stdout.write
     print("=== 基础期权筛选示例 ===")
     
     # 初始化组件
@@ -25,27 +59,20 @@ def example_basic_screening():
     print(f"正在分析股票: {', '.join(symbols)}")
     
     try:
-        # 筛选备兑看涨期权机会
-        covered_calls = screener.screen_covered_calls(symbols)
-        print(f"\n找到 {len(covered_calls)} 个备兑看涨期权机会:")
+        # 两类筛选都是网络 I/O 密集，并发执行
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            covered_calls_future = executor.submit(screener.screen_covered_calls, symbols)
+            cash_secured_puts_future = executor.submit(screener.screen_cash_secured_puts, symbols)
+            covered_calls = covered_calls_future.result()
+            cash_secured_puts = cash_secured_puts_future.result()
         
-        for i, opp in enumerate(covered_calls[:3], 1):
-            print(f"\n{i}. {opp['symbol']} ${opp['strike']:.0f} Call")
-            print(f"   到期日: {opp['expiry_date']}")
-            print(f"   年化收益率: {opp['returns']['annualized_yield']:.1f}%")
-            print(f"   盈利概率: {opp['probabilities']['prob_profit_short']:.1f}%")
-            print(f"   得分: {opp.get('score', 0):.1f}")
+        # 备兑看涨期权机会
+        out(f"\n找到 {len(covered_calls)} 个备兑看涨期权机会:\n")
+        out("".join(_fmt_opp(i, opp, "Call") for i, opp in enumerate(covered_calls[:3], 1)))
         
-        # 筛选现金担保看跌期权机会
-        cash_secured_puts = screener.screen_cash_secured_puts(symbols)
-        print(f"\n\n找到 {len(cash_secured_puts)} 个现金担保看跌期权机会:")
-        
-        for i, opp in enumerate(cash_secured_puts[:3], 1):
-            print(f"\n{i}. {opp['symbol']} ${opp['strike']:.0f} Put")
-            print(f"   到期日: {opp['expiry_date']}")
-            print(f"   年化收益率: {opp['returns']['annualized_yield']:.1f}%")
-            print(f"   盈利概率: {opp['probabilities']['prob_profit_short']:.1f}%")
-            print(f"   得分: {opp.get('score', 0):.1f}")
+        # 现金担保看跌期权机会
+        out(f"\n\n找到 {len(cash_secured_puts)} 个现金担保看跌期权机会:\n")
+        out("".join(_fmt_opp(i, opp, "Put") for i, opp in enumerate(cash_secured_puts[:3], 1)))
         
     except Exception as e:
         print(f"筛选过程中出现错误: {e}")
@@ -56,52 +83,41 @@ def example_risk_analysis():
     print("\n\n=== 风险分析示例 ===")
     
     # 模拟一个期权机会数据
-    mock_opportunity = {
-        'symbol': 'AAPL',
-        'strategy_type': 'covered_call',
-        'stock_price': 150.0,
-        'strike': 155.0,
-        'expiry_date': '2024-01-19',
-        'days_to_expiry': 30,
-        'returns': {
-            'max_profit': 200.0,
-            'max_loss': 15000.0,
-            'annualized_yield': 15.0
-        },
-        'probabilities': {
-            'prob_profit_short': 65.0
-        },
-        'greeks': {
-            'delta': 0.3,
-            'gamma': 0.02,
-            'theta': -0.05,
-            'vega': 0.15
-        }
-    }
+    mock_opportunity = Opportunity(
+        symbol='AAPL',
+        strategy_type='covered_call',
+        stock_price=150.0,
+        strike=155.0,
+        expiry_date='2024-01-19',
+        days_to_expiry=30,
+        returns=Returns(max_profit=200.0, max_loss=15000.0, annualized_yield=15.0),
+        probabilities=Probabilities(prob_profit_short=65.0),
+        greeks=Greeks(delta=0.3, gamma=0.02, theta=-0.05, vega=0.15)
+    )
     
     # 初始化风险管理器
     risk_manager = RiskManager(initial_capital=100000)
     
     # 分析交易风险
-    risk_analysis = risk_manager.analyze_trade_risk(mock_opportunity, 100000)
-    
-    print("风险分析结果:")
-    print(f"建议: {risk_analysis['recommendation']}")
-    print(f"原因: {risk_analysis['reason']}")
-    print(f"风险等级: {risk_analysis.get('risk_level', '未知')}")
+    risk_analysis = risk_manager.analyze_trade_risk(mock_opportunity.to_dict(), 100000)
     
     risk_metrics = risk_analysis.get('risk_metrics', {})
-    print(f"\n风险指标:")
-    print(f"最大损失: ${risk_metrics.get('max_loss', 0):,.2f}")
-    print(f"最大收益: ${risk_metrics.get('max_profit', 0):,.2f}")
-    print(f"风险收益比: {risk_metrics.get('risk_reward_ratio', 0):.1f}")
-    print(f"资金风险比例: {risk_metrics.get('capital_at_risk_pct', 0):.1f}%")
-    
     sizing_info = risk_analysis.get('sizing_info', {})
-    print(f"\n头寸建议:")
-    print(f"推荐合约数: {sizing_info.get('recommended_size', 0)}")
-    print(f"保证金需求: ${sizing_info.get('margin_required', 0):,.2f}")
-    print(f"实际风险金额: ${sizing_info.get('actual_risk_amount', 0):,.2f}")
+    print(
+        "风险分析结果:\n"
+        f"建议: {risk_analysis['recommendation']}\n"
+        f"原因: {risk_analysis['reason']}\n"
+        f"风险等级: {risk_analysis.get('risk_level', '未知')}\n"
+        "\n风险指标:\n"
+        f"最大损失: ${risk_metrics.get('max_loss', 0):,.2f}\n"
+        f"最大收益: ${risk_metrics.get('max_profit', 0):,.2f}\n"
+        f"风险收益比: {risk_metrics.get('risk_reward_ratio', 0):.1f}\n"
+        f"资金风险比例: {risk_metrics.get('capital_at_risk_pct', 0):.1f}%\n"
+        "\n头寸建议:\n"
+        f"推荐合约数: {sizing_info.get('recommended_size', 0)}\n"
+        f"保证金需求: ${sizing_info.get('margin_required', 0):,.2f}\n"
+        f"实际风险金额: ${sizing_info.get('actual_risk_amount', 0):,.2f}"
+    )
 
 def example_market_analysis():
     """市场分析示例"""
@@ -114,19 +130,21 @@ def example_market_analysis():
         # 获取市场环境
         market_context = data_manager.get_market_context()
         
-        print("当前市场环境:")
-        print(f"VIX水平: {market_context.get('vix', 0):.1f}")
-        print(f"市场状态: {market_context.get('market_regime', '未知')}")
-        print(f"卖方吸引力: {market_context.get('selling_attractiveness', '未知')}")
-        print(f"SPY动量: {market_context.get('spy_momentum', 0):.1f}%")
+        lines = [
+            "当前市场环境:",
+            f"VIX水平: {market_context.get('vix', 0):.1f}",
+            f"市场状态: {market_context.get('market_regime', '未知')}",
+            f"卖方吸引力: {market_context.get('selling_attractiveness', '未知')}",
+            f"SPY动量: {market_context.get('spy_momentum', 0):.1f}%",
+        ]
         
         # 验证股票代码
         symbols_to_test = ["AAPL", "MSFT", "INVALID"]
-        print(f"\n验证股票代码:")
-        
+        lines.append("\n验证股票代码:")
         for symbol in symbols_to_test:
             is_valid = data_manager.validate_symbol(symbol)
-            print(f"{symbol}: {'有效' if is_valid else '无效'}")
+            lines.append(f"{symbol}: {'有效' if is_valid else '无效'}")
+        print("\n".join(lines))
         
     except Exception as e:
         print(f"市场分析过程中出现错误: {e}")
@@ -142,15 +160,16 @@ def example_complete_workflow():
         screener = OptionsScreener()
         risk_manager = RiskManager(initial_capital=100000)
         
-        # 2. 获取市场环境
+        # 2/3. 并发获取市场环境与筛选交易机会
         print("2. 获取市场环境...")
-        market_context = data_manager.get_market_context()
-        print(f"   市场状态: {market_context.get('market_regime', '未知')}")
-        
-        # 3. 筛选交易机会
         print("3. 筛选交易机会...")
         symbols = ["AAPL", "MSFT"]
-        top_opportunities = screener.get_top_opportunities(symbols, max_results=5)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            market_future = executor.submit(data_manager.get_market_context)
+            top_future = executor.submit(screener.get_top_opportunities, symbols, max_results=5)
+            market_context = market_future.result()
+            top_opportunities = top_future.result()
+        print(f"   市场状态: {market_context.get('market_regime', '未知')}")
         print(f"   找到 {len(top_opportunities)} 个机会")
         
         # 4. 分析最佳机会
@@ -174,50 +193,23 @@ def example_data_formats():
     """数据格式示例"""
     print("\n\n=== 数据格式示例 ===")
     
-    # 期权数据格式示例
-    option_data_example = {
-        'type': 'call',
-        'strike': 150.0,
-        'lastPrice': 2.50,
-        'bid': 2.45,
-        'ask': 2.55,
-        'volume': 150,
-        'openInterest': 500,
-        'impliedVolatility': 0.25,
-        'inTheMoney': False,
-        'contractSymbol': 'AAPL240119C00150000'
-    }
-    
-    print("期权数据格式示例:")
-    for key, value in option_data_example.items():
-        print(f"  {key}: {value}")
+    print("期权数据格式示例:\n" + "\n".join(
+        f"  {key}: {value}" for key, value in asdict(EXAMPLE_OPTION).items()))
     
     # 策略分析结果格式示例
-    strategy_result_example = {
-        'symbol': 'AAPL',
-        'strategy_type': 'covered_call',
-        'stock_price': 150.0,
-        'strike': 155.0,
-        'returns': {
-            'max_profit': 200.0,
-            'max_loss': 15000.0,
-            'annualized_yield': 15.0
-        },
-        'probabilities': {
-            'prob_profit_short': 65.0,
-            'prob_expire_worthless': 70.0
-        },
-        'greeks': {
-            'delta': 0.3,
-            'theta': -0.05,
-            'vega': 0.15
-        },
-        'score': 85.5
-    }
-    
-    print("\n策略分析结果格式示例:")
-    for key, value in strategy_result_example.items():
-        print(f"  {key}: {value}")
+    strategy_result_example = Opportunity(
+        symbol='AAPL',
+        strategy_type='covered_call',
+        stock_price=150.0,
+        strike=155.0,
+        returns=Returns(max_profit=200.0, max_loss=15000.0, annualized_yield=15.0),
+        probabilities=Probabilities(prob_profit_short=65.0, prob_expire_worthless=70.0),
+        greeks=Greeks(delta=0.3, theta=-0.05, vega=0.15),
+        score=85.5
+    )
+    
+    print("\n策略分析结果格式示例:\n" + "\n".join(
+        f"  {key}: {value}" for key, value in strategy_result_example.to_dict().items()))
 
 def main():
     """运行所有示例"""
@@ -249,4 +241,5 @@ def main():
     print("streamlit run main.py")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
\ No newline at end of file
@@ -6,10 +6,25 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import hashlib
+import io
+import json
 import logging
 import sys
 import os
-from typing import Dict, List
+import time
+from collections import Counter
+from functools import partial
+from itertools import islice
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    _HAS_PYARROW = True
+except Exception:
+    _HAS_PYARROW = False
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -19,14 +34,16 @@ from src.data_collector.github_pools import GitHubStockPoolProvider
 from src.screening.screener import OptionsScreener
 from src.screening.criteria import PresetScreens, ScreeningUtils
 from src.risk_management.risk_manager import RiskManager
-from src.visualization.charts import OptionsVisualizer
-from src.utils.persistence import PortfolioStore
+from src.utils.persistence import AnalysisSnapshotStore, PortfolioStore
 from src.utils.formatters import format_currency, format_strategy_name
+from src.utils.fast_stats import hist_and_centers
 from src.option_analytics.roll_advisor import RollAdvisor
+from src.option_analytics.bs_kernel import greeks
+from src.utils.logging_setup import setup_logging
 from config.config import *
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+# 配置日志（后台线程写文件，不阻塞筛选）
+setup_logging(LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
 # 设置页面配置
@@ -37,32 +54,215 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 分析结果缓存时间（秒）
+ANALYSIS_CACHE_TTL = 300
+
+# 风险偏好对应的筛选参数调整（只读）
+_RISK_ADJUSTMENTS: Mapping[str, Mapping[str, float]] = MappingProxyType({
+    "保守": MappingProxyType({"max_delta": 0.25, "min_profit_probability": 70}),
+    "稳健": MappingProxyType({"max_delta": 0.3, "min_profit_probability": 60}),
+    "平衡": MappingProxyType({"max_delta": 0.4, "min_profit_probability": 50}),
+    "激进": MappingProxyType({"max_delta": 0.5, "min_profit_probability": 40}),
+    "高风险": MappingProxyType({"max_delta": 0.6, "min_profit_probability": 30}),
+})
+
+
+@st.cache_resource
+def _get_data_manager() -> DataManager:
+    """跨会话复用的数据管理器"""
+    return DataManager()
+
+
+@st.cache_resource
+def _get_risk_manager() -> RiskManager:
+    """跨会话复用的风险管理器"""
+    return RiskManager()
+
+
+@st.cache_resource
+def _get_visualizer() -> "OptionsVisualizer":
+    """跨会话复用的图表生成器（首次绘图时才导入 plotly）"""
+    from src.visualization.charts import OptionsVisualizer
+    return OptionsVisualizer()
+
+
+@st.cache_resource
+def _get_pool_provider() -> GitHubStockPoolProvider:
+    """跨会话复用的股票池提供器（保留已拉取的股票池缓存）"""
+    return GitHubStockPoolProvider(
+        GITHUB_POOL_CONFIG,
+        preferred_symbols=DATA_CONFIG.get("popular_stocks", [])
+    )
+
+
+@st.cache_resource
+def _get_portfolio_store() -> PortfolioStore:
+    """跨会话复用的持仓存储（建表只执行一次）"""
+    return PortfolioStore()
+
+
+@st.cache_resource
+def _get_snapshot_store() -> AnalysisSnapshotStore:
+    """跨会话复用的分析快照存储"""
+    return AnalysisSnapshotStore()
+
+
+@st.cache_resource
+def _get_roll_advisor() -> RollAdvisor:
+    """跨会话复用的滚仓顾问"""
+    return RollAdvisor()
+
+
+@st.cache_data(ttl=ANALYSIS_CACHE_TTL, show_spinner=False)
+def _cached_market_context() -> Dict:
+    """缓存市场环境数据"""
+    return _get_data_manager().get_market_context()
+
+
+@st.cache_data(ttl=ANALYSIS_CACHE_TTL, show_spinner=False)
+def _cached_complete_stock_data(symbol: str) -> Dict:
+    """缓存单个标的的完整数据"""
+    return _get_data_manager().get_complete_stock_data(symbol)
+
+
+@st.cache_data(ttl=ANALYSIS_CACHE_TTL, show_spinner=False)
+def _cached_top_opportunities(symbols: Tuple[str, ...], config: Dict, max_results: int) -> List[Dict]:
+    """按 (代码, 筛选配置) 缓存筛选结果；筛选器按配置新建，避免共享可变状态"""
+    screener = OptionsScreener(config=dict(config))
+    return screener.get_top_opportunities(list(symbols), max_results=max_results)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_payoff_figure(opp_id: str, analyzed_at: datetime, _opportunity: Dict):
+    """按 (机会标识, 分析时间) 缓存收益图；机会字典本身不参与哈希"""
+    return _get_visualizer().plot_payoff_diagram(_opportunity)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_time_decay_figure(opp_id: str, analyzed_at: datetime, _opportunity: Dict):
+    """按 (机会标识, 分析时间) 缓存时间衰减图；机会字典本身不参与哈希"""
+    return _get_visualizer().plot_time_decay_analysis(_opportunity)
+
+
+# 可自动重算 Greeks 的单腿策略 -> 期权类型
+_SINGLE_LEG_OPTION_TYPES = MappingProxyType({
+    'covered_call': 'call',
+    'short_call': 'call',
+    'cash_secured_put': 'put',
+    'short_put': 'put',
+})
+
+# 持仓展示缓存：以数据库修改时间为版本号，任何写入都会使其失效
+PORTFOLIO_CACHE_TTL = 60
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _cached_positions(status: str, db_version: int) -> List[Dict]:
+    """缓存持仓查询"""
+    return _get_portfolio_store().get_positions(status=status)
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _build_position_options(db_version: int) -> Dict[str, Dict]:
+    """构建当前持仓的下拉选项（标签 -> 持仓记录）"""
+    return {
+        f"#{p['id']} {p['symbol']} {format_strategy_name(p['strategy_type'])} ${p['strike']}": p
+        for p in _cached_positions("open", db_version)
+    }
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _build_closed_df(db_version: int) -> Tuple[pd.DataFrame, float]:
+    """构建已平仓记录表与总已实现盈亏"""
+    display_cols = ['id', 'symbol', 'strategy_type', 'strike',
+                    'expiry_date', 'contracts',
+                    'premium_per_contract', 'close_premium',
+                    'pnl', 'open_date', 'close_date']
+    # 盈亏所需字段均在展示列中，无需物化其余列
+    closed_df = pd.DataFrame(
+        _cached_positions("closed", db_version),
+        columns=[c for c in display_cols if c != 'pnl'])
+    # 计算每笔盈亏（直接在 float64 数组上运算，跳过 Series 索引对齐）
+    premium = closed_df['premium_per_contract'].to_numpy(dtype=float, na_value=np.nan)
+    close_premium = closed_df['close_premium'].to_numpy(dtype=float, na_value=0.0)
+    contracts = closed_df['contracts'].to_numpy(dtype=float, na_value=np.nan)
+    pnl = (premium - close_premium) * contracts * 100
+    closed_df['pnl'] = pnl
+    return closed_df[display_cols], float(np.nansum(pnl))
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _build_wheel_df(db_version: int) -> Tuple[pd.DataFrame, Dict[str, Dict]]:
+    """构建 Wheel 持仓表与状态流转下拉选项"""
+    wheel_positions = _get_portfolio_store().get_wheel_positions()
+    wheel_df = pd.DataFrame([{
+        'Symbol': p['symbol'],
+        '策略': format_strategy_name(p['strategy_type']),
+        '当前状态': PortfolioStore.WHEEL_STATES.get(p['wheel_state'], p['wheel_state']),
+        '开仓日期': p['open_date'],
+        '备注': p['notes']
+    } for p in wheel_positions])
+    return wheel_df, {f"#{p['id']} {p['symbol']}": p for p in wheel_positions}
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _cached_portfolio_summary(db_version: int) -> Dict:
+    """缓存组合汇总指标"""
+    return _get_portfolio_store().get_portfolio_summary()
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _build_greeks_overview(db_version: int) -> Tuple[Dict, pd.DataFrame]:
+    """构建组合 Greeks 汇总与分标的分布表"""
+    greeks_data = _get_portfolio_store().get_portfolio_greeks()
+    by_symbol = pd.DataFrame(greeks_data.get('by_symbol', {})).T
+    return greeks_data, by_symbol
+
+
+def _to_csv_bytes(frame: pd.DataFrame) -> bytes:
+    """将结果表序列化为 CSV 字节（优先 pyarrow，列类型混杂时回退 pandas）"""
+    buffer = io.BytesIO()
+    if _HAS_PYARROW:
+        try:
+            pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), buffer)
+            return buffer.getvalue()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            buffer = io.BytesIO()
+    frame.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
 class OptionsToolApp:
     """期权工具应用主类"""
     
     def __init__(self):
-        self.data_manager = DataManager()
-        self.github_pool_provider = GitHubStockPoolProvider(
-            GITHUB_POOL_CONFIG,
-            preferred_symbols=DATA_CONFIG.get("popular_stocks", [])
-        )
+        self.data_manager = _get_data_manager()
+        self.risk_manager = _get_risk_manager()
+        self.github_pool_provider = _get_pool_provider()
+        # 筛选器配置随侧边栏变化，保持每次运行独立实例
         self.screener = OptionsScreener()
-        self.risk_manager = RiskManager()
-        self.visualizer = OptionsVisualizer()
-        self.portfolio_store = PortfolioStore()
-        self.roll_advisor = RollAdvisor()
+        self.portfolio_store = _get_portfolio_store()
+        self.snapshot_store = _get_snapshot_store()
+        self.roll_advisor = _get_roll_advisor()
         
         # 初始化session state
         self._init_session_state()
     
+    @property
+    def visualizer(self) -> "OptionsVisualizer":
+        """图表生成器（延迟创建，未绘图的页面不加载 plotly）"""
+        return _get_visualizer()
+    
     def _init_session_state(self):
         """初始化session状态"""
         if 'analysis_results' not in st.session_state:
             st.session_state.analysis_results = None
         if 'filtered_opportunities' not in st.session_state:
             st.session_state.filtered_opportunities = []
+        if 'filtered_labels' not in st.session_state:
+            st.session_state.filtered_labels = []
         if 'favorite_opportunities' not in st.session_state:
-            st.session_state.favorite_opportunities = []
+            st.session_state.favorite_opportunities = frozenset()
         if 'selected_symbols' not in st.session_state:
             # 简单的默认股票列表
             st.session_state.selected_symbols = ["AAPL", "MSFT", "TSLA", "SPY", "QQQ"]
@@ -70,32 +270,52 @@ class OptionsToolApp:
             st.session_state.custom_symbols_input = "\n".join(st.session_state.selected_symbols)
         if 'portfolio_capital' not in st.session_state:
             st.session_state.portfolio_capital = 100000
+        if 'snapshot_restore_attempted' not in st.session_state:
+            # 每个会话只尝试一次快照恢复，避免每次重跑都哈希并探测磁盘
+            st.session_state.snapshot_restore_attempted = False
 
-    def _get_opportunity_id(self, opportunity: Dict) -> str:
-        """生成机会唯一标识"""
+    def _get_opportunity_key(self, opportunity: Dict) -> Tuple:
+        """生成机会唯一键（元组，供内部比较/哈希使用）"""
         strategy_type = opportunity.get('strategy_type', '')
         strikes = opportunity.get('strikes', {})
         if strategy_type == 'short_strangle':
-            strike_part = f"{strikes.get('put_strike', 0)}-{strikes.get('call_strike', 0)}"
+            strike_key = (strikes.get('put_strike', 0), strikes.get('call_strike', 0))
         elif strategy_type == 'bull_put_spread':
-            strike_part = f"{strikes.get('put_long', 0)}-{strikes.get('put_short', 0)}"
+            strike_key = (strikes.get('put_long', 0), strikes.get('put_short', 0))
         elif strategy_type == 'bear_call_spread':
-            strike_part = f"{strikes.get('call_short', 0)}-{strikes.get('call_long', 0)}"
+            strike_key = (strikes.get('call_short', 0), strikes.get('call_long', 0))
         elif strategy_type == 'iron_condor':
-            strike_part = (
-                f"{strikes.get('put_long', 0)}-{strikes.get('put_short', 0)}-"
-                f"{strikes.get('call_short', 0)}-{strikes.get('call_long', 0)}"
+            strike_key = (
+                strikes.get('put_long', 0), strikes.get('put_short', 0),
+                strikes.get('call_short', 0), strikes.get('call_long', 0),
             )
         else:
-            strike_part = f"{opportunity.get('strike', 0)}"
+            strike_key = (opportunity.get('strike', 0),)
+
+        return (
+            opportunity.get('symbol', ''),
+            strategy_type,
+            opportunity.get('expiry_date', ''),
+            *strike_key,
+        )
 
+    def _get_opportunity_id(self, opportunity: Dict) -> str:
+        """生成机会唯一标识（字符串，用于 session_state 与收藏表 ID 列）"""
+        symbol, strategy_type, expiry, *strike_key = self._get_opportunity_key(opportunity)
         return "|".join([
-            str(opportunity.get('symbol', '')),
+            str(symbol),
             str(strategy_type),
-            str(opportunity.get('expiry_date', '')),
-            strike_part,
+            str(expiry),
+            "-".join(map(str, strike_key)),
         ])
 
+    def _get_opportunity_id_cached(self, opportunity: Dict) -> str:
+        """获取机会唯一标识（首次计算后写入 _opp_id，后续重跑直接读取）"""
+        opp_id = opportunity.get('_opp_id')
+        if opp_id is None:
+            opp_id = opportunity['_opp_id'] = self._get_opportunity_id(opportunity)
+        return opp_id
+
     def _format_opportunity_strike(self, opportunity: Dict) -> str:
         """格式化不同策略的行权价展示"""
         def _fmt_price(value) -> str:
@@ -116,20 +336,101 @@ class OptionsToolApp:
         strike = opportunity.get('strike', 0)
         return _fmt_price(strike)
 
-    def _format_opportunity_label(self, opportunity: Dict) -> str:
-        """格式化机会标签文本"""
-        return (
-            f"{opportunity.get('symbol', '')} "
-            f"{self._format_opportunity_strike(opportunity)} "
-            f"{opportunity.get('strategy_type', '')}"
+    @staticmethod
+    def _frame_column(frame: pd.DataFrame, column: str, default=0) -> pd.Series:
+        """读取展开后的列，缺失时返回默认值列"""
+        if column in frame.columns:
+            return frame[column].fillna(default)
+        return pd.Series(default, index=frame.index)
+
+    @classmethod
+    def _format_price_column(cls, frame: pd.DataFrame, column: str) -> np.ndarray:
+        """向量化的价格格式化：数值显示为 $整数，其余原样转为文本"""
+        raw = cls._frame_column(frame, column, 0)
+        numeric = pd.to_numeric(raw, errors='coerce')
+        text = np.char.add('$', np.char.mod('%.0f', numeric.fillna(0).to_numpy(dtype=np.float64)))
+        return np.where(numeric.notna().to_numpy(), text, raw.astype(str).to_numpy(dtype=str))
+
+    def _strike_display_column(self, frame: pd.DataFrame) -> pd.Series:
+        """按策略批量生成行权价展示列（与 _format_opportunity_strike 口径一致）"""
+        strategy = self._frame_column(frame, 'strategy_type', '').to_numpy()
+        display = self._format_price_column(frame, 'strike')
+        paired_columns = {
+            'short_strangle': ('strikes.put_strike', 'strikes.call_strike'),
+            'bull_put_spread': ('strikes.put_short', 'strikes.put_long'),
+            'bear_call_spread': ('strikes.call_short', 'strikes.call_long'),
+        }
+        for strategy_type, (first, second) in paired_columns.items():
+            mask = strategy == strategy_type
+            if mask.any():
+                paired = np.char.add(
+                    np.char.add(self._format_price_column(frame, first), '/'),
+                    self._format_price_column(frame, second)
+                )
+                display = np.where(mask, paired, display)
+        return pd.Series(display, index=frame.index)
+
+    def _build_opportunities_frame(self, opportunities: List[Dict]) -> pd.DataFrame:
+        """将机会列表一次性展开为列式 DataFrame，并预计算筛选/展示用列"""
+        frame = pd.json_normalize(opportunities) if opportunities else pd.DataFrame()
+        if frame.empty:
+            return frame
+
+        returns_prob = self._frame_column(frame, 'returns.profit_probability', 0)
+        if 'probabilities.prob_profit_short' in frame.columns:
+            frame['_profit_prob'] = frame['probabilities.prob_profit_short'].fillna(returns_prob)
+        else:
+            frame['_profit_prob'] = returns_prob
+        frame['_yield'] = self._frame_column(frame, 'returns.annualized_yield', 0)
+        frame['_volume'] = self._frame_column(frame, 'option_details.liquidity.volume', 0)
+        frame['_score'] = self._frame_column(frame, 'score', 0)
+        frame['_dte'] = self._frame_column(frame, 'days_to_expiry', 0)
+        frame['_strike'] = self._strike_display_column(frame)
+        frame['_label'] = (
+            self._frame_column(frame, 'symbol', '').astype(str) + ' '
+            + frame['_strike'] + ' '
+            + self._frame_column(frame, 'strategy_type', '').astype(str)
         )
+        frame['_id'] = [self._get_opportunity_id_cached(opp) for opp in opportunities]
+        frame['_pos'] = np.arange(len(frame))
+        return frame
 
-    def _filter_and_sort_opportunities(self, opportunities: List[Dict]) -> List[Dict]:
-        """基于前端控件筛选和排序机会"""
-        if not opportunities:
-            return []
+    def _get_opportunities_frame(self) -> pd.DataFrame:
+        """获取当前分析结果的机会 DataFrame（兼容旧结果按需构建）"""
+        results = st.session_state.analysis_results
+        frame = results.get('opportunities_df')
+        # 旧结果/旧快照缺少派生列时重新构建
+        if frame is None or (not frame.empty and not {'_dte', '_id', '_strike'}.issubset(frame.columns)):
+            frame = self._build_opportunities_frame(results.get('opportunities', []))
+            results['opportunities_df'] = frame
+        return frame
 
-        strategy_options = sorted({opp.get('strategy_type', '') for opp in opportunities if opp.get('strategy_type', '')})
+    def _get_opportunity_labels(self) -> List[str]:
+        """获取全部机会的展示标签（每次分析只生成一次）"""
+        results = st.session_state.analysis_results
+        labels = results.get('opportunity_labels')
+        if labels is None:
+            labels = self._frame_column(self._get_opportunities_frame(), '_label', '').tolist()
+            results['opportunity_labels'] = labels
+        return labels
+
+    def _get_strategy_options(self) -> List[str]:
+        """获取当前分析结果中的策略类型选项（每次分析只计算一次）"""
+        results = st.session_state.analysis_results
+        options = results.get('strategy_options')
+        if options is None:
+            strategies = self._frame_column(self._get_opportunities_frame(), 'strategy_type', '')
+            options = sorted(s for s in strategies.unique() if s)
+            results['strategy_options'] = options
+        return options
+
+    def _filter_and_sort_opportunities(self, opportunities: List[Dict]) -> pd.DataFrame:
+        """基于前端控件筛选和排序机会，返回排序后的 DataFrame 视图（_pos 为原列表位置）"""
+        opps_df = self._get_opportunities_frame()
+        if not opportunities or opps_df.empty:
+            return opps_df
+
+        strategy_options = self._get_strategy_options()
 
         st.subheader("🎛️ 结果筛选与排序")
         col1, col2, col3 = st.columns(3)
@@ -152,55 +453,53 @@ class OptionsToolApp:
             )
             sort_desc = st.checkbox("降序排序", value=True, key="screen_sort_desc")
 
-        filtered = []
-        for opp in opportunities:
-            strategy_type = opp.get('strategy_type', '')
-            annualized_yield = opp.get('returns', {}).get('annualized_yield', 0)
-            profit_prob = opp.get('probabilities', {}).get('prob_profit_short', opp.get('returns', {}).get('profit_probability', 0))
-            volume = opp.get('option_details', {}).get('liquidity', {}).get('volume', 0)
+        # 筛选参数未变时直接复用上次结果（缓存挂在本次分析结果上，重新分析自动失效）
+        results = st.session_state.analysis_results
+        filter_key = (tuple(selected_strategies), min_prob, min_yield, min_volume, sort_by, sort_desc)
+        cached = results.get('filter_cache')
+        if cached is not None and cached[0] == filter_key:
+            filtered = cached[1]
+            st.caption(f"筛选后结果: {len(filtered)} / {len(opportunities)}")
+            return filtered
 
-            if selected_strategies and strategy_type not in selected_strategies:
-                continue
-            if annualized_yield < min_yield:
-                continue
-            if profit_prob < min_prob:
-                continue
-            if volume < min_volume:
-                continue
-            filtered.append(opp)
+        mask = (
+            (opps_df['_yield'] >= min_yield)
+            & (opps_df['_profit_prob'] >= min_prob)
+            & (opps_df['_volume'] >= min_volume)
+        )
+        if selected_strategies:
+            mask &= self._frame_column(opps_df, 'strategy_type', '').isin(selected_strategies)
 
-        sort_key_map = {
-            "综合评分": lambda x: x.get('score', 0),
-            "年化收益率": lambda x: x.get('returns', {}).get('annualized_yield', 0),
-            "盈利概率": lambda x: x.get('probabilities', {}).get('prob_profit_short', x.get('returns', {}).get('profit_probability', 0)),
-            "DTE": lambda x: x.get('days_to_expiry', 0),
+        sort_column_map = {
+            "综合评分": '_score',
+            "年化收益率": '_yield',
+            "盈利概率": '_profit_prob',
+            "DTE": '_dte',
         }
-
-        filtered.sort(key=sort_key_map[sort_by], reverse=sort_desc)
+        filtered = opps_df[mask].sort_values(
+            sort_column_map[sort_by], ascending=not sort_desc, kind='stable'
+        )
+        results['filter_cache'] = (filter_key, filtered)
         st.caption(f"筛选后结果: {len(filtered)} / {len(opportunities)}")
         return filtered
 
-    def _render_favorite_manager(self, opportunities: List[Dict]):
+    def _render_favorite_manager(self, opportunities_df: pd.DataFrame):
         """渲染收藏管理"""
-        if not opportunities:
+        if opportunities_df.empty:
             return
 
         st.subheader("⭐ 收藏候选")
-        favorite_ids = set(st.session_state.favorite_opportunities)
-        records = []
-        for opp in opportunities[:50]:
-            opp_id = self._get_opportunity_id(opp)
-            records.append({
-                "收藏": opp_id in favorite_ids,
-                "Symbol": opp.get('symbol', ''),
-                "Strategy": opp.get('strategy_type', ''),
-                "Strike": self._format_opportunity_strike(opp),
-                "Expiry": opp.get('expiry_date', ''),
-                "Score": round(opp.get('score', 0), 1),
-                "ID": opp_id,
-            })
-
-        favorite_df = pd.DataFrame(records)
+        favorite_ids = st.session_state.favorite_opportunities
+        top = opportunities_df.head(50)
+        favorite_df = pd.DataFrame({
+            "收藏": top['_id'].isin(favorite_ids).to_numpy(),
+            "Symbol": self._frame_column(top, 'symbol', '').to_numpy(),
+            "Strategy": self._frame_column(top, 'strategy_type', '').to_numpy(),
+            "Strike": top['_strike'].to_numpy(),
+            "Expiry": self._frame_column(top, 'expiry_date', '').to_numpy(),
+            "Score": np.round(top['_score'].to_numpy(dtype=float), 1),
+            "ID": top['_id'].to_numpy(),
+        })
         edited_df = st.data_editor(
             favorite_df,
             hide_index=True,
@@ -209,33 +508,40 @@ class OptionsToolApp:
             key="favorite_editor"
         )
 
-        selected_ids = edited_df.loc[edited_df["收藏"] == True, "ID"].tolist()
+        # 以 frozenset 保存，收藏/对比渲染时直接做成员判断
+        selected_ids = frozenset(edited_df.loc[edited_df["收藏"] == True, "ID"])
         st.session_state.favorite_opportunities = selected_ids
         st.caption(f"已收藏 {len(selected_ids)} 个机会，可在详细分析页做对比。")
 
     def _render_comparison_panel(self, opportunities: List[Dict]):
         """渲染收藏对比面板"""
-        favorite_ids = set(st.session_state.favorite_opportunities)
-        favorite_opps = [opp for opp in opportunities if self._get_opportunity_id(opp) in favorite_ids]
+        favorite_ids = st.session_state.favorite_opportunities
+        # 最多对比 4 个，找够即停止扫描
+        compared = list(islice(
+            (opp for opp in opportunities if self._get_opportunity_id_cached(opp) in favorite_ids),
+            4
+        ))
 
-        if len(favorite_opps) < 2:
+        if len(compared) < 2:
             st.info("收藏至少 2 个机会后，可在此查看并排对比。")
             return
 
         st.subheader("🧮 收藏机会对比")
-        compare_df = pd.DataFrame([
-            {
-                "Symbol": opp.get('symbol', ''),
-                "Strategy": opp.get('strategy_type', ''),
-                "DTE": opp.get('days_to_expiry', 0),
-                "AnnualizedYield(%)": round(opp.get('returns', {}).get('annualized_yield', 0), 2),
-                "ProfitProb(%)": round(opp.get('probabilities', {}).get('prob_profit_short', opp.get('returns', {}).get('profit_probability', 0)), 2),
-                "MaxProfit": round(opp.get('returns', {}).get('max_profit', 0), 2),
-                "MaxLoss": opp.get('returns', {}).get('max_loss', 0),
-                "Score": round(opp.get('score', 0), 2),
-            }
-            for opp in favorite_opps[:4]
-        ])
+        returns = [opp.get('returns', {}) for opp in compared]
+        profit_probs = [
+            opp.get('probabilities', {}).get('prob_profit_short', ret.get('profit_probability', 0))
+            for opp, ret in zip(compared, returns)
+        ]
+        compare_df = pd.DataFrame({
+            "Symbol": [opp.get('symbol', '') for opp in compared],
+            "Strategy": [opp.get('strategy_type', '') for opp in compared],
+            "DTE": [opp.get('days_to_expiry', 0) for opp in compared],
+            "AnnualizedYield(%)": np.round([ret.get('annualized_yield', 0) for ret in returns], 2),
+            "ProfitProb(%)": np.round(profit_probs, 2),
+            "MaxProfit": np.round([ret.get('max_profit', 0) for ret in returns], 2),
+            "MaxLoss": [ret.get('max_loss', 0) for ret in returns],
+            "Score": np.round([opp.get('score', 0) for opp in compared], 2),
+        })
         st.dataframe(compare_df, width='stretch')
     
     def run(self):
@@ -246,6 +552,12 @@ class OptionsToolApp:
         # 侧边栏配置
         self._render_sidebar()
         
+        # 新会话尝试恢复当日相同代码与配置的分析快照（每个会话仅一次）
+        if (st.session_state.analysis_results is None
+                and not st.session_state.snapshot_restore_attempted):
+            st.session_state.snapshot_restore_attempted = True
+            self._restore_analysis_snapshot()
+        
         # 主内容区域
         tab1, tab2, tab3, tab4, tab5 = st.tabs([
             "📊 市场概览", "🔍 机会筛选", "📈 详细分析", "⚠️ 风险管理", "📋 投资组合"
@@ -266,6 +578,20 @@ class OptionsToolApp:
         with tab5:
             self._render_portfolio_management()
     
+    def _snapshot_key(self, symbols: List[str]) -> str:
+        """快照键：保存与恢复都基于用户输入的代码列表（校验前），保证两侧一致"""
+        return AnalysisSnapshotStore.make_key(list(symbols), self.screener.config)
+
+    def _restore_analysis_snapshot(self):
+        """从磁盘快照恢复分析结果"""
+        key = self._snapshot_key(st.session_state.selected_symbols)
+        results = self.snapshot_store.load(key)
+        if results:
+            st.session_state.snapshot_key = key
+            st.session_state.analysis_results = results
+            st.session_state.filtered_opportunities = results.get('opportunities', [])
+            st.session_state.filtered_labels = self._get_opportunity_labels()
+    
     def _render_sidebar(self):
         """渲染侧边栏"""
         st.sidebar.header("⚙️ 设置")
@@ -290,23 +616,26 @@ class OptionsToolApp:
             "NASDAQ 100 精选（GitHub）": "nasdaq100",
             "S&P 500 + NASDAQ 100 精选（GitHub）": "combined",
         }
-        github_source_label = st.sidebar.selectbox(
-            "指数股票池来源",
-            options=list(source_options.keys()),
-            index=0,
-            help="数据来自 GitHub 公开项目 yfiua/index-constituents"
-        )
         min_pool_size = int(GITHUB_POOL_CONFIG.get("min_curated_size", 10))
         max_pool_size = int(GITHUB_POOL_CONFIG.get("max_curated_size", 100))
         default_pool_size = int(GITHUB_POOL_CONFIG.get("default_curated_size", 30))
-        curated_pool_size = st.sidebar.slider(
-            "精选股票数量",
-            min_value=min_pool_size,
-            max_value=max_pool_size,
-            value=min(max(default_pool_size, min_pool_size), max_pool_size),
-            step=5
-        )
-        if st.sidebar.button("⬇️ 从GitHub加载指数股票池", width='stretch'):
+        # 来源与数量放入表单，调整时不触发整页重跑，点击加载时一并提交
+        with st.sidebar.form("github_pool_form", border=False):
+            github_source_label = st.selectbox(
+                "指数股票池来源",
+                options=list(source_options.keys()),
+                index=0,
+                help="数据来自 GitHub 公开项目 yfiua/index-constituents"
+            )
+            curated_pool_size = st.slider(
+                "精选股票数量",
+                min_value=min_pool_size,
+                max_value=max_pool_size,
+                value=min(max(default_pool_size, min_pool_size), max_pool_size),
+                step=5
+            )
+            load_pool = st.form_submit_button("⬇️ 从GitHub加载指数股票池", width='stretch')
+        if load_pool:
             source_code = source_options[github_source_label]
             if source_code is None:
                 st.sidebar.info("当前为手动输入模式，无需加载。")
@@ -331,7 +660,7 @@ class OptionsToolApp:
                         else:
                             st.sidebar.warning("未获取到有效股票代码，请稍后重试。")
                     except Exception as e:
-                        logger.error(f"GitHub pool load failed: {e}")
+                        logger.error("GitHub pool load failed: %s", e)
                         st.sidebar.error(f"加载失败: {e}")
         
         # 自定义股票代码输入
@@ -347,12 +676,7 @@ class OptionsToolApp:
         if custom_symbols_input:
             raw_symbols = [symbol.strip().upper() for symbol in custom_symbols_input.split('\n') if symbol.strip()]
             # 去重并保持输入顺序
-            seen = set()
-            input_symbols = []
-            for symbol in raw_symbols:
-                if symbol not in seen:
-                    seen.add(symbol)
-                    input_symbols.append(symbol)
+            input_symbols = list(dict.fromkeys(raw_symbols))
             
             # 显示当前输入的股票
             if input_symbols:
@@ -379,29 +703,41 @@ class OptionsToolApp:
                 st.session_state.custom_symbols_input = ""
                 st.rerun()
         
-        # 筛选预设
-        st.sidebar.subheader("筛选策略")
-        screening_preset = st.sidebar.selectbox(
-            "选择筛选策略",
-            options=["自定义", "保守收入型", "激进收入型", "高概率型"],
-            index=0
-        )
-        
-        # 风险偏好
-        st.sidebar.subheader("风险偏好")
-        risk_tolerance = st.sidebar.select_slider(
-            "风险承受能力",
-            options=["保守", "稳健", "平衡", "激进", "高风险"],
-            value="平衡"
-        )
+        # 筛选预设与风险偏好：表单内调整不触发重跑，点击“应用设置”后生效
+        with st.sidebar.form("strategy_form", border=False):
+            st.subheader("筛选策略")
+            screening_preset = st.selectbox(
+                "选择筛选策略",
+                options=["自定义", "保守收入型", "激进收入型", "高概率型"],
+                index=0
+            )
+            
+            st.subheader("风险偏好")
+            risk_tolerance = st.select_slider(
+                "风险承受能力",
+                options=["保守", "稳健", "平衡", "激进", "高风险"],
+                value="平衡"
+            )
+            st.form_submit_button("✅ 应用设置", width='stretch')
         
-        # 更新筛选配置
+        # 更新筛选配置（使用最近一次提交的表单值）
         self._update_screening_config(screening_preset, risk_tolerance)
         
         # 分析按钮
         st.sidebar.markdown("---")
         if st.sidebar.button("🚀 开始分析", type="primary", width='stretch'):
             self._run_analysis()
+        if st.sidebar.button("🔄 强制刷新", width='stretch', help="清除行情与筛选缓存后重新分析"):
+            self._clear_analysis_caches()
+            self._run_analysis()
+    
+    def _clear_analysis_caches(self):
+        """清除分析相关缓存，下次分析重新拉取数据"""
+        _cached_market_context.clear()
+        _cached_complete_stock_data.clear()
+        _cached_top_opportunities.clear()
+        self.data_manager.clear_caches()
+        st.session_state.pop('last_run_key', None)
     
     def _update_screening_config(self, preset: str, risk_tolerance: str):
         """更新筛选配置"""
@@ -418,30 +754,40 @@ class OptionsToolApp:
             self.screener.config.update(config)
         
         # 根据风险偏好调整
-        risk_adjustments = {
-            "保守": {"max_delta": 0.25, "min_profit_probability": 70},
-            "稳健": {"max_delta": 0.3, "min_profit_probability": 60},
-            "平衡": {"max_delta": 0.4, "min_profit_probability": 50},
-            "激进": {"max_delta": 0.5, "min_profit_probability": 40},
-            "高风险": {"max_delta": 0.6, "min_profit_probability": 30}
-        }
-        
-        if risk_tolerance in risk_adjustments:
-            self.screener.config.update(risk_adjustments[risk_tolerance])
+        adjustment = _RISK_ADJUSTMENTS.get(risk_tolerance)
+        if adjustment:
+            self.screener.config.update(adjustment)
+    
+    def _analysis_run_key(self) -> bytes:
+        """当前分析输入（代码、筛选配置、缓存时间桶）的内容哈希"""
+        payload = json.dumps(
+            [
+                sorted(st.session_state.selected_symbols),
+                self.screener.config,
+                int(time.time() // ANALYSIS_CACHE_TTL),
+            ],
+            default=str,
+            sort_keys=True
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
     
     def _run_analysis(self):
         """运行分析"""
+        # 输入与上次分析一致时直接沿用结果
+        if (st.session_state.analysis_results
+                and st.session_state.get('last_run_key') == self._analysis_run_key()):
+            st.toast("输入未变化，沿用上次分析结果")
+            return
+        
         with st.spinner("正在分析期权机会..."):
             try:
                 # 统一校验代码，避免额外“验证并应用”步骤
                 raw_symbols = list(st.session_state.selected_symbols)
-                valid_symbols = []
-                invalid_symbols = []
-                for symbol in raw_symbols:
-                    if self.data_manager.validate_symbol(symbol):
-                        valid_symbols.append(symbol)
-                    else:
-                        invalid_symbols.append(symbol)
+                # 快照按校验前的输入保存，与新会话恢复时的查找键一致
+                st.session_state.snapshot_key = self._snapshot_key(raw_symbols)
+                validation = self.data_manager.validate_symbols_batch(raw_symbols)
+                valid_symbols = [s for s in raw_symbols if validation.get(s)]
+                invalid_symbols = [s for s in raw_symbols if not validation.get(s)]
 
                 if invalid_symbols:
                     display = ", ".join(invalid_symbols[:10])
@@ -458,29 +804,41 @@ class OptionsToolApp:
                     st.session_state.custom_symbols_input = "\n".join(valid_symbols)
 
                 # 获取市场环境
-                market_context = self.data_manager.get_market_context()
+                market_context = _cached_market_context()
                 
                 # 获取标的波动率快照（用于 IV Rank 分布图）
                 symbols_data = {}
                 for symbol in valid_symbols:
-                    stock_data = self.data_manager.get_complete_stock_data(symbol)
+                    stock_data = _cached_complete_stock_data(symbol)
                     if stock_data:
                         symbols_data[symbol] = {'stock_data': stock_data}
                 
-                # 筛选机会
-                opportunities = self.screener.get_top_opportunities(
-                    valid_symbols,
-                    max_results=20
+                # 筛选机会（相同代码与配置在缓存期内直接复用）
+                opportunities = _cached_top_opportunities(
+                    tuple(valid_symbols),
+                    self.screener.config,
+                    20
                 )
                 
-                # 存储结果
+                # 存储结果（预先写入机会标识，收藏/对比重跑时直接读取）
+                for opp in opportunities:
+                    self._get_opportunity_id_cached(opp)
+                opportunities_df = self._build_opportunities_frame(opportunities)
+                opportunity_labels = self._frame_column(opportunities_df, '_label', '').tolist()
                 st.session_state.analysis_results = {
                     'market_context': market_context,
                     'symbols_data': symbols_data,
                     'opportunities': opportunities,
+                    'opportunities_df': opportunities_df,
+                    'opportunity_labels': opportunity_labels,
                     'timestamp': datetime.now()
                 }
                 st.session_state.filtered_opportunities = opportunities
+                st.session_state.filtered_labels = opportunity_labels
+                self.snapshot_store.save(
+                    st.session_state.snapshot_key,
+                    st.session_state.analysis_results
+                )
                 
                 # 持久化分析历史
                 self.portfolio_store.save_analysis(
@@ -489,11 +847,12 @@ class OptionsToolApp:
                     market_context=market_context,
                 )
                 
+                st.session_state.last_run_key = self._analysis_run_key()
                 st.success(f"分析完成！找到 {len(opportunities)} 个潜在机会")
                 
             except Exception as e:
                 st.error(f"分析失败: {e}")
-                logger.error(f"Analysis failed: {e}")
+                logger.error("Analysis failed: %s", e)
     
     def _render_market_overview(self):
         """渲染市场概览"""
@@ -553,8 +912,10 @@ class OptionsToolApp:
         
         if st.session_state.analysis_results:
             opportunities = st.session_state.analysis_results['opportunities']
-            filtered_opportunities = self._filter_and_sort_opportunities(opportunities)
+            filtered_df = self._filter_and_sort_opportunities(opportunities)
+            filtered_opportunities = [opportunities[i] for i in filtered_df['_pos']] if not filtered_df.empty else []
             st.session_state.filtered_opportunities = filtered_opportunities
+            st.session_state.filtered_labels = filtered_df['_label'].tolist() if not filtered_df.empty else []
             
             if filtered_opportunities:
                 # 机会总览
@@ -570,11 +931,10 @@ class OptionsToolApp:
                         height=400
                     )
                     
-                    # 下载按钮
-                    csv = results_df.to_csv(index=False)
+                    # 下载按钮（点击时才序列化）
                     st.download_button(
                         label="📥 下载结果 (CSV)",
-                        data=csv,
+                        data=partial(_to_csv_bytes, results_df),
                         file_name=f"options_opportunities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                         mime="text/csv"
                     )
@@ -584,25 +944,23 @@ class OptionsToolApp:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    strategy_counts = pd.Series([opp.get('strategy_type', '') for opp in filtered_opportunities]).value_counts()
-                    st.bar_chart(strategy_counts)
+                    # 数据量很小，Counter 比 value_counts 的分组开销更低
+                    strategy_counts = Counter(self._frame_column(filtered_df, 'strategy_type', '').tolist())
+                    st.bar_chart(pd.Series(dict(strategy_counts.most_common()), name='count'))
                 
                 with col2:
                     # 收益率分布
-                    returns = [opp.get('returns', {}).get('annualized_yield', 0) for opp in filtered_opportunities]
-                    if returns:
-                        # 创建直方图数据
-                        import numpy as np
-                        hist_data, bin_edges = np.histogram(returns, bins=10)
-                        bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
-                        hist_df = pd.DataFrame({
-                            '收益率区间': [f"{edge:.1f}%" for edge in bin_centers],
-                            '数量': hist_data
-                        }).set_index('收益率区间')
+                    returns_arr = filtered_df['_yield'].to_numpy(dtype=np.float64, na_value=0.0)
+                    if len(returns_arr):
+                        hist_data, bin_centers = hist_and_centers(returns_arr, 10)
+                        hist_df = pd.DataFrame(
+                            {'数量': hist_data},
+                            index=pd.Index(np.char.add(np.char.mod('%.1f', bin_centers), '%'), name='收益率区间')
+                        )
                         st.bar_chart(hist_df)
                     st.caption("年化收益率分布")
 
-                self._render_favorite_manager(filtered_opportunities)
+                self._render_favorite_manager(filtered_df)
             
             else:
                 st.warning("未找到符合条件的期权机会，请调整筛选参数")
@@ -610,30 +968,34 @@ class OptionsToolApp:
         else:
             st.info("请先运行分析来获取期权机会")
     
+    @st.fragment
     def _render_detailed_analysis(self):
         """渲染详细分析"""
         st.header("📈 详细分析")
         
         if st.session_state.analysis_results:
-            opportunities = st.session_state.filtered_opportunities or st.session_state.analysis_results['opportunities']
+            if st.session_state.filtered_opportunities:
+                opportunities = st.session_state.filtered_opportunities
+                labels = st.session_state.filtered_labels
+            else:
+                opportunities = st.session_state.analysis_results['opportunities']
+                labels = self._get_opportunity_labels()
             
             if opportunities:
                 self._render_comparison_panel(opportunities)
 
-                # 选择要分析的机会
-                opportunity_options = [
-                    self._format_opportunity_label(opp)
-                    for opp in opportunities[:10]
-                ]
-                
+                # 选择要分析的机会（标签在分析/筛选时已预先格式化，按索引取用）
                 selected_idx = st.selectbox(
                     "选择要详细分析的机会",
-                    range(len(opportunity_options)),
-                    format_func=lambda x: opportunity_options[x]
+                    range(min(10, len(labels))),
+                    format_func=labels.__getitem__
                 )
                 
                 if selected_idx is not None:
                     selected_opp = opportunities[selected_idx]
+                    # 图表缓存键：机会标识 + 分析时间（重新分析后价格变化需重绘）
+                    selected_id = self._get_opportunity_id_cached(selected_opp)
+                    analyzed_at = st.session_state.analysis_results.get('timestamp')
                     
                     # 基本信息
                     col1, col2 = st.columns(2)
@@ -661,7 +1023,7 @@ class OptionsToolApp:
                     # 收益图
                     st.subheader("📊 收益图表")
                     try:
-                        payoff_fig = self.visualizer.plot_payoff_diagram(selected_opp)
+                        payoff_fig = _cached_payoff_figure(selected_id, analyzed_at, selected_opp)
                         st.plotly_chart(payoff_fig, width='stretch')
                     except Exception as e:
                         st.error(f"无法生成收益图: {e}")
@@ -682,7 +1044,7 @@ class OptionsToolApp:
                     
                     # 时间衰减分析
                     try:
-                        time_decay_fig = self.visualizer.plot_time_decay_analysis(selected_opp)
+                        time_decay_fig = _cached_time_decay_figure(selected_id, analyzed_at, selected_opp)
                         st.plotly_chart(time_decay_fig, width='stretch')
                     except Exception as e:
                         st.error(f"无法生成时间衰减图: {e}")
@@ -690,6 +1052,7 @@ class OptionsToolApp:
         else:
             st.info("请先运行分析来获取详细信息")
     
+    @st.fragment
     def _render_risk_management(self):
         """渲染风险管理"""
         st.header("⚠️ 风险管理")
@@ -701,11 +1064,13 @@ class OptionsToolApp:
                 st.subheader("💼 交易风险分析")
                 
                 # 选择要分析风险的机会
-                selected_opp = st.selectbox(
+                risk_labels = self._get_opportunity_labels()
+                selected_risk_idx = st.selectbox(
                     "选择要分析风险的交易",
-                    opportunities,
-                    format_func=self._format_opportunity_label
+                    range(len(opportunities)),
+                    format_func=risk_labels.__getitem__
                 )
+                selected_opp = opportunities[selected_risk_idx] if selected_risk_idx is not None else None
                 
                 if selected_opp:
                     # 风险分析
@@ -764,10 +1129,59 @@ class OptionsToolApp:
         else:
             st.info("请先运行分析来获取风险信息")
     
+    def _recalculate_position_greeks(self, positions: List[Dict]) -> int:
+        """按最新股价与期权链隐含波动率批量重算单腿持仓的 Greeks（卖方视角），返回更新数量"""
+        legs = [p for p in positions if p.get('strategy_type') in _SINGLE_LEG_OPTION_TYPES]
+        if not legs:
+            return 0
+
+        prices = self.data_manager.stock_collector.get_quote_prices(
+            sorted({p['symbol'].upper() for p in legs})) or {}
+        collector = self.data_manager.options_collector
+        chains = collector.map_parallel(
+            collector.get_chain_frame, [(p['symbol'], p['expiry_date']) for p in legs])
+
+        now = datetime.now()
+        matched = []
+        for position, chain in zip(legs, chains):
+            stock_price = prices.get(position['symbol'].upper(), 0)
+            if chain is None or stock_price <= 0:
+                continue
+            option_type = _SINGLE_LEG_OPTION_TYPES[position['strategy_type']]
+            row = chain[(chain['type'] == option_type)
+                        & np.isclose(chain['strike'].to_numpy(dtype=float), float(position['strike']))]
+            if row.empty:
+                continue
+            try:
+                dte = (datetime.strptime(position['expiry_date'], '%Y-%m-%d') - now).days
+            except (TypeError, ValueError):
+                continue
+            matched.append((position, stock_price, float(position['strike']), max(dte, 0) / 365.0,
+                            float(row['impliedVolatility'].iloc[0]), option_type == 'call'))
+        if not matched:
+            return 0
+
+        # 所有持仓一次向量化计算
+        _, stock_prices, strikes, times, ivs, is_call = zip(*matched)
+        batch = greeks(stock_prices, strikes, times, self.screener.option_analyzer.risk_free_rate, ivs, is_call)
+        for i, (position, *_) in enumerate(matched):
+            # 卖出期权：持仓 Greeks 与期权本身符号相反；备兑看涨另计正股 Delta
+            stock_delta = 1.0 if position['strategy_type'] == 'covered_call' else 0.0
+            self.portfolio_store.update_position_greeks(
+                position['id'],
+                round(stock_delta - float(batch['delta'][i]), 4),
+                round(-float(batch['theta'][i]), 4),
+                round(-float(batch['gamma'][i]), 4),
+                round(-float(batch['vega'][i]), 4),
+            )
+        return len(matched)
+
+    @st.fragment
     def _render_portfolio_management(self):
         """渲染投资组合管理"""
         st.header("📋 投资组合管理")
 
+        db_version = self.portfolio_store.last_modified()
         tab_add, tab_open, tab_closed, tab_history, tab_greeks, tab_wheel = st.tabs([
             "➕ 添加持仓", "📂 当前持仓", "✅ 已平仓记录",
             "📜 分析历史", "🎨 Greeks 概览", "🔄 Wheel 策略"
@@ -828,8 +1242,8 @@ class OptionsToolApp:
 
         # ===== 当前持仓 =====
         with tab_open:
-            open_positions = self.portfolio_store.get_positions(status="open")
-            summary = self.portfolio_store.get_portfolio_summary()
+            open_positions = _cached_positions("open", db_version)
+            summary = _cached_portfolio_summary(db_version)
 
             # 汇总指标
             st.subheader("💼 组合概览")
@@ -843,24 +1257,20 @@ class OptionsToolApp:
 
             if open_positions:
                 st.subheader("📂 当前持仓")
-                pos_df = pd.DataFrame(open_positions)
+                # 只按展示列构建表格，不物化整行记录
                 display_cols = ['id', 'symbol', 'strategy_type', 'strike',
                                 'expiry_date', 'contracts',
                                 'premium_per_contract', 'open_date', 'notes']
-                display_cols = [c for c in display_cols if c in pos_df.columns]
-                st.dataframe(pos_df[display_cols], width='stretch',
-                             hide_index=True)
+                pos_df = pd.DataFrame(open_positions, columns=display_cols)
+                st.dataframe(pos_df, width='stretch', hide_index=True)
 
                 # 平仓操作
                 st.subheader("🔒 平仓 / 删除")
-                pos_options = {
-                    f"#{p['id']} {p['symbol']} {format_strategy_name(p['strategy_type'])} ${p['strike']}": p['id']
-                    for p in open_positions
-                }
+                pos_options = _build_position_options(db_version)
                 selected_label = st.selectbox("选择持仓",
                                               options=list(pos_options.keys()),
                                               key="port_close_select")
-                selected_id = pos_options[selected_label]
+                selected_id = pos_options[selected_label]['id']
 
                 c1, c2 = st.columns(2)
                 with c1:
@@ -884,10 +1294,7 @@ class OptionsToolApp:
                 st.subheader("🔄 滚仓建议")
                 st.caption("选择一个持仓，输入当前股价，获取滚仓方案")
 
-                roll_pos_options = {
-                    f"#{p['id']} {p['symbol']} {format_strategy_name(p['strategy_type'])} ${p['strike']}": p
-                    for p in open_positions
-                }
+                roll_pos_options = pos_options
                 roll_selected_label = st.selectbox(
                     "选择持仓进行滚仓分析",
                     options=list(roll_pos_options.keys()),
@@ -908,21 +1315,19 @@ class OptionsToolApp:
 
                 if st.button("📊 生成滚仓方案", type="primary",
                              key="roll_generate_btn"):
-                    suggestions = self.roll_advisor.suggest_rolls(
-                        roll_position, current_price)
-
-                    if suggestions:
-                        roll_data = []
-                        for s in suggestions:
-                            roll_data.append({
-                                '方案': s['label'],
-                                '新Strike': f"${s['new_strike']:.0f}",
-                                '新到期日': s['new_expiry'],
-                                '新DTE': f"{s['new_dte']}天",
-                                '预估净收支': RollAdvisor.format_credit(
-                                    s['estimated_credit']),
-                                '说明': s['rationale'],
-                            })
+                    # 方案逐个生成并直接转换为表格行，不保留中间列表
+                    roll_data = [{
+                        '方案': s['label'],
+                        '新Strike': f"${s['new_strike']:.0f}",
+                        '新到期日': s['new_expiry'],
+                        '新DTE': f"{s['new_dte']}天",
+                        '预估净收支': RollAdvisor.format_credit(
+                            s['estimated_credit']),
+                        '说明': s['rationale'],
+                    } for s in self.roll_advisor.iter_rolls(
+                        roll_position, current_price)]
+
+                    if roll_data:
                         st.dataframe(
                             pd.DataFrame(roll_data),
                             width='stretch',
@@ -935,27 +1340,11 @@ class OptionsToolApp:
 
         # ===== 已平仓记录 =====
         with tab_closed:
-            closed_positions = self.portfolio_store.get_positions(
-                status="closed")
-            if closed_positions:
+            closed_df, total_pnl = _build_closed_df(db_version)
+            if not closed_df.empty:
                 st.subheader("✅ 已平仓记录")
-                closed_df = pd.DataFrame(closed_positions)
-                # 计算每笔盈亏
-                closed_df['pnl'] = (
-                    (closed_df['premium_per_contract']
-                     - closed_df['close_premium'].fillna(0))
-                    * closed_df['contracts'] * 100
-                )
-                display_cols = ['id', 'symbol', 'strategy_type', 'strike',
-                                'expiry_date', 'contracts',
-                                'premium_per_contract', 'close_premium',
-                                'pnl', 'open_date', 'close_date']
-                display_cols = [c for c in display_cols
-                                if c in closed_df.columns]
-                st.dataframe(closed_df[display_cols],
-                             width='stretch', hide_index=True)
-
-                total_pnl = closed_df['pnl'].sum()
+                st.dataframe(closed_df, width='stretch', hide_index=True)
+
                 if total_pnl >= 0:
                     st.success(f"总已实现盈亏: {format_currency(total_pnl)}")
                 else:
@@ -977,7 +1366,7 @@ class OptionsToolApp:
         # ===== Greeks 概览 =====
         with tab_greeks:
             st.subheader("Σ 风险希腊字母 (Greeks)")
-            greeks_data = self.portfolio_store.get_portfolio_greeks()
+            greeks_data, by_symbol = _build_greeks_overview(db_version)
             
             # 总体指标
             g1, g2, g3, g4 = st.columns(4)
@@ -991,22 +1380,27 @@ class OptionsToolApp:
                      help="波动率每变动1%的盈亏影响")
             
             # 分标的分布
-            if greeks_data.get('by_symbol'):
+            if not by_symbol.empty:
                 st.subheader("📊 标的风险分布")
-                by_symbol = pd.DataFrame(greeks_data['by_symbol']).T
                 st.dataframe(by_symbol.style.format("{:.2f}"))
             
             # 更新 Greeks
             st.divider()
             st.subheader("📝 更新持仓 Greeks")
-            st.caption("由于缺乏实时期权链数据，请手动更新当前 Greeks")
+            st.caption("单腿持仓可按最新股价与期权链隐含波动率自动重算，其余请手动更新当前 Greeks")
             
-            open_positions = self.portfolio_store.get_positions(status="open")
-            if open_positions:
-                greeks_opts = {
-                    f"#{p['id']} {p['symbol']} {format_strategy_name(p['strategy_type'])} ${p['strike']}": p
-                    for p in open_positions
-                }
+            if st.button("🔁 自动重算 Greeks", key="greeks_auto_btn"):
+                with st.spinner("正在获取行情并重算 Greeks..."):
+                    updated = self._recalculate_position_greeks(
+                        _cached_positions("open", db_version))
+                if updated:
+                    st.success(f"已重算 {updated} 个持仓的 Greeks")
+                    st.rerun()
+                else:
+                    st.warning("没有可自动重算的持仓（仅支持单腿策略，且需获取到股价与期权链）")
+            
+            greeks_opts = _build_position_options(db_version)
+            if greeks_opts:
                 selected_g_label = st.selectbox("选择持仓更新", 
                                               options=list(greeks_opts.keys()),
                                               key="greeks_update_select")
@@ -1045,24 +1439,14 @@ class OptionsToolApp:
             ```
             """)
             
-            wheel_positions = self.portfolio_store.get_wheel_positions()
-            if wheel_positions:
-                st.dataframe(
-                    pd.DataFrame([{
-                        'Symbol': p['symbol'],
-                        '策略': format_strategy_name(p['strategy_type']),
-                        '当前状态': PortfolioStore.WHEEL_STATES.get(p['wheel_state'], p['wheel_state']),
-                        '开仓日期': p['open_date'],
-                        '备注': p['notes']
-                    } for p in wheel_positions]),
-                    width='stretch'
-                )
+            wheel_df, w_opts = _build_wheel_df(db_version)
+            if w_opts:
+                st.dataframe(wheel_df, width='stretch')
                 
                 # 状态流转
                 st.divider()
                 st.subheader("🔀 状态流转")
                 
-                w_opts = {f"#{p['id']} {p['symbol']}": p for p in wheel_positions}
                 w_sel_label = st.selectbox("选择持仓", options=list(w_opts.keys()), key="wheel_pos_select")
                 w_pos = w_opts[w_sel_label]
                 
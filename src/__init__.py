@@ -0,0 +1,8 @@
+"""
+期权工具核心包
+Core package for the options tool
+"""
+import logging
+
+# 库代码本身不挂输出处理器，由应用（main.py / 示例脚本）统一配置日志
+logging.getLogger(__name__).addHandler(logging.NullHandler())
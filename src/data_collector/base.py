@@ -7,11 +7,21 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import glob
 import json
 import os
+import re
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, wraps
+
+from .cache import FileCache
+from ..utils.fast_stats import rolling_annual_vol
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 try:
@@ -22,39 +32,315 @@ except Exception:
 
 _MISSING_LXML_NOTIFIED = False
 
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+
+# 可选依赖（不在 requirements.txt 中）：未安装时 scan_cached_liquid_contracts 走 pandas 逐文件读取
+try:
+    import duckdb
+    _HAS_DUCKDB = True
+except Exception:
+    _HAS_DUCKDB = False
+
+try:
+    # 复用 yfinance 的会话与 crumb，批量报价接口需要
+    from yfinance.data import YfData
+    # 私有接口，版本变动时可能消失，按方法是否存在判断
+    _HAS_YFDATA = callable(getattr(YfData, 'get_raw_json', None))
+except Exception:
+    _HAS_YFDATA = False
+
+# Yahoo 批量报价接口，单次请求可携带多个代码
+# 经由 yfinance 私有接口 YfData.get_raw_json 调用，已在 yfinance 1.7.0 上验证（requirements 限定 >=1.7,<2）；
+# 接口缺失或调用失败时 get_quote_prices 返回 None，调用方回退逐个请求
+_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+# yf.download 每次合并下载的代码数上限
+_HISTORY_BATCH_SIZE = 20
+# 磁盘缓存有效期（秒）：基本信息变化慢，历史行情需跟上当日收盘
+_INFO_CACHE_TTL = 24 * 60 * 60
+_HISTORY_CACHE_TTL = 60 * 60
+# 进程级内存缓存的最大条目数（每个标的约 2 条：基本信息 + 历史行情）
+_MEMORY_CACHE_MAX_ENTRIES = 512
+# 超过该天数未更新的缓存文件由后台线程清理
+_CACHE_GC_DAYS = 30
+_GC_LOCK = threading.Lock()
+_GC_STARTED = set()
+# 历史行情增量更新：允许复用的最旧缓存天数，以及尾部指标重算需要的前置行数（最长窗口 50 + 余量）
+_INCREMENTAL_MAX_GAP_DAYS = 30
+_INDICATOR_LOOKBACK = 60
+_INDICATOR_COLUMNS = ('SMA_20', 'SMA_50', 'Volatility')
+# yfinance period 后缀到 DateOffset 参数的映射（ytd/max 等不做增量）
+_PERIOD_UNITS = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+# 触发退避重试的错误关键字（小写匹配）
+_RETRYABLE_MARKERS = ("429", "rate limit", "too many requests", "timed out", "timeout")
+
+# 期权链保留的字段（与 Contract 字段顺序一致，type 列另行添加）
+_CHAIN_COLUMNS = ['strike', 'lastPrice', 'bid', 'ask', 'volume', 'openInterest',
+                  'impliedVolatility', 'inTheMoney', 'contractSymbol']
+
+# 以列数组（SoA）形式随期权链附带的数值字段，供流动性/希腊字母等向量化计算直接使用
+_CHAIN_ARRAY_COLUMNS = ['strike', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility']
+
+# Ticker 对象会缓存 info 等数据，按时间分桶失效，避免长时间运行拿到过期行情
+# 不注入自定义 session：yfinance 内部已全局复用同一连接会话，且拒绝 requests_cache 等缓存会话
+_TICKER_TTL_SECONDS = 900
+
+
+def _period_offset(period: str) -> Optional[pd.DateOffset]:
+    """把 yfinance 的 period（如 1y / 6mo / 5d）转换为 DateOffset，无法转换时返回 None"""
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period or '')
+    if match is None:
+        return None
+    return pd.DateOffset(**{_PERIOD_UNITS[match.group(2)]: int(match.group(1))})
+
+
+@lru_cache(maxsize=256)
+def _cached_ticker(symbol: str, bucket: int) -> yf.Ticker:
+    """按 (代码, 时间桶) 缓存 Ticker 实例"""
+    return yf.Ticker(symbol)
+
+
+def _ticker(symbol: str) -> yf.Ticker:
+    """获取可复用的 Ticker 实例"""
+    return _cached_ticker(symbol, int(time.time() // _TICKER_TTL_SECONDS))
+
+
+# 磁盘缓存的进程内解析结果：以 (路径, 修改时间) 为键，文件被重写后自动失效
+@lru_cache(maxsize=512)
+def _read_json_cached(path: str, mtime_ns: int) -> Dict:
+    """读取并缓存 JSON 文件内容"""
+    if _HAS_ORJSON:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=512)
+def _read_parquet_cached(path: str, mtime_ns: int) -> pd.DataFrame:
+    """读取并缓存 Parquet 文件内容"""
+    return pd.read_parquet(path)
+
+def _file_mtime(path: str) -> Optional[float]:
+    """文件修改时间（秒），不存在时返回 None"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _coalesced(method: Callable) -> Callable:
+    """合并参数相同的并发调用（跨收集器实例）：只发起一次上游请求，所有调用方共享结果"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = repr((method.__name__, args, sorted(kwargs.items())))
+        return self._coalesce(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
 class DataCollector:
     """数据收集器基础类"""
+
+    # 进程级内存缓存与进行中请求表：所有收集器实例（含不同 DataManager）共享
+    # 缓存值为 (写入时间, 数据)，写入时间用墙上时间以便与磁盘缓存的 mtime 对齐；按 LRU 限制条目数
+    _MEMORY_CACHE: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    _INFLIGHT: Dict[str, Future] = {}
+    _SHARED_LOCK = threading.RLock()
     
     def __init__(self, cache_dir: str = "data/cache"):
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
-        
-    def _get_cache_path(self, symbol: str, data_type: str) -> str:
-        """获取缓存文件路径"""
-        date_str = datetime.now().strftime("%Y%m%d")
-        return os.path.join(self.cache_dir, f"{symbol}_{data_type}_{date_str}.json")
-    
-    def _load_from_cache(self, cache_path: str) -> Optional[Dict]:
-        """从缓存加载数据"""
-        if os.path.exists(cache_path):
+        # 限流重试参数（指数退避 + 随机抖动），调用方可按需调整
+        self.max_retries = 3
+        self.backoff_base = 0.5
+        self.backoff_max = 32.0
+        self._start_cache_gc()
+
+    def _coalesce(self, key: str, fn: Callable[[], Any]) -> Any:
+        """相同 key 的请求正在进行时直接等待其结果，否则由当前线程执行 fn"""
+        with self._SHARED_LOCK:
+            future = self._INFLIGHT.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._INFLIGHT[key] = future
+        if not owner:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._SHARED_LOCK:
+                self._INFLIGHT.pop(key, None)
+
+    def _memory_get(self, key: str, ttl: float) -> Any:
+        """读取进程级内存缓存，未命中或超过 ttl 秒返回 None"""
+        with self._SHARED_LOCK:
+            entry = self._MEMORY_CACHE.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= ttl:
+                # 过期条目直接移除，避免长期驻留
+                del self._MEMORY_CACHE[key]
+                return None
+            self._MEMORY_CACHE.move_to_end(key)
+        return entry[1]
+
+    def _memory_set(self, key: str, value: Any, inserted_at: Optional[float] = None):
+        """写入进程级内存缓存（从磁盘载入时传入文件 mtime，保持原有效期）"""
+        with self._SHARED_LOCK:
+            self._MEMORY_CACHE[key] = (time.time() if inserted_at is None else inserted_at, value)
+            self._MEMORY_CACHE.move_to_end(key)
+            # 超出容量时按 LRU 淘汰最久未使用的条目
+            while len(self._MEMORY_CACHE) > _MEMORY_CACHE_MAX_ENTRIES:
+                self._MEMORY_CACHE.popitem(last=False)
+
+    @staticmethod
+    def _is_retryable_error(error: Exception) -> bool:
+        """判断是否为限流/瞬时网络错误"""
+        message = str(error).lower()
+        return any(marker in message for marker in _RETRYABLE_MARKERS)
+
+    def _retry_with_backoff(self, fn: Callable[[], Any], label: str = "") -> Any:
+        """执行上游请求，遇到限流时按指数退避 + 抖动重试，避免多线程同步重试再次触发限流"""
+        for attempt in range(self.max_retries + 1):
             try:
-                with open(cache_path, 'r') as f:
-                    return json.load(f)
+                return fn()
             except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
+                if attempt >= self.max_retries or not self._is_retryable_error(e):
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.5)
+                logger.debug("%s 请求受限，%.2fs 后重试（第 %d 次）: %s", label, delay, attempt + 1, e)
+                time.sleep(delay)
+
+    @staticmethod
+    def map_parallel(fn: Callable[..., Any], items: Iterable[Tuple], max_workers: int = 16) -> List[Any]:
+        """并发执行 I/O 密集调用：每个元素作为 fn 的位置参数，按输入顺序返回结果"""
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(*args) for args in items]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(lambda args: fn(*args), items))
+
+    @staticmethod
+    def query_cache(sql: str, params: Optional[List] = None) -> Optional[pd.DataFrame]:
+        """用 DuckDB 在磁盘 Parquet 缓存上执行 SQL；未安装 duckdb 或查询失败时返回 None"""
+        if not _HAS_DUCKDB:
+            return None
+        try:
+            con = duckdb.connect(':memory:')
+            try:
+                return con.execute(sql, params or []).df()
+            finally:
+                con.close()
+        except Exception as e:
+            logger.warning("Cache query failed: %s", e)
+            return None
+
+    def _get_cache_path(self, symbol: str, data_type: str, ext: str = "json") -> str:
+        """获取缓存文件路径（同一数据只保留一个文件，按修改时间判断是否过期）"""
+        return os.path.join(self.cache_dir, f"{symbol}_{data_type}.{ext}")
+
+    @staticmethod
+    def _cache_mtime_ns(cache_path: str, max_age: Optional[float]) -> Optional[int]:
+        """返回缓存文件的修改时间；文件不存在或超过 max_age 秒时返回 None"""
+        try:
+            mtime_ns = os.stat(cache_path).st_mtime_ns
+        except OSError:
+            return None
+        if max_age is not None and time.time() - mtime_ns / 1e9 > max_age:
+            return None
+        return mtime_ns
+
+    def _gc_cache(self, max_age_days: int = _CACHE_GC_DAYS):
+        """删除缓存目录顶层超过 max_age_days 未更新的 JSON/Parquet 文件，并清理过期交易日的期权链目录"""
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for pattern in ("*.json", "*.parquet"):
+            for path in glob.glob(os.path.join(glob.escape(self.cache_dir), pattern)):
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            logger.info("Removed %d stale cache files from %s", removed, self.cache_dir)
+        FileCache(os.path.join(self.cache_dir, "options")).prune()
+
+    def _start_cache_gc(self):
+        """每个缓存目录在进程内只启动一次后台清理"""
+        cache_dir = os.path.abspath(self.cache_dir)
+        with _GC_LOCK:
+            if cache_dir in _GC_STARTED:
+                return
+            _GC_STARTED.add(cache_dir)
+        threading.Thread(target=self._gc_cache, name="cache-gc", daemon=True).start()
+    
+    def _load_from_cache(self, cache_path: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """从缓存加载数据（超过 max_age 秒视为过期；同一文件未变化时不重复解析）"""
+        mtime_ns = self._cache_mtime_ns(cache_path, max_age)
+        if mtime_ns is None:
+            return None
+        try:
+            # 返回副本，避免调用方修改共享的缓存对象
+            return dict(_read_json_cached(cache_path, mtime_ns))
+        except Exception as e:
+            logger.warning("Failed to load cache: %s", e)
         return None
     
     def _save_to_cache(self, data: Dict, cache_path: str):
         """保存数据到缓存"""
         try:
+            if _HAS_ORJSON:
+                # C 实现的序列化器，原生支持 datetime / numpy；其余类型与标准库一样转为字符串
+                payload = orjson.dumps(
+                    data, default=str,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                )
+                with open(cache_path, 'wb') as f:
+                    f.write(payload)
+                return
             with open(cache_path, 'w') as f:
                 json.dump(data, f, default=str)
         except Exception as e:
-            logger.warning(f"Failed to save cache: {e}")
+            logger.warning("Failed to save cache: %s", e)
+
+    def _load_df_cache(self, cache_path: str, max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """从 Parquet 缓存加载 DataFrame（超过 max_age 秒视为过期；保留索引与列类型，同一文件未变化时不重复解析）"""
+        mtime_ns = self._cache_mtime_ns(cache_path, max_age)
+        if mtime_ns is None:
+            return None
+        try:
+            return _read_parquet_cached(cache_path, mtime_ns).copy()
+        except Exception as e:
+            logger.warning("Failed to load cache: %s", e)
+        return None
+
+    def _save_df_cache(self, frame: pd.DataFrame, cache_path: str):
+        """保存 DataFrame 到 Parquet 缓存"""
+        try:
+            frame.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            logger.warning("Failed to save cache: %s", e)
 
 class StockDataCollector(DataCollector):
     """股票数据收集器"""
 
+    def __init__(self, cache_dir: str = "data/cache"):
+        super().__init__(cache_dir)
+        # (代码, 日期) -> 已排序的历史波动率，IV 排名按日复用
+        self._volatility_cache: Dict[Tuple[str, str], np.ndarray] = {}
+
     @staticmethod
     def _timestamp_to_datetime(value) -> Optional[datetime]:
         """将时间戳安全转换为 datetime"""
@@ -81,17 +367,25 @@ class StockDataCollector(DataCollector):
             return nearest.strftime('%Y-%m-%d'), (nearest - now).days
         return None, None
     
+    @_coalesced
     def get_stock_info(self, symbol: str) -> Dict:
         """获取股票基本信息"""
+        memory_key = f"{symbol}_info"
+        cached_data = self._memory_get(memory_key, _INFO_CACHE_TTL)
+        if cached_data:
+            # 返回副本，避免调用方修改共享的缓存对象
+            return dict(cached_data)
+
         cache_path = self._get_cache_path(symbol, "info")
-        cached_data = self._load_from_cache(cache_path)
+        cached_data = self._load_from_cache(cache_path, _INFO_CACHE_TTL)
         
         if cached_data:
+            self._memory_set(memory_key, dict(cached_data), _file_mtime(cache_path))
             return cached_data
             
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            ticker = _ticker(symbol)
+            info = self._retry_with_backoff(lambda: ticker.info, symbol)
             
             # 获取财报日期
             next_earnings_date, days_to_earnings = self._extract_earnings_from_info(info)
@@ -110,17 +404,18 @@ class StockDataCollector(DataCollector):
 
                         if earnings_dates is not None and not earnings_dates.empty:
                             now = datetime.now()
-                            future_dates = [
-                                d.to_pydatetime().replace(tzinfo=None)
-                                for d in earnings_dates.index
-                                if d.to_pydatetime().replace(tzinfo=None) >= now
-                            ]
-                            if future_dates:
-                                nearest = min(future_dates)
+                            # 去掉时区保留当地时间，排序后二分查找第一个未来日期（yfinance 按时间倒序返回）
+                            dates = pd.DatetimeIndex(earnings_dates.index)
+                            if dates.tz is not None:
+                                dates = dates.tz_localize(None)
+                            dates = dates.sort_values()
+                            pos = dates.searchsorted(pd.Timestamp(now), side='left')
+                            if pos < len(dates):
+                                nearest = dates[pos].to_pydatetime()
                                 next_earnings_date = nearest.strftime('%Y-%m-%d')
                                 days_to_earnings = (nearest - now).days
                     except Exception as e:
-                        logger.debug(f"无法获取 {symbol} 财报日期（fallback）: {e}")
+                        logger.debug("无法获取 %s 财报日期（fallback）: %s", symbol, e)
                 elif not _MISSING_LXML_NOTIFIED:
                     logger.info("未安装 lxml，已跳过 get_earnings_dates 财报抓取（不影响核心功能）")
                     _MISSING_LXML_NOTIFIED = True
@@ -144,154 +439,365 @@ class StockDataCollector(DataCollector):
             }
             
             self._save_to_cache(stock_info, cache_path)
+            self._memory_set(memory_key, dict(stock_info))
             return stock_info
             
         except Exception as e:
-            logger.error(f"Error fetching stock info for {symbol}: {e}")
+            logger.error("Error fetching stock info for %s: %s", symbol, e)
             return {}
     
+    def quick_validate(self, symbol: str) -> bool:
+        """轻量校验代码：优先用 fast_info 的最新价（数据量远小于 info），失败时回退到完整信息"""
+        try:
+            ticker = _ticker(symbol)
+            last_price = self._retry_with_backoff(lambda: ticker.fast_info.get('lastPrice'), symbol)
+            return bool(last_price and last_price > 0)
+        except Exception as e:
+            logger.debug("fast_info 校验 %s 失败，回退到 get_stock_info: %s", symbol, e)
+        stock_info = self.get_stock_info(symbol)
+        return bool(stock_info and stock_info.get('current_price', 0) > 0)
+
+    def get_quote_prices(self, symbols: List[str]) -> Optional[Dict[str, float]]:
+        """一次请求批量获取最新价 {代码: 价格}；接口不可用时返回 None"""
+        if not symbols:
+            return {}
+        if not _HAS_YFDATA:
+            return None
+        try:
+            payload = YfData().get_raw_json(
+                _QUOTE_URL,
+                params={'symbols': ','.join(symbols), 'formatted': 'false'}
+            )
+            quotes = (payload.get('quoteResponse') or {}).get('result') or []
+            return {
+                str(quote['symbol']).upper(): float(quote.get('regularMarketPrice') or 0)
+                for quote in quotes if quote.get('symbol')
+            }
+        except Exception as e:
+            logger.warning("Batch quote request failed for %s symbols: %s", len(symbols), e)
+            return None
+    
+    @_coalesced
     def get_historical_data(self, symbol: str, period: str = "1y") -> pd.DataFrame:
         """获取历史价格数据"""
+        memory_key = f"{symbol}_hist_{period}"
+        cached_hist = self._memory_get(memory_key, _HISTORY_CACHE_TTL)
+        if cached_hist is not None:
+            return cached_hist.copy()
+
+        # 有效期内已计算过指标的数据直接读取 Parquet 缓存
+        cache_path = self._get_cache_path(symbol, f"history_{period}", ext="parquet")
+        cached_hist = self._load_df_cache(cache_path, _HISTORY_CACHE_TTL)
+        if cached_hist is not None:
+            self._memory_set(memory_key, cached_hist.copy(), _file_mtime(cache_path))
+            return cached_hist
+
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
-            
-            # 计算技术指标
-            hist['SMA_20'] = hist['Close'].rolling(window=20).mean()
-            hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
-            hist['Volatility'] = hist['Close'].pct_change().rolling(window=20).std() * np.sqrt(252)
+            ticker = _ticker(symbol)
+            # 有近期的历史缓存时只下载新增尾部并增量计算指标
+            hist = self._extend_cached_history(symbol, period, ticker, cache_path)
+            if hist is None:
+                hist = self._add_indicators(
+                    self._retry_with_backoff(lambda: ticker.history(period=period), symbol)
+                )
             
+            if not hist.empty:
+                self._save_df_cache(hist, cache_path)
+                self._memory_set(memory_key, hist.copy())
             return hist
             
         except Exception as e:
-            logger.error(f"Error fetching historical data for {symbol}: {e}")
+            logger.error("Error fetching historical data for %s: %s", symbol, e)
             return pd.DataFrame()
+
+    def _extend_cached_history(self, symbol: str, period: str, ticker: yf.Ticker,
+                               cache_path: str) -> Optional[pd.DataFrame]:
+        """在已过期的历史缓存上追加新行情：只下载缓存最后一天之后的数据，指标只重算尾部"""
+        offset = _period_offset(period)
+        if offset is None:
+            return None
+        prior = self._load_df_cache(cache_path, _INCREMENTAL_MAX_GAP_DAYS * 86400)
+        if prior is None or len(prior) < 2:
+            return None
+
+        # 从倒数第二行开始下载：最后一行可能是盘中数据，倒数第二行是已定的收盘价，用作对账锚点
+        anchor = prior.index[-2]
+        start = anchor.strftime('%Y-%m-%d')
+        tail = self._retry_with_backoff(lambda: ticker.history(start=start), symbol)
+        if tail is None or tail.empty:
+            return None
+        # 复权价格：新区间内有分红/拆股时，之前所有收盘价都会被重新复权，拼接会在接缝处产生虚假跳变
+        for col in ('Dividends', 'Stock Splits'):
+            if col in tail.columns and (tail[col].fillna(0) != 0).any():
+                logger.debug("%s 新区间含 %s，改为全量下载", symbol, col)
+                return None
+        if anchor not in tail.index or not np.isclose(
+                tail.at[anchor, 'Close'], prior.at[anchor, 'Close'], rtol=1e-6, atol=0.0):
+            logger.debug("%s 缓存收盘价与最新复权价不一致，改为全量下载", symbol)
+            return None
+        base = prior[prior.index < tail.index[0]]
+        combined = pd.concat([base, tail])
+        n_new = len(tail)
+
+        # 指标窗口最长 50 天，带上足够的前置行计算尾部即可
+        context = combined.iloc[-(n_new + _INDICATOR_LOOKBACK):].copy()
+        context = self._add_indicators(context)
+        for col in _INDICATOR_COLUMNS:
+            if col not in combined.columns:
+                combined[col] = np.nan
+            combined[col] = combined[col].astype(context[col].dtype)
+            combined.iloc[-n_new:, combined.columns.get_loc(col)] = context[col].to_numpy()[-n_new:]
+
+        # 保持与 period 一致的时间跨度
+        return combined[combined.index >= combined.index[-1] - offset]
+
+    @staticmethod
+    def _add_indicators(hist: pd.DataFrame) -> pd.DataFrame:
+        """计算技术指标（SMA_20 / SMA_50 / 年化波动率）"""
+        hist['SMA_20'] = hist['Close'].rolling(window=20).mean()
+        hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
+        # 以 float64 计算、float32 存储：展示与 IV 排名只需约 4 位有效数字，内存与缓存体积减半
+        hist['Volatility'] = rolling_annual_vol(hist['Close'].to_numpy(), window=20).astype(np.float32)
+        return hist
+
+    def get_historical_data_batch(self, symbols: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        """批量获取历史价格数据：缓存未命中的代码合并为一次 yf.download 请求"""
+        results: Dict[str, pd.DataFrame] = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cached_hist = self._load_df_cache(
+                self._get_cache_path(symbol, f"history_{period}", ext="parquet"), _HISTORY_CACHE_TTL)
+            if cached_hist is not None:
+                results[symbol] = cached_hist
+            else:
+                missing.append(symbol)
+        if not missing:
+            return results
+
+        # Yahoo 单次请求约支持 20 个代码，超出时分组下载
+        for start in range(0, len(missing), _HISTORY_BATCH_SIZE):
+            group = missing[start:start + _HISTORY_BATCH_SIZE]
+            try:
+                raw = yf.download(group, period=period, group_by='ticker', actions=True,
+                                  ignore_tz=False, threads=True, progress=False)
+            except Exception as e:
+                logger.warning("Batch history download failed, falling back to per-symbol: %s", e)
+                raw = None
+
+            for symbol in group:
+                hist = None
+                if raw is not None and not raw.empty and symbol in raw.columns.get_level_values(0):
+                    hist = raw[symbol].dropna(how='all')
+                if hist is None or hist.empty:
+                    # 批量结果缺失时逐个补取
+                    results[symbol] = self.get_historical_data(symbol, period)
+                    continue
+                hist = self._add_indicators(hist.copy())
+                self._save_df_cache(hist, self._get_cache_path(symbol, f"history_{period}", ext="parquet"))
+                results[symbol] = hist
+        return results
     
+    def _get_sorted_volatility(self, symbol: str) -> np.ndarray:
+        """获取当日已排序的历史波动率序列（每个代码每天只下载并计算一次）"""
+        key = (symbol, datetime.now().strftime("%Y%m%d"))
+        sorted_vol = self._volatility_cache.get(key)
+        if sorted_vol is None:
+            # 跨日后清理旧条目（先取键快照，多线程并发写入时也不会在迭代中改变字典）
+            for stale in [k for k in list(self._volatility_cache) if k[1] != key[1]]:
+                self._volatility_cache.pop(stale, None)
+            hist_data = self.get_historical_data(symbol, period="1y")
+            if hist_data.empty:
+                sorted_vol = np.empty(0)
+            else:
+                sorted_vol = np.sort(hist_data['Volatility'].dropna().to_numpy(dtype=float))
+            self._volatility_cache[key] = sorted_vol
+        return sorted_vol
+
     def calculate_implied_volatility_rank(self, symbol: str, current_iv: float) -> float:
         """计算隐含波动率排名"""
         try:
-            # 获取历史波动率数据
-            hist_data = self.get_historical_data(symbol, period="1y")
-            if hist_data.empty:
+            sorted_vol = self._get_sorted_volatility(symbol)
+            if len(sorted_vol) == 0:
                 return 0
                 
-            hist_volatility = hist_data['Volatility'].dropna()
-            if len(hist_volatility) == 0:
-                return 0
-                
-            # 计算当前IV在历史波动率中的排名
-            percentile = (hist_volatility < current_iv).sum() / len(hist_volatility) * 100
-            return percentile
+            # 计算当前IV在历史波动率中的排名（有序数组二分查找，等价于 < 计数）
+            return np.searchsorted(sorted_vol, current_iv, side='left') / len(sorted_vol) * 100
             
         except Exception as e:
-            logger.error(f"Error calculating IV rank for {symbol}: {e}")
+            logger.error("Error calculating IV rank for %s: %s", symbol, e)
             return 0
 
 class OptionsDataCollector(DataCollector):
     """期权数据收集器"""
     
-    def get_options_chain(self, symbol: str, expiry_date: str = None) -> Dict:
-        """获取期权链数据"""
-        cache_path = self._get_cache_path(symbol, f"options_{expiry_date or 'all'}")
-        cached_data = self._load_from_cache(cache_path)
+    def __init__(self, cache_dir: str = "data/cache"):
+        super().__init__(cache_dir)
+        self.chain_cache = FileCache(os.path.join(cache_dir, "options"))
+
+    @staticmethod
+    def _frame_to_chain(symbol: str, frame: pd.DataFrame, mask: Optional[pd.Series] = None) -> Dict:
+        """将期权链 DataFrame 还原为字典（可先按布尔掩码筛选行）"""
+        rows = frame if mask is None else frame[mask]
+        is_call = (rows['type'] == 'call').to_numpy()
+        # 按固定列子集取出合约字段，缓存中多出的列不会混入记录
+        contracts = rows[['type'] + _CHAIN_COLUMNS]
+        calls = contracts[is_call]
+        puts = contracts[~is_call]
+        return {
+            'symbol': symbol,
+            'expiry_date': frame['expiry_date'].iloc[0],
+            'calls': calls.to_dict('records'),
+            'puts': puts.to_dict('records'),
+            # 与 calls/puts 逐行对齐的列数组
+            'arrays': {
+                'calls': OptionsDataCollector._frame_arrays(calls),
+                'puts': OptionsDataCollector._frame_arrays(puts),
+            },
+            'timestamp': frame['timestamp'].iloc[0]
+        }
+
+    @staticmethod
+    def _frame_arrays(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """提取数值列为 float64 数组（缺失值为 NaN）"""
+        return {
+            col: frame[col].to_numpy(dtype=float, na_value=np.nan)
+            for col in _CHAIN_ARRAY_COLUMNS if col in frame.columns
+        }
+
+    @_coalesced
+    def get_chain_frame(self, symbol: str, expiry_date: str = None) -> Optional[pd.DataFrame]:
+        """获取期权链 DataFrame（优先读缓存，无数据或出错时返回 None）"""
+        cache_key = expiry_date or 'all'
+        cached_frame = self.chain_cache.get(symbol, cache_key)
         
-        if cached_data:
-            return cached_data
+        if cached_frame is not None and not cached_frame.empty:
+            return cached_frame
             
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = _ticker(symbol)
             
             # 获取所有到期日
             if expiry_date is None:
                 expirations = ticker.options
                 if not expirations:
-                    return {}
+                    return None
                 expiry_date = expirations[0]  # 使用最近的到期日
             
             # 获取期权链
-            option_chain = ticker.option_chain(expiry_date)
-            calls = option_chain.calls
-            puts = option_chain.puts
-            
-            # 处理calls数据
-            calls_data = []
-            for _, row in calls.iterrows():
-                calls_data.append({
-                    'type': 'call',
-                    'strike': row['strike'],
-                    'lastPrice': row['lastPrice'],
-                    'bid': row['bid'],
-                    'ask': row['ask'],
-                    'volume': row['volume'],
-                    'openInterest': row['openInterest'],
-                    'impliedVolatility': row['impliedVolatility'],
-                    'inTheMoney': row['inTheMoney'],
-                    'contractSymbol': row['contractSymbol']
-                })
-            
-            # 处理puts数据
-            puts_data = []
-            for _, row in puts.iterrows():
-                puts_data.append({
-                    'type': 'put',
-                    'strike': row['strike'],
-                    'lastPrice': row['lastPrice'],
-                    'bid': row['bid'],
-                    'ask': row['ask'],
-                    'volume': row['volume'],
-                    'openInterest': row['openInterest'],
-                    'impliedVolatility': row['impliedVolatility'],
-                    'inTheMoney': row['inTheMoney'],
-                    'contractSymbol': row['contractSymbol']
-                })
+            option_chain = self._retry_with_backoff(lambda: ticker.option_chain(expiry_date), symbol)
             
-            options_data = {
-                'symbol': symbol,
-                'expiry_date': expiry_date,
-                'calls': calls_data,
-                'puts': puts_data,
-                'timestamp': datetime.now().isoformat()
-            }
+            # 整列选取后合并为一张表，避免逐行 iterrows
+            calls_frame = option_chain.calls[_CHAIN_COLUMNS]
+            calls_frame.insert(0, 'type', 'call')
+            puts_frame = option_chain.puts[_CHAIN_COLUMNS]
+            puts_frame.insert(0, 'type', 'put')
+            frame = pd.concat([calls_frame, puts_frame], ignore_index=True)
+            if frame.empty:
+                return None
             
-            self._save_to_cache(options_data, cache_path)
-            return options_data
+            frame['expiry_date'] = expiry_date
+            frame['timestamp'] = datetime.now().isoformat()
+            self.chain_cache.set(symbol, cache_key, frame)
+            return frame
             
         except Exception as e:
-            logger.error(f"Error fetching options chain for {symbol}: {e}")
+            logger.error("Error fetching options chain for %s: %s", symbol, e)
+            return None
+
+    def get_options_chain(self, symbol: str, expiry_date: str = None) -> Dict:
+        """获取期权链数据"""
+        frame = self.get_chain_frame(symbol, expiry_date)
+        return self._frame_to_chain(symbol, frame) if frame is not None else {}
+
+    def get_liquid_options_chain(self, symbol: str, expiry_date: str = None,
+                                 min_volume: int = 50, min_open_interest: int = 100) -> Dict:
+        """获取流动性好的期权链：在 DataFrame 上一次性掩码筛选，只把保留的合约转为字典"""
+        frame = self.get_chain_frame(symbol, expiry_date)
+        if frame is None:
             return {}
+        return self._frame_to_chain(symbol, frame, self._liquid_mask(frame, min_volume, min_open_interest))
+
+    @staticmethod
+    def _liquid_mask(frame: pd.DataFrame, min_volume: int, min_open_interest: int) -> pd.Series:
+        """成交量与未平仓量同时达标的行掩码"""
+        return (frame['volume'] >= min_volume) & (frame['openInterest'] >= min_open_interest)
     
+    def scan_cached_liquid_contracts(self, symbols: Optional[List[str]] = None,
+                                     min_volume: int = 50,
+                                     min_open_interest: int = 100) -> pd.DataFrame:
+        """跨标的扫描当日已缓存的期权链，一次查询返回流动性合格的合约（附 symbol 列）"""
+        files = self.chain_cache.list_files(symbols)
+        if not files:
+            return pd.DataFrame()
+
+        # 缓存目录结构为 {symbol}/{trading_date}/{md5}.parquet；文件列表作为绑定参数传入，不拼接 SQL
+        result = self.query_cache(
+            "SELECT * FROM read_parquet(?, filename = true, union_by_name = true) "
+            "WHERE volume >= ? AND openInterest >= ?",
+            [files, min_volume, min_open_interest]
+        )
+        if result is None:
+            # 未安装 duckdb：逐个读取（解析结果按 mtime 复用）后统一掩码筛选
+            frames = []
+            for path in files:
+                try:
+                    frames.append(_read_parquet_cached(path, os.stat(path).st_mtime_ns).assign(filename=path))
+                except Exception as e:
+                    logger.warning("Failed to load option cache %s: %s", path, e)
+            if not frames:
+                return pd.DataFrame()
+            result = pd.concat(frames, ignore_index=True)
+            result = result[(result['volume'] >= min_volume)
+                            & (result['openInterest'] >= min_open_interest)].reset_index(drop=True)
+
+        result['symbol'] = result.pop('filename').str.split(os.sep).str[-3]
+        return result
+
+    @_coalesced
     def get_all_expirations(self, symbol: str) -> List[str]:
         """获取所有到期日"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = _ticker(symbol)
             return list(ticker.options)
         except Exception as e:
-            logger.error(f"Error fetching expirations for {symbol}: {e}")
+            logger.error("Error fetching expirations for %s: %s", symbol, e)
             return []
     
-    def filter_liquid_options(self, options_data: Dict, min_volume: int = 50, 
-                            min_open_interest: int = 100) -> Dict:
-        """筛选流动性好的期权"""
+    def filter_liquid_options(self, options_data: Union[Dict, pd.DataFrame], min_volume: int = 50,
+                              min_open_interest: int = 100) -> Union[Dict, pd.DataFrame]:
+        """筛选流动性好的期权：DataFrame 直接按掩码返回子表；字典有列数组时按掩码一次性筛选"""
+        if isinstance(options_data, pd.DataFrame):
+            return options_data[self._liquid_mask(options_data, min_volume, min_open_interest)]
         if not options_data:
             return {}
-            
-        filtered_calls = [
-            option for option in options_data.get('calls', [])
-            if option['volume'] >= min_volume and option['openInterest'] >= min_open_interest
-        ]
         
-        filtered_puts = [
-            option for option in options_data.get('puts', [])
-            if option['volume'] >= min_volume and option['openInterest'] >= min_open_interest
-        ]
+        filtered = {}
+        filtered_arrays = {}
+        arrays = options_data.get('arrays', {})
+        for side in ('calls', 'puts'):
+            contracts = options_data.get(side, [])
+            side_arrays = arrays.get(side)
+            if side_arrays and len(side_arrays.get('volume', ())) == len(contracts):
+                mask = ((side_arrays['volume'] >= min_volume)
+                        & (side_arrays['openInterest'] >= min_open_interest))
+                filtered[side] = [contracts[i] for i in np.flatnonzero(mask)]
+                filtered_arrays[side] = {k: v[mask] for k, v in side_arrays.items()}
+            else:
+                filtered[side] = [
+                    option for option in contracts
+                    if option['volume'] >= min_volume and option['openInterest'] >= min_open_interest
+                ]
         
-        return {
+        result = {
             'symbol': options_data['symbol'],
             'expiry_date': options_data['expiry_date'],
-            'calls': filtered_calls,
-            'puts': filtered_puts,
+            'calls': filtered['calls'],
+            'puts': filtered['puts'],
             'timestamp': options_data['timestamp']
         }
+        if len(filtered_arrays) == 2:
+            result['arrays'] = filtered_arrays
+        return result
 
 class MarketDataCollector(DataCollector):
     """市场数据收集器"""
@@ -299,30 +805,34 @@ class MarketDataCollector(DataCollector):
     def get_vix_data(self) -> float:
         """获取VIX指数"""
         try:
-            vix = yf.Ticker("^VIX")
-            hist = vix.history(period="1d")
+            vix = _ticker("^VIX")
+            hist = self._retry_with_backoff(lambda: vix.history(period="1d"), "^VIX")
             if not hist.empty:
                 return hist['Close'].iloc[-1]
             return 0
         except Exception as e:
-            logger.error(f"Error fetching VIX data: {e}")
+            logger.error("Error fetching VIX data: %s", e)
             return 0
     
     def get_market_sentiment(self) -> Dict:
-        """获取市场情绪指标"""
+        """获取市场情绪指标（VIX 与 SPY 合并为一次下载）"""
         sentiment_data = {
-            'vix': self.get_vix_data(),
+            'vix': 0,
             'timestamp': datetime.now().isoformat()
         }
         
-        # 可以添加更多市场情绪指标
         try:
+            closes = yf.download(["^VIX", "SPY"], period="5d", progress=False)['Close']
+            vix_close = closes["^VIX"].dropna()
+            if not vix_close.empty:
+                sentiment_data['vix'] = vix_close.iloc[-1]
             # SPY作为市场基准
-            spy = yf.Ticker("SPY")
-            spy_hist = spy.history(period="5d")
-            if not spy_hist.empty:
-                sentiment_data['spy_momentum'] = (spy_hist['Close'].iloc[-1] / spy_hist['Close'].iloc[0] - 1) * 100
-        except:
+            spy_close = closes["SPY"].dropna()
+            if not spy_close.empty:
+                sentiment_data['spy_momentum'] = (spy_close.iloc[-1] / spy_close.iloc[0] - 1) * 100
+        except Exception as e:
+            logger.warning("Batch market download failed, falling back to per-ticker: %s", e)
+            sentiment_data['vix'] = self.get_vix_data()
             sentiment_data['spy_momentum'] = 0
             
         return sentiment_data
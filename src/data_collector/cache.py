@@ -0,0 +1,121 @@
+"""
+期权链磁盘缓存
+On-disk cache for option chains with market-hours-aware TTL
+"""
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    from zoneinfo import ZoneInfo
+    _MARKET_TZ = ZoneInfo("America/New_York")
+except Exception:
+    _MARKET_TZ = None
+
+logger = logging.getLogger(__name__)
+
+# TTL（秒）
+INTRADAY_TTL = 15 * 60
+OVERNIGHT_TTL = 4 * 60 * 60
+WEEKEND_TTL = 24 * 60 * 60
+
+
+def _market_now() -> datetime:
+    """获取美东时间"""
+    return datetime.now(_MARKET_TZ) if _MARKET_TZ else datetime.now()
+
+
+def calculate_options_ttl(now: Optional[datetime] = None) -> int:
+    """根据美股交易时段计算期权链缓存有效期（秒）"""
+    now = now or _market_now()
+    if now.weekday() >= 5:
+        return WEEKEND_TTL
+    minutes = now.hour * 60 + now.minute
+    if 9 * 60 + 30 <= minutes < 16 * 60:
+        return INTRADAY_TTL
+    return OVERNIGHT_TTL
+
+
+class FileCache:
+    """基于 Parquet 的期权链文件缓存"""
+
+    def __init__(self, cache_dir: str = "data/cache/options", compression: str = "snappy"):
+        self.cache_dir = cache_dir
+        self.compression = compression
+        # 最近一次清理时的交易日，跨日后的首次写入触发清理
+        self._pruned_date: Optional[str] = None
+
+    def _get_path(self, symbol: str, expiry: str) -> str:
+        """缓存路径: {cache_dir}/{symbol}/{trading_date}/{md5}.parquet"""
+        trading_date = _market_now().strftime("%Y%m%d")
+        key = hashlib.md5(f"{symbol}|{expiry}|{trading_date}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, symbol, trading_date, f"{key}.parquet")
+
+    def list_files(self, symbols: Optional[List[str]] = None) -> List[str]:
+        """列出当前交易日、仍在有效期内的缓存文件（可按标的过滤）"""
+        trading_date = _market_now().strftime("%Y%m%d")
+        symbol_dirs = symbols if symbols else ['*']
+        ttl = calculate_options_ttl()
+        now = time.time()
+        files = []
+        for symbol in symbol_dirs:
+            for path in glob.glob(os.path.join(self.cache_dir, symbol, trading_date, "*.parquet")):
+                try:
+                    if now - os.path.getmtime(path) <= ttl:
+                        files.append(path)
+                except OSError:
+                    continue
+        return files
+
+    def get(self, symbol: str, expiry: str) -> Optional[pd.DataFrame]:
+        """读取未过期的缓存，未命中返回 None"""
+        path = self._get_path(symbol, expiry)
+        if not os.path.exists(path):
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) > calculate_options_ttl():
+                return None
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.warning("Failed to load option cache: %s", e)
+            return None
+
+    def prune(self, keep_days: int = 1) -> int:
+        """删除早于 keep_days 个自然日之前的交易日目录（只读当日数据，旧目录不再使用），返回删除数量"""
+        cutoff = (_market_now() - timedelta(days=keep_days)).strftime("%Y%m%d")
+        removed = 0
+        for date_dir in glob.glob(os.path.join(glob.escape(self.cache_dir), "*", "*")):
+            name = os.path.basename(date_dir)
+            if not (len(name) == 8 and name.isdigit() and name < cutoff and os.path.isdir(date_dir)):
+                continue
+            try:
+                shutil.rmtree(date_dir)
+                removed += 1
+                symbol_dir = os.path.dirname(date_dir)
+                if not os.listdir(symbol_dir):
+                    os.rmdir(symbol_dir)
+            except OSError as e:
+                logger.debug("清理期权链缓存目录 %s 失败: %s", date_dir, e)
+        if removed:
+            logger.info("Removed %d stale option cache directories from %s", removed, self.cache_dir)
+        return removed
+
+    def set(self, symbol: str, expiry: str, frame: pd.DataFrame):
+        """写入缓存（每个交易日首次写入时顺带清理旧目录）"""
+        trading_date = _market_now().strftime("%Y%m%d")
+        if self._pruned_date != trading_date:
+            self._pruned_date = trading_date
+            self.prune()
+        path = self._get_path(symbol, expiry)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            frame.to_parquet(path, compression=self.compression, index=False)
+        except Exception as e:
+            logger.warning("Failed to save option cache: %s", e)
@@ -2,13 +2,22 @@
 数据收集器主接口
 Main interface for data collection
 """
-from .base import StockDataCollector, OptionsDataCollector, MarketDataCollector
-from typing import Dict, List, Tuple
+from .base import StockDataCollector, OptionsDataCollector, MarketDataCollector, _cached_ticker
+from config.config import KNOWN_SYMBOLS
+from typing import Dict, List, Optional, Tuple
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# 市场环境（VIX/SPY）变化较慢，按 15 分钟分桶缓存
+_MARKET_CONTEXT_TTL_SECONDS = 900
+
+# 代码校验结果缓存时间（秒）
+_SYMBOL_VALIDATION_TTL_SECONDS = 3600
+
 class DataManager:
     """数据管理器 - 统一数据收集接口"""
     
@@ -16,6 +25,8 @@ class DataManager:
         self.stock_collector = StockDataCollector(cache_dir)
         self.options_collector = OptionsDataCollector(cache_dir)
         self.market_collector = MarketDataCollector(cache_dir)
+        self._market_context_cache: Optional[Tuple[int, Dict]] = None
+        self._validation_cache: Dict[str, Tuple[float, bool]] = {}
     
     def get_complete_stock_data(self, symbol: str) -> Dict:
         """获取完整的股票数据"""
@@ -38,71 +49,112 @@ class DataManager:
                 'basic_info': stock_info,
                 'current_volatility': current_volatility,
                 'expirations': expirations,
-                'historical_data': historical_data.to_dict() if not historical_data.empty else {},
+                # 直接保留 DataFrame（列式存储），不再展开为嵌套字典
+                'historical_data': historical_data,
                 'timestamp': datetime.now().isoformat()
             }
             
         except Exception as e:
-            logger.error(f"Error getting complete stock data for {symbol}: {e}")
+            logger.error("Error getting complete stock data for %s: %s", symbol, e)
             return {}
     
     def get_trading_opportunities(self, symbols: List[str], 
                                 target_dte_range: Tuple[int, int] = (14, 45)) -> Dict:
-        """获取交易机会数据"""
-        opportunities = {}
+        """获取交易机会数据（各标的并发获取，结果按输入顺序组装）"""
         min_dte, max_dte = target_dte_range
-        
-        for symbol in symbols:
+        unique_symbols = list(dict.fromkeys(symbols))
+        # 历史行情先合并批量下载写入缓存，逐标的分析时 get_historical_data 直接命中
+        if len(unique_symbols) > 1:
             try:
-                logger.info(f"Analyzing {symbol}...")
-                
-                # 获取股票基本数据
-                stock_data = self.get_complete_stock_data(symbol)
-                if not stock_data:
+                self.stock_collector.get_historical_data_batch(unique_symbols)
+            except Exception as e:
+                logger.warning("Error prefetching historical data: %s", e)
+        results = self.options_collector.map_parallel(
+            self._analyze_symbol, [(symbol, min_dte, max_dte) for symbol in unique_symbols]
+        )
+        return {
+            symbol: result
+            for symbol, result in zip(unique_symbols, results)
+            if result is not None
+        }
+    
+    def _analyze_symbol(self, symbol: str, min_dte: int, max_dte: int) -> Optional[Dict]:
+        """获取单个标的在目标到期区间内的流动性期权链，无机会或出错时返回 None"""
+        try:
+            logger.info("Analyzing %s...", symbol)
+            
+            # 获取股票基本数据
+            stock_data = self.get_complete_stock_data(symbol)
+            if not stock_data:
+                return None
+            
+            symbol_opportunities = []
+            
+            # 只分析目标到期时间范围内的期权
+            now = datetime.now()
+            target_expiries = []
+            for expiry in stock_data.get('expirations', []):
+                try:
+                    # 计算到期天数
+                    days_to_expiry = (datetime.strptime(expiry, '%Y-%m-%d') - now).days
+                except (TypeError, ValueError) as e:
+                    logger.warning("Error processing expiry %s for %s: %s", expiry, symbol, e)
                     continue
+                if min_dte <= days_to_expiry <= max_dte:
+                    target_expiries.append((expiry, days_to_expiry))
+            
+            # 各到期日的期权链并发获取（外层已按标的并发，这里限制线程数）
+            chains = self.options_collector.map_parallel(
+                self._fetch_liquid_chain, [(symbol, expiry) for expiry, _ in target_expiries],
+                max_workers=8
+            )
+            for (expiry, days_to_expiry), liquid_options in zip(target_expiries, chains):
+                if liquid_options and (liquid_options['calls'] or liquid_options['puts']):
+                    symbol_opportunities.append({
+                        'expiry_date': expiry,
+                        'days_to_expiry': days_to_expiry,
+                        'options_data': liquid_options
+                    })
+            
+            if not symbol_opportunities:
+                return None
+            return {
+                'stock_data': stock_data,
+                'opportunities': symbol_opportunities
+            }
                 
-                symbol_opportunities = []
-                
-                # 分析每个到期日
-                for expiry in stock_data.get('expirations', []):
-                    try:
-                        # 计算到期天数
-                        expiry_date = datetime.strptime(expiry, '%Y-%m-%d')
-                        days_to_expiry = (expiry_date - datetime.now()).days
-                        
-                        # 只分析目标到期时间范围内的期权
-                        if min_dte <= days_to_expiry <= max_dte:
-                            options_data = self.options_collector.get_options_chain(symbol, expiry)
-                            
-                            if options_data:
-                                # 筛选流动性好的期权
-                                liquid_options = self.options_collector.filter_liquid_options(options_data)
-                                
-                                if liquid_options and (liquid_options['calls'] or liquid_options['puts']):
-                                    symbol_opportunities.append({
-                                        'expiry_date': expiry,
-                                        'days_to_expiry': days_to_expiry,
-                                        'options_data': liquid_options
-                                    })
-                    
-                    except Exception as e:
-                        logger.warning(f"Error processing expiry {expiry} for {symbol}: {e}")
-                        continue
-                
-                if symbol_opportunities:
-                    opportunities[symbol] = {
-                        'stock_data': stock_data,
-                        'opportunities': symbol_opportunities
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Error analyzing {symbol}: {e}")
-                continue
-        
-        return opportunities
+        except Exception as e:
+            logger.error("Error analyzing %s: %s", symbol, e)
+            return None
+    
+    def _fetch_liquid_chain(self, symbol: str, expiry: str) -> Dict:
+        """获取单个到期日的期权链并筛选流动性（失败返回空字典）"""
+        try:
+            # 在期权链 DataFrame 上直接筛选流动性好的期权
+            return self.options_collector.get_liquid_options_chain(symbol, expiry)
+        except Exception as e:
+            logger.warning("Error processing expiry %s for %s: %s", expiry, symbol, e)
+            return {}
     
     def get_market_context(self) -> Dict:
-        """获取市场环境数据"""
+        """获取市场环境数据（15 分钟内复用结果）"""
+        bucket = int(time.time() // _MARKET_CONTEXT_TTL_SECONDS)
+        if self._market_context_cache is not None and self._market_context_cache[0] == bucket:
+            return dict(self._market_context_cache[1])
+        
+        market_context = self._compute_market_context()
+        if market_context:
+            self._market_context_cache = (bucket, market_context)
+        return dict(market_context)
+    
+    def clear_caches(self):
+        """清除内存中的行情缓存（市场环境、代码校验结果、Ticker 实例；磁盘缓存按 TTL 失效）"""
+        self._market_context_cache = None
+        self._validation_cache.clear()
+        _cached_ticker.cache_clear()
+    
+    def _compute_market_context(self) -> Dict:
+        """计算市场环境数据"""
         try:
             market_sentiment = self.market_collector.get_market_sentiment()
             
@@ -131,18 +183,80 @@ class DataManager:
             return market_sentiment
             
         except Exception as e:
-            logger.error(f"Error getting market context: {e}")
+            logger.error("Error getting market context: %s", e)
             return {}
     
+    def _get_cached_validation(self, symbol: str) -> Optional[bool]:
+        """读取未过期的代码校验结果"""
+        entry = self._validation_cache.get(symbol)
+        if entry is not None and time.time() - entry[0] < _SYMBOL_VALIDATION_TTL_SECONDS:
+            return entry[1]
+        return None
+    
     def validate_symbol(self, symbol: str) -> bool:
         """验证股票代码是否有效"""
+        if symbol in KNOWN_SYMBOLS:
+            return True
+        cached = self._get_cached_validation(symbol)
+        if cached is not None:
+            return cached
         try:
-            stock_info = self.stock_collector.get_stock_info(symbol)
-            return bool(stock_info and stock_info.get('current_price', 0) > 0)
+            is_valid = self.stock_collector.quick_validate(symbol)
+            # 单代码接口无法区分网络失败与无效代码，只缓存有效结果
+            if is_valid:
+                self._validation_cache[symbol] = (time.time(), True)
+            return is_valid
         except Exception as e:
-            logger.error(f"Error validating symbol {symbol}: {e}")
+            logger.error("Error validating symbol %s: %s", symbol, e)
             return False
     
+    def validate_symbols(self, symbols: List[str], max_workers: int = 8) -> Dict[str, bool]:
+        """并发验证多个股票代码，返回 {代码: 是否有效}"""
+        unique_symbols = list(dict.fromkeys(symbols))
+        if not unique_symbols:
+            return {}
+        
+        # 已知代码无需网络请求
+        results = {s: True for s in unique_symbols if s in KNOWN_SYMBOLS}
+        pending = [s for s in unique_symbols if s not in results]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                results.update(zip(pending, executor.map(self.validate_symbol, pending)))
+        return results
+    
+    def validate_symbols_batch(self, symbols: List[str], batch_size: int = 20) -> Dict[str, bool]:
+        """批量验证股票代码：每 batch_size 个代码一次报价请求，失败的批次回退逐个验证"""
+        unique_symbols = list(dict.fromkeys(symbols))
+        results = {s: True for s in unique_symbols if s in KNOWN_SYMBOLS}
+        for s in unique_symbols:
+            if s not in results:
+                cached = self._get_cached_validation(s)
+                if cached is not None:
+                    results[s] = cached
+        pending = [s for s in unique_symbols if s not in results]
+        
+        fallback = []
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            prices = self.stock_collector.get_quote_prices(chunk)
+            if prices is None:
+                fallback.extend(chunk)
+                continue
+            now = time.time()
+            for s in chunk:
+                if s not in prices:
+                    # 响应中缺失的代码无法判断真伪，交给逐个验证
+                    fallback.append(s)
+                    continue
+                results[s] = prices[s] > 0
+                # 与 validate_symbol 一致：只缓存有效结果
+                if results[s]:
+                    self._validation_cache[s] = (now, True)
+        
+        if fallback:
+            results.update(self.validate_symbols(fallback))
+        return results
+    
     def get_popular_symbols(self) -> List[str]:
         """获取热门股票代码列表"""
         return [
@@ -2,44 +2,117 @@
 GitHub 公开项目股票池加载器
 Load index constituents from public GitHub-backed CSV sources.
 """
+import hashlib
+import io
+import json
 import logging
+import os
 import re
-from typing import Dict, Iterable, List, Optional, Sequence
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 
+import numpy as np
 import pandas as pd
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    _HAS_REQUESTS = True
+except Exception:
+    _HAS_REQUESTS = False
+
 logger = logging.getLogger(__name__)
 
+_HTTP_TIMEOUT_SECONDS = 15
+
+# 模块级连接池会话：多个指数源复用 TCP/TLS 连接
+if _HAS_REQUESTS:
+    _SESSION = requests.Session()
+    _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    _SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 
 class GitHubStockPoolProvider:
     """从 GitHub 公开项目加载指数成分股，并构建精选池"""
 
     _SYMBOL_PATTERN = re.compile(r"^[A-Z]{1,5}(\.[A-Z])?$")
 
-    def __init__(self, source_config: Dict, preferred_symbols: Optional[Sequence[str]] = None):
+    def __init__(self, source_config: Dict, preferred_symbols: Optional[Sequence[str]] = None,
+                 cache_dir: str = "data/cache/indices"):
         self.source_config = source_config or {}
+        self.cache_dir = cache_dir
         self.preferred_symbols = [s.upper() for s in (preferred_symbols or [])]
         self._cache: Dict[str, List[str]] = {}
+        # 并发下载多个指数时保护 _cache 写入
+        self._cache_lock = threading.Lock()
 
     @classmethod
     def _normalize_symbols(cls, symbols: Iterable[str]) -> List[str]:
-        normalized: List[str] = []
-        seen = set()
-        for raw in symbols:
-            if raw is None or (isinstance(raw, float) and pd.isna(raw)):
-                continue
-            symbol = str(raw).strip().upper()
-            if not symbol:
-                continue
-            if symbol in {"NAN", "NONE"}:
-                continue
-            if not cls._SYMBOL_PATTERN.match(symbol):
-                continue
-            if symbol in seen:
-                continue
-            seen.add(symbol)
-            normalized.append(symbol)
-        return normalized
+        """清洗代码列表：去空值、大写、格式校验并按首次出现顺序去重（pandas 字符串向量化实现）"""
+        series = symbols if isinstance(symbols, pd.Series) else pd.Series(list(symbols), dtype=object)
+        series = series.dropna().astype(str).str.strip().str.upper()
+        series = series[series.str.match(cls._SYMBOL_PATTERN, na=False)]
+        series = series[~series.isin(("NAN", "NONE"))]
+        return series.drop_duplicates().tolist()
+
+    def _fetch_csv(self, url: str) -> Union[str, io.BytesIO]:
+        """下载 CSV（带 ETag / Last-Modified 条件请求，304 时读本地副本）；非 HTTP 地址原样返回"""
+        if not _HAS_REQUESTS or not url.startswith(("http://", "https://")):
+            return url
+
+        key = hashlib.md5(url.encode("utf-8")).hexdigest()
+        csv_path = os.path.join(self.cache_dir, f"{key}.csv")
+        meta_path = os.path.join(self.cache_dir, f"{key}.meta.json")
+
+        headers = {}
+        if os.path.exists(csv_path):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+            except (OSError, ValueError):
+                pass
+
+        try:
+            response = _SESSION.get(url, headers=headers, timeout=_HTTP_TIMEOUT_SECONDS)
+            if response.status_code == 304 and headers:
+                logger.debug("%s 未变化，使用本地副本", url)
+                with open(csv_path, "rb") as f:
+                    return io.BytesIO(f.read())
+            response.raise_for_status()
+        except Exception as e:
+            if not os.path.exists(csv_path):
+                raise
+            # 网络不可用时退回上次下载的副本
+            logger.warning("下载 %s 失败，使用本地副本: %s", url, e)
+            with open(csv_path, "rb") as f:
+                return io.BytesIO(f.read())
+
+        body = response.content
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(csv_path, "wb") as f:
+                f.write(body)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }, f)
+        except OSError as e:
+            logger.warning("无法写入指数缓存 %s: %s", csv_path, e)
+        return io.BytesIO(body)
+
+    @staticmethod
+    def _symbol_column_filter(source: Dict):
+        """read_csv 的 usecols 过滤器：保留配置的代码列及 symbol/ticker 通用列名"""
+        candidates = set(source.get("symbol_columns", []))
+        return lambda col: col in candidates or str(col).lower() in ("symbol", "ticker")
 
     def _resolve_symbol_column(self, df: pd.DataFrame, source: Dict) -> str:
         candidates = source.get("symbol_columns", [])
@@ -56,8 +129,10 @@ class GitHubStockPoolProvider:
     def get_index_symbols(self, index_code: str) -> List[str]:
         """获取某个指数的全部成分股代码"""
         key = index_code.strip().lower()
-        if key in self._cache:
-            return list(self._cache[key])
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
 
         source = (self.source_config.get("sources", {}) or {}).get(key)
         if not source:
@@ -67,14 +142,16 @@ class GitHubStockPoolProvider:
         if not url:
             raise ValueError(f"{index_code} 缺少数据源 URL")
 
-        df = pd.read_csv(url)
+        # 只解析可能的代码列，其余列（名称、行业等）在 C 解析器中直接跳过
+        df = pd.read_csv(self._fetch_csv(url), usecols=self._symbol_column_filter(source), dtype=str)
         symbol_col = self._resolve_symbol_column(df, source)
-        symbols = self._normalize_symbols(df[symbol_col].tolist())
+        symbols = self._normalize_symbols(df[symbol_col])
 
         if not symbols:
             raise ValueError(f"{index_code} 未解析出有效股票代码")
 
-        self._cache[key] = symbols
+        with self._cache_lock:
+            self._cache[key] = symbols
         return list(symbols)
 
     def _build_curated(self, universe: Sequence[str], size: int) -> List[str]:
@@ -87,25 +164,33 @@ class GitHubStockPoolProvider:
             if s in universe_set
         ]
         preferred = self._normalize_symbols(preferred)
+        if size <= len(preferred):
+            return preferred[:size]
 
-        remaining = sorted(s for s in universe if s not in set(preferred))
-        curated = preferred + remaining
-        return curated[:size]
+        preferred_set = set(preferred)
+        # 定长 Unicode 数组排序在 C 层完成，顺序与 sorted() 一致
+        remaining = np.array([s for s in universe if s not in preferred_set], dtype=str)
+        remaining.sort()
+        return preferred + remaining[:size - len(preferred)].tolist()
 
     def get_curated_symbols(self, index_code: str, size: int) -> List[str]:
         """获取单一指数精选池（优先保留常用热门股票）"""
         universe = self.get_index_symbols(index_code)
         return self._build_curated(universe, size)
 
+    def _fetch_index(self, index_code: str) -> List[str]:
+        """线程池任务：下载单个指数成分股"""
+        return self.get_index_symbols(index_code)
+
     def get_combined_curated_symbols(self, index_codes: Sequence[str], size: int) -> List[str]:
         """获取多指数合并精选池"""
-        merged: List[str] = []
-        seen = set()
-        for code in index_codes:
-            symbols = self.get_index_symbols(code)
-            for symbol in symbols:
-                if symbol in seen:
-                    continue
-                seen.add(symbol)
-                merged.append(symbol)
+        codes = list(index_codes)
+        if len(codes) > 1:
+            # 各指数 CSV 下载互不依赖，并发执行；executor.map 保持输入顺序
+            with ThreadPoolExecutor(max_workers=min(len(codes), 8)) as executor:
+                per_index = list(executor.map(self._fetch_index, codes))
+        else:
+            per_index = [self._fetch_index(code) for code in codes]
+        # dict.fromkeys 去重并保持指数顺序
+        merged = list(dict.fromkeys(chain.from_iterable(per_index)))
         return self._build_curated(merged, size)
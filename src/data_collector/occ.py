@@ -0,0 +1,49 @@
+"""
+OCC 期权代码解析
+Parser for OCC option contract symbols, e.g. AAPL240119C00150000
+"""
+import re
+from datetime import date
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+# 标的代码 + YYMMDD + C/P + 8 位执行价（千分之一美元）
+_OCC_PATTERN = re.compile(r'^([A-Z0-9.]+?)(\d{2})(\d{2})(\d{2})([CP])(\d{8})$')
+
+
+class OCCSymbol(NamedTuple):
+    """解析后的 OCC 合约代码"""
+    root: str
+    expiry: date
+    option_type: str
+    strike: float
+
+
+def parse_occ_symbol(symbol: str) -> Optional[OCCSymbol]:
+    """解析单个 OCC 代码，无法识别时返回 None"""
+    match = _OCC_PATTERN.match(symbol.strip().upper()) if symbol else None
+    if match is None:
+        return None
+    root, yy, mm, dd, cp, strike8 = match.groups()
+    try:
+        expiry = date(2000 + int(yy), int(mm), int(dd))
+    except ValueError:
+        return None
+    return OCCSymbol(root, expiry, 'call' if cp == 'C' else 'put', int(strike8) / 1000.0)
+
+
+def parse_occ_symbols(symbols: pd.Series) -> pd.DataFrame:
+    """批量解析 OCC 代码列，返回 root/expiry/option_type/strike 四列"""
+    parts = symbols.astype(str).str.strip().str.upper().str.extract(_OCC_PATTERN)
+    expiry = pd.to_datetime(
+        '20' + parts[1] + '-' + parts[2] + '-' + parts[3], format='%Y-%m-%d', errors='coerce'
+    )
+    frame = pd.DataFrame({
+        'root': parts[0],
+        'expiry': expiry,
+        'option_type': parts[4].map({'C': 'call', 'P': 'put'}),
+        'strike': pd.to_numeric(parts[5], errors='coerce') / 1000.0,
+    }, index=symbols.index)
+    # 日期非法（如 2 月 30 日）的行整体置空，与 parse_occ_symbol 返回 None 一致
+    return frame.where(expiry.notna())
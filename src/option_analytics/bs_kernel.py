@@ -0,0 +1,130 @@
+"""
+批量 Black-Scholes 计算内核
+Vectorized Black-Scholes Greeks / probability kernel (Numba-accelerated when available)
+"""
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+from scipy.special import ndtr
+
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+# 批量输出精度
+GREEKS_DTYPE = np.float32
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _score_batch_jit(S, K, T, r, iv, cp_flag, premium):
+        n = S.shape[0]
+        delta = np.zeros(n)
+        gamma = np.zeros(n)
+        theta = np.zeros(n)
+        vega = np.zeros(n)
+        pop = np.zeros(n)
+        for i in prange(n):
+            is_call = cp_flag[i] > 0
+            threshold = K[i] + premium[i] if is_call else K[i] - premium[i]
+
+            if T[i] <= 0 or iv[i] <= 0:
+                # 到期或无波动率：退化为内在价值判断
+                delta[i] = 1.0 if (is_call and S[i] > K[i]) else 0.0
+                below = 1.0 if S[i] <= threshold else 0.0
+            else:
+                sqrt_t = math.sqrt(T[i])
+                sig_t = iv[i] * sqrt_t
+                d1 = (math.log(S[i] / K[i]) + (r + 0.5 * iv[i] * iv[i]) * T[i]) / sig_t
+                d2 = d1 - sig_t
+                pdf_d1 = math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+                disc = K[i] * math.exp(-r * T[i])
+                if is_call:
+                    delta[i] = 0.5 * (1.0 + math.erf(d1 / math.sqrt(2.0)))
+                    carry = -r * disc * 0.5 * (1.0 + math.erf(d2 / math.sqrt(2.0)))
+                else:
+                    delta[i] = -0.5 * (1.0 + math.erf(-d1 / math.sqrt(2.0)))
+                    carry = r * disc * 0.5 * (1.0 + math.erf(-d2 / math.sqrt(2.0)))
+                gamma[i] = pdf_d1 / (S[i] * sig_t)
+                theta[i] = (-(S[i] * pdf_d1 * iv[i]) / (2.0 * sqrt_t) + carry) / 365.0
+                vega[i] = S[i] * pdf_d1 * sqrt_t / 100.0
+                if threshold > 0:
+                    z = (math.log(threshold / S[i]) + 0.5 * iv[i] * iv[i] * T[i]) / sig_t
+                    below = 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+                else:
+                    below = 0.0
+
+            if S[i] <= 0 or threshold <= 0:
+                below = 0.0
+            p = below if is_call else 1.0 - below
+            pop[i] = min(1.0, max(0.0, p))
+        return delta, gamma, theta, vega, pop
+
+
+def _score_batch_numpy(S, K, T, r, iv, cp_flag, premium):
+    """NumPy 向量化实现（未安装 numba 时使用）"""
+    is_call = cp_flag > 0
+    threshold = np.where(is_call, K + premium, K - premium)
+    live = (T > 0) & (iv > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrt_t = np.sqrt(np.where(live, T, 1.0))
+        sig = np.where(live, iv, 1.0)
+        sig_t = sig * sqrt_t
+        d1 = (np.log(S / K) + (r + 0.5 * sig ** 2) * np.where(live, T, 1.0)) / sig_t
+        d2 = d1 - sig_t
+        pdf_d1 = np.exp(-0.5 * d1 ** 2) * _INV_SQRT_2PI
+        disc = K * np.exp(-r * np.where(live, T, 0.0))
+
+        delta = np.where(is_call, ndtr(d1), -ndtr(-d1))
+        carry = np.where(is_call, -r * disc * ndtr(d2), r * disc * ndtr(-d2))
+        gamma = pdf_d1 / (S * sig_t)
+        theta = (-(S * pdf_d1 * sig) / (2.0 * sqrt_t) + carry) / 365.0
+        vega = S * pdf_d1 * sqrt_t / 100.0
+
+        z = (np.log(threshold / S) + 0.5 * sig ** 2 * np.where(live, T, 1.0)) / sig_t
+        below = np.where(live, ndtr(z), (S <= threshold).astype(float))
+
+    expired_delta = np.where(is_call & (S > K), 1.0, 0.0)
+    delta = np.where(live, delta, expired_delta)
+    gamma = np.where(live, gamma, 0.0)
+    theta = np.where(live, theta, 0.0)
+    vega = np.where(live, vega, 0.0)
+
+    below = np.where((S <= 0) | (threshold <= 0), 0.0, below)
+    pop = np.clip(np.where(is_call, below, 1.0 - below), 0.0, 1.0)
+    return delta, gamma, theta, vega, pop
+
+
+def score_batch(S, K, T, r: float, iv, cp_flag, premium) -> Tuple[np.ndarray, ...]:
+    """批量计算 (delta, gamma, theta, vega, 卖方盈利概率)
+
+    cp_flag: 1 表示看涨，-1 表示看跌；premium 用于计算盈亏平衡点。
+    口径与 BlackScholesCalculator.calculate_greeks 及
+    ProbabilityCalculator.prob_profit_short_option 一致。
+    内部以 float64 计算，输出为 float32（Greeks 展示/筛选只需约 3 位小数，内存减半）。
+    """
+    S, K, T, iv, premium = (
+        np.ascontiguousarray(a, dtype=np.float64) for a in (S, K, T, iv, premium)
+    )
+    cp_flag = np.ascontiguousarray(cp_flag, dtype=np.int64)
+    if _HAS_NUMBA:
+        results = _score_batch_jit(S, K, T, float(r), iv, cp_flag, premium)
+    else:
+        results = _score_batch_numpy(S, K, T, float(r), iv, cp_flag, premium)
+    return tuple(a.astype(GREEKS_DTYPE) for a in results)
+
+
+def greeks(S, K, T, r: float, sigma, is_call) -> Dict[str, np.ndarray]:
+    """批量计算单腿期权的 Greeks，返回 {'delta','gamma','theta','vega'} 数组（口径同 score_batch）"""
+    is_call = np.asarray(is_call, dtype=bool)
+    cp_flag = np.where(is_call, 1, -1)
+    delta, gamma, theta, vega, _ = score_batch(
+        S, K, T, r, sigma, cp_flag, np.zeros(cp_flag.shape, dtype=np.float64)
+    )
+    return {'delta': delta, 'gamma': gamma, 'theta': theta, 'vega': vega}
@@ -46,7 +46,7 @@ class BlackScholesCalculator:
             return max(price, 0)
             
         except Exception as e:
-            logger.error(f"Error calculating option price: {e}")
+            logger.error("Error calculating option price: %s", e)
             return 0
     
     @classmethod
@@ -102,7 +102,7 @@ class BlackScholesCalculator:
             }
             
         except Exception as e:
-            logger.error(f"Error calculating Greeks: {e}")
+            logger.error("Error calculating Greeks: %s", e)
             return {
                 'delta': 0.0,
                 'gamma': 0.0,
@@ -127,7 +127,7 @@ class BlackScholesCalculator:
             return iv
             
         except Exception as e:
-            logger.warning(f"Could not calculate implied volatility: {e}")
+            logger.warning("Could not calculate implied volatility: %s", e)
             return 0
 
 class ProbabilityCalculator:
@@ -167,7 +167,7 @@ class ProbabilityCalculator:
             return max(0, min(1, prob))
             
         except Exception as e:
-            logger.error(f"Error calculating profit probability: {e}")
+            logger.error("Error calculating profit probability: %s", e)
             return 0
     
     @staticmethod
@@ -189,7 +189,7 @@ class ProbabilityCalculator:
             return max(0, min(1, prob))
             
         except Exception as e:
-            logger.error(f"Error calculating expiration probability: {e}")
+            logger.error("Error calculating expiration probability: %s", e)
             return 0
     
     @staticmethod
@@ -199,7 +199,7 @@ class ProbabilityCalculator:
             move = S * sigma * np.sqrt(T)
             return S - move, S + move
         except Exception as e:
-            logger.error(f"Error calculating expected move: {e}")
+            logger.error("Error calculating expected move: %s", e)
             return S, S
 
 class OptionAnalyzer:
@@ -304,7 +304,7 @@ class OptionAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing option: {e}")
+            logger.error("Error analyzing option: %s", e)
             return {}
     
     def analyze_options_chain(self, options_data: Dict, stock_price: float, 
@@ -337,5 +337,5 @@ class OptionAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing options chain: {e}")
+            logger.error("Error analyzing options chain: %s", e)
             return {}
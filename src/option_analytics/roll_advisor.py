@@ -4,7 +4,7 @@ Roll Advisor - suggests roll strategies for existing positions
 """
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,11 @@ class RollAdvisor:
 
     def suggest_rolls(self, position: Dict,
                       current_stock_price: float) -> List[Dict]:
+        """为一个持仓生成所有可行的滚仓方案（列表形式，字段见 iter_rolls）"""
+        return list(self.iter_rolls(position, current_stock_price))
+
+    def iter_rolls(self, position: Dict,
+                   current_stock_price: float) -> Iterator[Dict]:
         """
         为一个持仓生成所有可行的滚仓方案
 
@@ -25,8 +30,8 @@ class RollAdvisor:
                       expiry_date, premium_per_contract, contracts
             current_stock_price: 当前股票价格
 
-        Returns:
-            List[Dict] 滚仓方案列表，每个方案包含:
+        Yields:
+            Dict 滚仓方案（逐个产出，调用方可边生成边渲染），包含:
                 - roll_type: 滚仓类型 (roll_out / roll_down_out / roll_up_out)
                 - label: 中文描述
                 - new_strike: 新的执行价
@@ -43,7 +48,7 @@ class RollAdvisor:
         contracts = position.get('contracts', 1)
 
         if not symbol or strike <= 0:
-            return []
+            return
 
         try:
             expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d')
@@ -51,7 +56,6 @@ class RollAdvisor:
             expiry_date = datetime.now()
 
         current_dte = (expiry_date - datetime.now()).days
-        suggestions = []
 
         # 判断持仓状态
         if strategy_type in ('cash_secured_put', 'short_put'):
@@ -70,7 +74,7 @@ class RollAdvisor:
             original_premium, current_dte, is_itm, is_threatened
         )
         if roll_out:
-            suggestions.append(roll_out)
+            yield roll_out
 
         # ===== Roll Down + Out (降低 Strike + 延期, 适用于 Put) =====
         if strategy_type in ('cash_secured_put', 'short_put'):
@@ -79,7 +83,7 @@ class RollAdvisor:
                 original_premium, current_dte, is_itm
             )
             if roll_down:
-                suggestions.append(roll_down)
+                yield roll_down
 
         # ===== Roll Up + Out (提高 Strike + 延期, 适用于 Call) =====
         if strategy_type in ('covered_call', 'short_call'):
@@ -88,9 +92,7 @@ class RollAdvisor:
                 original_premium, current_dte, is_itm
             )
             if roll_up:
-                suggestions.append(roll_up)
-
-        return suggestions
+                yield roll_up
 
     def _build_roll_out(self, symbol: str, strategy_type: str,
                         strike: float, stock_price: float,
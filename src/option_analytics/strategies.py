@@ -70,7 +70,7 @@ class StrategyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing covered call: {e}")
+            logger.error("Error analyzing covered call: %s", e)
             return {}
     
     def analyze_cash_secured_put(self, stock_price: float, put_data: Dict, 
@@ -127,7 +127,7 @@ class StrategyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing cash secured put: {e}")
+            logger.error("Error analyzing cash secured put: %s", e)
             return {}
     
     def analyze_iron_condor(self, stock_price: float, call_short: Dict, call_long: Dict,
@@ -194,7 +194,7 @@ class StrategyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing iron condor: {e}")
+            logger.error("Error analyzing iron condor: %s", e)
             return {}
     
     def analyze_short_strangle(self, stock_price: float, call_data: Dict, put_data: Dict,
@@ -302,7 +302,7 @@ class StrategyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing short strangle: {e}")
+            logger.error("Error analyzing short strangle: %s", e)
             return {}
     
     def analyze_bull_put_spread(self, stock_price: float, put_short_data: Dict,
@@ -378,7 +378,7 @@ class StrategyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing bull put spread: {e}")
+            logger.error("Error analyzing bull put spread: %s", e)
             return {}
     
     def analyze_bear_call_spread(self, stock_price: float, call_short_data: Dict,
@@ -452,7 +452,7 @@ class StrategyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing bear call spread: {e}")
+            logger.error("Error analyzing bear call spread: %s", e)
             return {}
     
     def rank_selling_opportunities(self, opportunities: List[Dict]) -> List[Dict]:
@@ -521,5 +521,5 @@ class StrategyAnalyzer:
             return scored_opportunities
             
         except Exception as e:
-            logger.error(f"Error ranking opportunities: {e}")
+            logger.error("Error ranking opportunities: %s", e)
             return opportunities
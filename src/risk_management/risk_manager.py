@@ -66,7 +66,7 @@ class RiskCalculator:
             return risk_metrics
             
         except Exception as e:
-            logger.error(f"Error calculating position risk: {e}")
+            logger.error("Error calculating position risk: %s", e)
             return {}
     
     def calculate_portfolio_risk(self, positions: List[Dict]) -> Dict:
@@ -102,7 +102,7 @@ class RiskCalculator:
             return portfolio_metrics
             
         except Exception as e:
-            logger.error(f"Error calculating portfolio risk: {e}")
+            logger.error("Error calculating portfolio risk: %s", e)
             return {}
     
     def _calculate_margin_requirement(self, strategy_analysis: Dict, position_size: int) -> float:
@@ -142,7 +142,7 @@ class RiskCalculator:
                 return stock_price * 100 * 0.2 * position_size
                 
         except Exception as e:
-            logger.error(f"Error calculating margin requirement: {e}")
+            logger.error("Error calculating margin requirement: %s", e)
             return 0
     
     def _calculate_var(self, positions: List[Dict], confidence_level: float = 0.95) -> Dict:
@@ -175,7 +175,7 @@ class RiskCalculator:
             }
             
         except Exception as e:
-            logger.error(f"Error calculating VaR: {e}")
+            logger.error("Error calculating VaR: %s", e)
             return {'var_95': 0, 'var_99': 0, 'expected_shortfall': 0}
 
 class PositionSizer:
@@ -233,7 +233,7 @@ class PositionSizer:
             return sizing_info
             
         except Exception as e:
-            logger.error(f"Error calculating optimal size: {e}")
+            logger.error("Error calculating optimal size: %s", e)
             return {'recommended_size': 0, 'reason': f'Calculation error: {e}'}
 
 class RiskMonitor:
@@ -263,7 +263,7 @@ class RiskMonitor:
                 return "极高风险"
                 
         except Exception as e:
-            logger.error(f"Error assessing risk level: {e}")
+            logger.error("Error assessing risk level: %s", e)
             return "未知风险"
     
     def check_risk_violations(self, portfolio_metrics: Dict) -> List[str]:
@@ -287,7 +287,7 @@ class RiskMonitor:
                 violations.append(f"投资组合集中度过高 (多样化比率: {diversification:.2f})")
             
         except Exception as e:
-            logger.error(f"Error checking risk violations: {e}")
+            logger.error("Error checking risk violations: %s", e)
             violations.append(f"风险检查错误: {e}")
         
         return violations
@@ -328,7 +328,7 @@ class RiskMonitor:
                         alerts.append(f"{pos.get('symbol', '')} Delta值较高 ({delta:.3f})，风险增加")
         
         except Exception as e:
-            logger.error(f"Error generating risk alerts: {e}")
+            logger.error("Error generating risk alerts: %s", e)
             alerts.append(f"风险警报生成错误: {e}")
         
         return alerts
@@ -379,7 +379,7 @@ class RiskManager:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing trade risk: {e}")
+            logger.error("Error analyzing trade risk: %s", e)
             return {
                 'recommendation': 'ERROR',
                 'reason': f'风险分析错误: {e}',
@@ -419,7 +419,7 @@ class RiskManager:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing portfolio risk: {e}")
+            logger.error("Error analyzing portfolio risk: %s", e)
             return {
                 'portfolio_metrics': {},
                 'risk_violations': [f'投资组合风险分析错误: {e}'],
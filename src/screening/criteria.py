@@ -4,9 +4,11 @@ Screener configuration and utility functions
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
 import logging
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
@@ -104,7 +106,7 @@ class ScreeningUtils:
             
             return percentile
         except Exception as e:
-            logger.error(f"Error calculating IV rank: {e}")
+            logger.error("Error calculating IV rank: %s", e)
             return 50
     
     @staticmethod
@@ -122,7 +124,7 @@ class ScreeningUtils:
             diff = abs((target_date - earnings_date).days)
             return diff <= 7
         except Exception as e:
-            logger.warning(f"财报日期检查失败 {symbol}: {e}")
+            logger.warning("财报日期检查失败 %s: %s", symbol, e)
             return False
 
     @staticmethod
@@ -174,7 +176,7 @@ class ScreeningUtils:
             
             return score
         except Exception as e:
-            logger.error(f"Error calculating liquidity score: {e}")
+            logger.error("Error calculating liquidity score: %s", e)
             return 0
     
     @staticmethod
@@ -217,7 +219,7 @@ class ScreeningUtils:
             
             return score
         except Exception as e:
-            logger.error(f"Error calculating risk score: {e}")
+            logger.error("Error calculating risk score: %s", e)
             return 0
     
     @staticmethod
@@ -225,12 +227,12 @@ class ScreeningUtils:
         """基于技术分析筛选股票"""
         try:
             # 获取历史数据
-            historical_data = stock_data.get('historical_data', {})
-            if not historical_data:
+            historical_data = stock_data.get('historical_data')
+            if historical_data is None or len(historical_data) == 0:
                 return True  # 没有历史数据时不过滤
             
-            # 转换为DataFrame
-            df = pd.DataFrame(historical_data)
+            # 兼容旧的字典格式（如历史快照）
+            df = historical_data if isinstance(historical_data, pd.DataFrame) else pd.DataFrame(historical_data)
             if df.empty:
                 return True
             
@@ -262,7 +264,7 @@ class ScreeningUtils:
             return True
             
         except Exception as e:
-            logger.error(f"Error in technical analysis filter: {e}")
+            logger.error("Error in technical analysis filter: %s", e)
             return True
     
     @staticmethod
@@ -315,16 +317,17 @@ class ScreeningUtils:
             return pd.DataFrame(results)
             
         except Exception as e:
-            logger.error(f"Error formatting results: {e}")
+            logger.error("Error formatting results: %s", e)
             return pd.DataFrame()
 
 class PresetScreens:
-    """预设筛选条件"""
+    """预设筛选条件（结果只读并缓存，侧边栏每次重跑无需重建）"""
     
     @staticmethod
-    def conservative_income() -> Dict:
+    @lru_cache(maxsize=None)
+    def conservative_income() -> Mapping:
         """保守收入型筛选"""
-        return {
+        return MappingProxyType({
             'min_delta': 0.15,
             'max_delta': 0.3,
             'min_profit_probability': 70,
@@ -333,12 +336,13 @@ class PresetScreens:
             'min_open_interest': 200,
             'min_volume': 100,
             'max_bid_ask_spread_pct': 10
-        }
+        })
     
     @staticmethod
-    def aggressive_income() -> Dict:
+    @lru_cache(maxsize=None)
+    def aggressive_income() -> Mapping:
         """激进收入型筛选"""
-        return {
+        return MappingProxyType({
             'min_delta': 0.2,
             'max_delta': 0.45,
             'min_profit_probability': 50,
@@ -347,12 +351,13 @@ class PresetScreens:
             'min_open_interest': 100,
             'min_volume': 50,
             'max_bid_ask_spread_pct': 15
-        }
+        })
     
     @staticmethod
-    def high_probability() -> Dict:
+    @lru_cache(maxsize=None)
+    def high_probability() -> Mapping:
         """高概率筛选"""
-        return {
+        return MappingProxyType({
             'min_delta': 0.1,
             'max_delta': 0.25,
             'min_profit_probability': 75,
@@ -361,12 +366,13 @@ class PresetScreens:
             'min_open_interest': 300,
             'min_volume': 150,
             'max_bid_ask_spread_pct': 8
-        }
+        })
     
     @staticmethod
-    def earnings_plays() -> Dict:
+    @lru_cache(maxsize=None)
+    def earnings_plays() -> Mapping:
         """财报期筛选"""
-        return {
+        return MappingProxyType({
             'min_delta': 0.15,
             'max_delta': 0.35,
             'min_profit_probability': 60,
@@ -375,4 +381,4 @@ class PresetScreens:
             'min_iv_rank': 60,
             'min_open_interest': 500,
             'min_volume': 200
-        }
+        })
@@ -5,13 +5,17 @@ Options screening engine for finding optimal selling opportunities
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
+import heapq
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from ..data_collector.data_manager import DataManager
 from ..option_analytics.strategies import StrategyAnalyzer
 from ..option_analytics.pricing import OptionAnalyzer
+from ..option_analytics.bs_kernel import score_batch
 from .criteria import ScreeningUtils
+from config.config import SCREENING, STRATEGY
 
 logger = logging.getLogger(__name__)
 
@@ -23,23 +27,25 @@ class OptionsScreener:
         self.data_manager = DataManager()
         self.strategy_analyzer = StrategyAnalyzer()
         self.option_analyzer = OptionAnalyzer()
+        # screen_all_strategies 运行期间的交易数据缓存，避免各策略重复拉取
+        self._trading_data_memo: Optional[Dict[str, Dict]] = None
     
     def _default_config(self) -> Dict:
         """默认筛选配置"""
         return {
-            'min_days_to_expiry': 7,
-            'max_days_to_expiry': 60,
-            'min_open_interest': 100,
-            'min_volume': 50,
-            'min_delta': 0.1,
-            'max_delta': 0.5,
-            'min_iv_rank': 20,
+            'min_days_to_expiry': SCREENING.min_days_to_expiry,
+            'max_days_to_expiry': SCREENING.max_days_to_expiry,
+            'min_open_interest': SCREENING.min_open_interest,
+            'min_volume': SCREENING.min_volume,
+            'min_delta': SCREENING.min_delta,
+            'max_delta': SCREENING.max_delta,
+            'min_iv_rank': SCREENING.min_iv_rank,
             'min_bid_ask_spread_pct': 0,
             'max_bid_ask_spread_pct': 15,
             'min_annualized_return': 0,
             'min_profit_probability': 0,
-            'min_stock_price': 10,
-            'max_stock_price': 500,
+            'min_stock_price': STRATEGY.covered_call.min_stock_price,
+            'max_stock_price': STRATEGY.covered_call.max_stock_price,
             'target_strategies': ['covered_call', 'cash_secured_put', 'short_strangle',
                                  'bull_put_spread', 'bear_call_spread'],
             'max_results_per_symbol': 5,
@@ -50,6 +56,8 @@ class OptionsScreener:
 
     def _get_trading_data(self, symbol: str) -> Dict:
         """按当前筛选配置获取指定标的交易数据"""
+        if self._trading_data_memo is not None and symbol in self._trading_data_memo:
+            return self._trading_data_memo[symbol]
         min_dte = int(self.config.get('min_days_to_expiry', 7))
         max_dte = int(self.config.get('max_days_to_expiry', 60))
         if min_dte > max_dte:
@@ -64,7 +72,7 @@ class OptionsScreener:
         
         for symbol in symbols:
             try:
-                logger.info(f"Screening covered calls for {symbol}")
+                logger.info("Screening covered calls for %s", symbol)
                 
                 # 获取股票和期权数据
                 trading_data = self._get_trading_data(symbol)
@@ -94,25 +102,25 @@ class OptionsScreener:
                     
                     # 如果配置了避开财报且存在财报风险，跳过
                     if earnings_risk and self.config.get('avoid_earnings', False):
-                        logger.info(f"跳过 {symbol} {opp['expiry_date']}: 财报期风险")
+                        logger.info("跳过 %s %s: 财报期风险", symbol, opp['expiry_date'])
                         continue
                     
                     # 筛选看涨期权
-                    for call_data in opp['options_data']['calls']:
-                        if self._validate_option_liquidity(call_data):
-                            # 分析备兑看涨策略
-                            strategy_analysis = self.strategy_analyzer.analyze_covered_call(
-                                stock_price, call_data, days_to_expiry
-                            )
+                    liquid_calls = self._liquid_side(opp['options_data'], 'calls')
+                    for call_data in self._prefilter_by_delta(liquid_calls, stock_price, days_to_expiry):
+                        # 分析备兑看涨策略
+                        strategy_analysis = self.strategy_analyzer.analyze_covered_call(
+                            stock_price, call_data, days_to_expiry
+                        )
                             
-                            if strategy_analysis and self._validate_covered_call(strategy_analysis):
-                                strategy_analysis['symbol'] = symbol
-                                strategy_analysis['expiry_date'] = opp['expiry_date']
-                                strategy_analysis['days_to_expiry'] = days_to_expiry
-                                strategy_analysis['earnings_risk'] = earnings_risk
-                                strategy_analysis['days_to_earnings'] = days_to_earnings
-                                strategy_analysis['next_earnings_date'] = next_earnings
-                                symbol_opportunities.append(strategy_analysis)
+                        if strategy_analysis and self._validate_covered_call(strategy_analysis):
+                            strategy_analysis['symbol'] = symbol
+                            strategy_analysis['expiry_date'] = opp['expiry_date']
+                            strategy_analysis['days_to_expiry'] = days_to_expiry
+                            strategy_analysis['earnings_risk'] = earnings_risk
+                            strategy_analysis['days_to_earnings'] = days_to_earnings
+                            strategy_analysis['next_earnings_date'] = next_earnings
+                            symbol_opportunities.append(strategy_analysis)
                 
                 # 按得分排序并限制数量
                 if symbol_opportunities:
@@ -120,7 +128,7 @@ class OptionsScreener:
                     opportunities.extend(ranked_opportunities[:self.config['max_results_per_symbol']])
                     
             except Exception as e:
-                logger.error(f"Error screening covered calls for {symbol}: {e}")
+                logger.error("Error screening covered calls for %s: %s", symbol, e)
                 continue
         
         return opportunities
@@ -131,7 +139,7 @@ class OptionsScreener:
         
         for symbol in symbols:
             try:
-                logger.info(f"Screening cash secured puts for {symbol}")
+                logger.info("Screening cash secured puts for %s", symbol)
                 
                 # 获取股票和期权数据
                 trading_data = self._get_trading_data(symbol)
@@ -160,25 +168,25 @@ class OptionsScreener:
                         symbol, expiry_date, stock_data)
                     
                     if earnings_risk and self.config.get('avoid_earnings', False):
-                        logger.info(f"跳过 {symbol} {opp['expiry_date']}: 财报期风险")
+                        logger.info("跳过 %s %s: 财报期风险", symbol, opp['expiry_date'])
                         continue
                     
                     # 筛选看跌期权
-                    for put_data in opp['options_data']['puts']:
-                        if self._validate_option_liquidity(put_data):
-                            # 分析现金担保看跌策略
-                            strategy_analysis = self.strategy_analyzer.analyze_cash_secured_put(
-                                stock_price, put_data, days_to_expiry
-                            )
+                    liquid_puts = self._liquid_side(opp['options_data'], 'puts')
+                    for put_data in self._prefilter_by_delta(liquid_puts, stock_price, days_to_expiry):
+                        # 分析现金担保看跌策略
+                        strategy_analysis = self.strategy_analyzer.analyze_cash_secured_put(
+                            stock_price, put_data, days_to_expiry
+                        )
                             
-                            if strategy_analysis and self._validate_cash_secured_put(strategy_analysis):
-                                strategy_analysis['symbol'] = symbol
-                                strategy_analysis['expiry_date'] = opp['expiry_date']
-                                strategy_analysis['days_to_expiry'] = days_to_expiry
-                                strategy_analysis['earnings_risk'] = earnings_risk
-                                strategy_analysis['days_to_earnings'] = days_to_earnings
-                                strategy_analysis['next_earnings_date'] = next_earnings
-                                symbol_opportunities.append(strategy_analysis)
+                        if strategy_analysis and self._validate_cash_secured_put(strategy_analysis):
+                            strategy_analysis['symbol'] = symbol
+                            strategy_analysis['expiry_date'] = opp['expiry_date']
+                            strategy_analysis['days_to_expiry'] = days_to_expiry
+                            strategy_analysis['earnings_risk'] = earnings_risk
+                            strategy_analysis['days_to_earnings'] = days_to_earnings
+                            strategy_analysis['next_earnings_date'] = next_earnings
+                            symbol_opportunities.append(strategy_analysis)
                 
                 # 按得分排序并限制数量
                 if symbol_opportunities:
@@ -186,7 +194,7 @@ class OptionsScreener:
                     opportunities.extend(ranked_opportunities[:self.config['max_results_per_symbol']])
                     
             except Exception as e:
-                logger.error(f"Error screening cash secured puts for {symbol}: {e}")
+                logger.error("Error screening cash secured puts for %s: %s", symbol, e)
                 continue
         
         return opportunities
@@ -197,7 +205,7 @@ class OptionsScreener:
         
         for symbol in symbols:
             try:
-                logger.info(f"Screening short strangles for {symbol}")
+                logger.info("Screening short strangles for %s", symbol)
                 
                 trading_data = self._get_trading_data(symbol)
                 if symbol not in trading_data:
@@ -217,27 +225,25 @@ class OptionsScreener:
                     if not self._validate_expiry(days_to_expiry):
                         continue
                     
-                    calls = opp['options_data']['calls']
-                    puts = opp['options_data']['puts']
+                    # 先整体筛掉流动性不足的合约，避免在双重循环里重复校验
+                    calls = [c for c in self._liquid_side(opp['options_data'], 'calls')
+                             if c['strike'] > stock_price]
+                    puts = [p for p in self._liquid_side(opp['options_data'], 'puts')
+                            if p['strike'] < stock_price]
                     
                     # 寻找合适的看涨和看跌期权组合
                     for call_data in calls:
                         for put_data in puts:
-                            if (self._validate_option_liquidity(call_data) and 
-                                self._validate_option_liquidity(put_data) and
-                                call_data['strike'] > stock_price and
-                                put_data['strike'] < stock_price):
-                                
-                                # 分析宽跨式策略
-                                strategy_analysis = self.strategy_analyzer.analyze_short_strangle(
-                                    stock_price, call_data, put_data, days_to_expiry
-                                )
-                                
-                                if strategy_analysis and self._validate_short_strangle(strategy_analysis):
-                                    strategy_analysis['symbol'] = symbol
-                                    strategy_analysis['expiry_date'] = opp['expiry_date']
-                                    strategy_analysis['days_to_expiry'] = days_to_expiry
-                                    symbol_opportunities.append(strategy_analysis)
+                            # 分析宽跨式策略
+                            strategy_analysis = self.strategy_analyzer.analyze_short_strangle(
+                                stock_price, call_data, put_data, days_to_expiry
+                            )
+                            
+                            if strategy_analysis and self._validate_short_strangle(strategy_analysis):
+                                strategy_analysis['symbol'] = symbol
+                                strategy_analysis['expiry_date'] = opp['expiry_date']
+                                strategy_analysis['days_to_expiry'] = days_to_expiry
+                                symbol_opportunities.append(strategy_analysis)
                 
                 # 按得分排序并限制数量
                 if symbol_opportunities:
@@ -247,7 +253,7 @@ class OptionsScreener:
                     opportunities.extend(ranked_opportunities[:self.config['max_results_per_symbol']])
                     
             except Exception as e:
-                logger.error(f"Error screening short strangles for {symbol}: {e}")
+                logger.error("Error screening short strangles for %s: %s", symbol, e)
                 continue
         
         return opportunities
@@ -255,23 +261,51 @@ class OptionsScreener:
     def screen_all_strategies(self, symbols: List[str]) -> Dict[str, List[Dict]]:
         """筛选所有策略"""
         results = {}
+        targets = frozenset(self.config['target_strategies'])
         
-        if 'covered_call' in self.config['target_strategies']:
-            results['covered_calls'] = self.screen_covered_calls(symbols)
-        
-        if 'cash_secured_put' in self.config['target_strategies']:
-            results['cash_secured_puts'] = self.screen_cash_secured_puts(symbols)
+        # 并发预取各标的数据（I/O 密集），各策略共享同一份结果
+        self._trading_data_memo = self._prefetch_trading_data(symbols)
+        try:
+            if 'covered_call' in targets:
+                results['covered_calls'] = self.screen_covered_calls(symbols)
+            
+            if 'cash_secured_put' in targets:
+                results['cash_secured_puts'] = self.screen_cash_secured_puts(symbols)
+            
+            if 'short_strangle' in targets:
+                results['short_strangles'] = self.screen_short_strangles(symbols)
+            
+            if 'bull_put_spread' in targets:
+                results['bull_put_spreads'] = self.screen_bull_put_spreads(symbols)
+            
+            if 'bear_call_spread' in targets:
+                results['bear_call_spreads'] = self.screen_bear_call_spreads(symbols)
+        finally:
+            self._trading_data_memo = None
         
-        if 'short_strangle' in self.config['target_strategies']:
-            results['short_strangles'] = self.screen_short_strangles(symbols)
+        return results
+    
+    def _prefetch_trading_data(self, symbols: List[str], max_workers: int = 4) -> Dict[str, Dict]:
+        """使用线程池并发获取多个标的的交易数据"""
+        unique_symbols = list(dict.fromkeys(symbols))
+        if not unique_symbols:
+            return {}
         
-        if 'bull_put_spread' in self.config['target_strategies']:
-            results['bull_put_spreads'] = self.screen_bull_put_spreads(symbols)
+        # 历史行情合并为一次批量下载并写入缓存，逐标的获取时直接命中
+        try:
+            self.data_manager.stock_collector.get_historical_data_batch(unique_symbols)
+        except Exception as e:
+            logger.warning("Error prefetching historical data: %s", e)
         
-        if 'bear_call_spread' in self.config['target_strategies']:
-            results['bear_call_spreads'] = self.screen_bear_call_spreads(symbols)
+        def _fetch(symbol: str) -> Dict:
+            try:
+                return self._get_trading_data(symbol)
+            except Exception as e:
+                logger.error("Error prefetching trading data for %s: %s", symbol, e)
+                return {}
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_symbols))) as executor:
+            return dict(zip(unique_symbols, executor.map(_fetch, unique_symbols)))
     
     def get_top_opportunities(self, symbols: List[str], max_results: int = 20) -> List[Dict]:
         """获取最佳机会"""
@@ -291,14 +325,12 @@ class OptionsScreener:
                 else:
                     leftovers.append(opp_with_category)
 
-        # 再用剩余高分机会补满
-        selected.sort(key=lambda x: x.get('score', 0), reverse=True)
+        # 再用剩余高分机会补满（只需前 k 个，用堆选取代全量排序）
+        score_key = lambda x: x.get('score', 0)
         if len(selected) < max_results and leftovers:
-            leftovers.sort(key=lambda x: x.get('score', 0), reverse=True)
-            selected.extend(leftovers[:max_results - len(selected)])
+            selected.extend(heapq.nlargest(max_results - len(selected), leftovers, key=score_key))
 
-        selected.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return selected[:max_results]
+        return heapq.nlargest(max_results, selected, key=score_key)
     
     def _validate_stock_price(self, price: float) -> bool:
         """验证股票价格"""
@@ -328,6 +360,65 @@ class OptionsScreener:
         
         return True
     
+    def _liquid_side(self, options_data: Dict, side: str) -> List[Dict]:
+        """筛选期权链一侧（calls/puts）的流动性合约，优先使用随链附带的列数组"""
+        return self._filter_liquid_contracts(
+            options_data[side], options_data.get('arrays', {}).get(side)
+        )
+    
+    def _filter_liquid_contracts(self, contracts: List[Dict],
+                                 arrays: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+        """向量化流动性筛选，规则与 _validate_option_liquidity 一致"""
+        if not contracts:
+            return []
+        
+        # 列数组与合约列表逐行对齐时直接使用，否则从字典逐个提取
+        if arrays and all(len(arrays.get(k, ())) == len(contracts)
+                          for k in ('volume', 'openInterest', 'bid', 'ask')):
+            volume = arrays['volume']
+            open_interest = arrays['openInterest']
+            bid = arrays['bid']
+            ask = arrays['ask']
+        else:
+            volume = np.array([c.get('volume', 0) for c in contracts], dtype=float)
+            open_interest = np.array([c.get('openInterest', 0) for c in contracts], dtype=float)
+            bid = np.array([c.get('bid', 0) for c in contracts], dtype=float)
+            ask = np.array([c.get('ask', 0) for c in contracts], dtype=float)
+        
+        # 基本流动性要求（NaN 与标量版本一致，视为不触发）
+        illiquid = (volume < self.config['min_volume']) | (open_interest < self.config['min_open_interest'])
+        
+        # 买卖价差
+        quoted = (bid > 0) & (ask > bid)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spread_pct = np.where(quoted, (ask - bid) / ((bid + ask) / 2) * 100, 0.0)
+        wide = quoted & (spread_pct > self.config['max_bid_ask_spread_pct'])
+        
+        keep = np.flatnonzero(~(illiquid | wide))
+        return [contracts[i] for i in keep]
+    
+    def _prefilter_by_delta(self, contracts: List[Dict], stock_price: float,
+                            days_to_expiry: int) -> List[Dict]:
+        """批量计算 Delta，提前剔除必然不满足 Delta 区间的合约"""
+        if not contracts:
+            return []
+        
+        strike = np.array([c.get('strike', 0) for c in contracts], dtype=float)
+        iv = np.array([c.get('impliedVolatility', 0) for c in contracts], dtype=float)
+        cp_flag = np.array([1 if c.get('type', 'call') == 'call' else -1 for c in contracts])
+        n = len(contracts)
+        delta, _, _, _, _ = score_batch(
+            np.full(n, stock_price, dtype=float), strike, np.full(n, days_to_expiry / 365.0),
+            self.option_analyzer.risk_free_rate, iv, cp_flag, np.zeros(n)
+        )
+        
+        # 留出微小容差，边界及无波动率等退化情况交给逐个校验
+        abs_delta = np.abs(delta)
+        tol = 1e-6
+        out_of_range = (abs_delta < self.config['min_delta'] - tol) | (abs_delta > self.config['max_delta'] + tol)
+        keep = ~out_of_range | ~(iv > 0) | (days_to_expiry <= 0)
+        return [contracts[i] for i in np.flatnonzero(keep)]
+    
     def _validate_covered_call(self, strategy_analysis: Dict) -> bool:
         """验证备兑看涨策略"""
         try:
@@ -431,7 +522,7 @@ class OptionsScreener:
         
         for symbol in symbols:
             try:
-                logger.info(f"Screening bull put spreads for {symbol}")
+                logger.info("Screening bull put spreads for %s", symbol)
                 trading_data = self._get_trading_data(symbol)
                 if symbol not in trading_data:
                     continue
@@ -457,9 +548,8 @@ class OptionsScreener:
                     if earnings_risk and self.config.get('avoid_earnings', False):
                         continue
                     
-                    puts = [p for p in opp['options_data']['puts']
-                            if self._validate_option_liquidity(p)
-                            and p['strike'] < stock_price]
+                    puts = [p for p in self._liquid_side(opp['options_data'], 'puts')
+                            if p['strike'] < stock_price]
                     # 统一按执行价从高到低，保证 short leg 在前（避免数据源排序差异）
                     puts = sorted(puts, key=lambda x: x.get('strike', 0), reverse=True)
                     
@@ -483,7 +573,7 @@ class OptionsScreener:
                     ranked = self.strategy_analyzer.rank_selling_opportunities(symbol_opps)
                     opportunities.extend(ranked[:self.config['max_results_per_symbol']])
             except Exception as e:
-                logger.error(f"Error screening bull put spreads for {symbol}: {e}")
+                logger.error("Error screening bull put spreads for %s: %s", symbol, e)
                 continue
         return opportunities
     
@@ -495,7 +585,7 @@ class OptionsScreener:
         
         for symbol in symbols:
             try:
-                logger.info(f"Screening bear call spreads for {symbol}")
+                logger.info("Screening bear call spreads for %s", symbol)
                 trading_data = self._get_trading_data(symbol)
                 if symbol not in trading_data:
                     continue
@@ -521,9 +611,8 @@ class OptionsScreener:
                     if earnings_risk and self.config.get('avoid_earnings', False):
                         continue
                     
-                    calls = [c for c in opp['options_data']['calls']
-                             if self._validate_option_liquidity(c)
-                             and c['strike'] > stock_price]
+                    calls = [c for c in self._liquid_side(opp['options_data'], 'calls')
+                             if c['strike'] > stock_price]
                     # 统一按执行价从低到高，保证 short leg 在前
                     calls = sorted(calls, key=lambda x: x.get('strike', 0))
                     
@@ -547,6 +636,6 @@ class OptionsScreener:
                     ranked = self.strategy_analyzer.rank_selling_opportunities(symbol_opps)
                     opportunities.extend(ranked[:self.config['max_results_per_symbol']])
             except Exception as e:
-                logger.error(f"Error screening bear call spreads for {symbol}: {e}")
+                logger.error("Error screening bear call spreads for %s: %s", symbol, e)
                 continue
         return opportunities
@@ -0,0 +1,72 @@
+"""
+核心数据记录类型
+Typed records for options opportunities
+"""
+from dataclasses import dataclass
+from typing import Dict, NamedTuple, Optional
+
+
+@dataclass(slots=True, frozen=True)
+class Contract:
+    """单个期权合约报价（字段名与期权链字典一致）"""
+    type: str
+    strike: float
+    lastPrice: float
+    bid: float
+    ask: float
+    volume: int
+    openInterest: int
+    impliedVolatility: float
+    inTheMoney: bool
+    contractSymbol: str
+
+
+class Returns(NamedTuple):
+    """收益指标"""
+    max_profit: float
+    max_loss: float
+    annualized_yield: float
+
+
+class Greeks(NamedTuple):
+    """希腊字母"""
+    delta: float = 0.0
+    gamma: float = 0.0
+    theta: float = 0.0
+    vega: float = 0.0
+
+
+class Probabilities(NamedTuple):
+    """概率指标"""
+    prob_profit_short: float = 0.0
+    prob_expire_worthless: float = 0.0
+
+
+@dataclass(slots=True)
+class Opportunity:
+    """期权交易机会"""
+    symbol: str
+    strategy_type: str
+    stock_price: float
+    strike: float
+    returns: Returns
+    greeks: Greeks = Greeks()
+    probabilities: Probabilities = Probabilities()
+    expiry_date: Optional[str] = None
+    days_to_expiry: int = 0
+    score: float = 0.0
+
+    def to_dict(self) -> Dict:
+        """转换为筛选器/风险模块使用的字典格式"""
+        return {
+            'symbol': self.symbol,
+            'strategy_type': self.strategy_type,
+            'stock_price': self.stock_price,
+            'strike': self.strike,
+            'expiry_date': self.expiry_date,
+            'days_to_expiry': self.days_to_expiry,
+            'returns': self.returns._asdict(),
+            'probabilities': self.probabilities._asdict(),
+            'greeks': self.greeks._asdict(),
+            'score': self.score
+        }
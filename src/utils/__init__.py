@@ -23,3 +23,4 @@ from .validators import (
     validate_position_input,
 )
 from .persistence import PortfolioStore
+from .logging_setup import setup_logging
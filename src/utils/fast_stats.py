@@ -0,0 +1,115 @@
+"""
+数值统计工具
+Fast statistics helpers (Numba-accelerated when available)
+"""
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+
+def _hist_range(lo: float, hi: float) -> Tuple[float, float]:
+    """与 np.histogram 一致：数据无跨度时向两侧扩展 0.5"""
+    if lo == hi:
+        return lo - 0.5, hi + 0.5
+    return lo, hi
+
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _hist_and_centers_jit(x, nbins):
+        n = x.shape[0]
+        lo = x[0]
+        hi = x[0]
+        for i in range(1, n):
+            v = x[i]
+            if v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+        if lo == hi:
+            lo -= 0.5
+            hi += 0.5
+        width = (hi - lo) / nbins
+        counts = np.zeros(nbins, dtype=np.int64)
+        for i in range(n):
+            idx = int((x[i] - lo) / width)
+            # 最大值落入最后一个区间（右闭）
+            if idx >= nbins:
+                idx = nbins - 1
+            counts[idx] += 1
+        centers = np.empty(nbins, dtype=np.float64)
+        for b in range(nbins):
+            centers[b] = lo + (b + 0.5) * width
+        return counts, centers
+
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _rolling_annual_vol_jit(close, window, annualization):
+        n = close.shape[0]
+        out = np.full(n, np.nan)
+        if n <= window:
+            return out
+        # 收益率环形缓冲 + 滑动 Welford 更新，一次遍历完成 pct_change 与滚动标准差
+        buf = np.empty(window)
+        mean = 0.0
+        m2 = 0.0
+        for i in range(1, n):
+            r = close[i] / close[i - 1] - 1.0
+            k = i - 1
+            if k < window:
+                buf[k] = r
+                delta = r - mean
+                mean += delta / (k + 1)
+                m2 += delta * (r - mean)
+            else:
+                old = buf[k % window]
+                buf[k % window] = r
+                new_mean = mean + (r - old) / window
+                m2 += (r - old) * (r - new_mean + old - mean)
+                mean = new_mean
+            if k >= window - 1:
+                var = m2 / (window - 1)
+                out[i] = np.sqrt(var if var > 0.0 else 0.0) * annualization
+        return out
+
+
+def _hist_and_centers_numpy(x: np.ndarray, nbins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """NumPy 实现（未安装 numba 时使用）"""
+    lo, hi = _hist_range(float(x.min()), float(x.max()))
+    counts, edges = np.histogram(x, bins=nbins, range=(lo, hi))
+    return counts.astype(np.int64), (edges[:-1] + edges[1:]) / 2
+
+
+def hist_and_centers(x: np.ndarray, nbins: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """等宽直方图：一次遍历返回 (各区间计数, 区间中心)，口径与 np.histogram 一致"""
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if x.size == 0 or nbins <= 0:
+        return np.zeros(max(nbins, 0), dtype=np.int64), np.zeros(max(nbins, 0), dtype=np.float64)
+    if _HAS_NUMBA:
+        return _hist_and_centers_jit(x, nbins)
+    return _hist_and_centers_numpy(x, nbins)
+
+
+def rolling_annual_vol(close: np.ndarray, window: int = 20, periods_per_year: int = 252) -> np.ndarray:
+    """滚动年化波动率，口径同 pct_change().rolling(window).std() * sqrt(periods_per_year)"""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    annualization = np.sqrt(periods_per_year)
+    out = np.full(close.shape[0], np.nan)
+    if window < 2 or close.shape[0] <= window:
+        return out
+    # 含缺失值时走 NumPy 路径，窗口内的 NaN 自然传播为 NaN
+    if _HAS_NUMBA and np.isfinite(close).all():
+        return _rolling_annual_vol_jit(close, window, annualization)
+    returns = np.diff(close) / close[:-1]
+    windows = sliding_window_view(returns, window)
+    out[window:] = np.std(windows, axis=1, ddof=1) * annualization
+    return out
@@ -54,17 +54,20 @@ def format_dte(days: int) -> str:
         return f"{days} 天"
 
 
+# 策略类型 -> 中文名称（模块级常量，避免每次调用重建字典）
+_STRATEGY_NAMES = {
+    'covered_call': '备兑看涨',
+    'cash_secured_put': '现金担保看跌',
+    'iron_condor': '铁鹰策略',
+    'short_strangle': '卖出宽跨式',
+    'short_put': '裸卖看跌',
+    'short_call': '裸卖看涨',
+}
+
+
 def format_strategy_name(strategy_type: str) -> str:
     """将策略类型转为中文名称"""
-    names = {
-        'covered_call': '备兑看涨',
-        'cash_secured_put': '现金担保看跌',
-        'iron_condor': '铁鹰策略',
-        'short_strangle': '卖出宽跨式',
-        'short_put': '裸卖看跌',
-        'short_call': '裸卖看涨',
-    }
-    return names.get(strategy_type, strategy_type)
+    return _STRATEGY_NAMES.get(strategy_type, strategy_type)
 
 
 def format_risk_level(level: str) -> str:
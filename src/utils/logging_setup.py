@@ -0,0 +1,52 @@
+"""
+日志初始化
+Non-blocking logging setup: handlers run on a background QueueListener
+"""
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(config: Dict) -> None:
+    """配置根日志：业务线程只入队，控制台/文件写入由后台线程完成（可重复调用）"""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(config.get("format", logging.BASIC_FORMAT))
+    handlers = [logging.StreamHandler()]
+
+    log_file = config.get("file")
+    if log_file:
+        try:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+        except OSError as e:
+            logging.getLogger(__name__).warning("无法创建日志文件 %s: %s", log_file, e)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    # 移除 basicConfig 等已挂载的同步处理器，避免重复输出
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(config.get("level", "INFO"))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """停止后台日志线程并刷新剩余记录"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -6,8 +6,12 @@ import sqlite3
 import json
 import os
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+import hashlib
+import pickle
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,13 @@ class PortfolioStore:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self._init_db()
 
+    def last_modified(self) -> int:
+        """数据库文件最后修改时间（纳秒），作为展示缓存的版本号，写入后即变化"""
+        try:
+            return os.stat(self.db_path).st_mtime_ns
+        except OSError:
+            return 0
+
     def _get_conn(self) -> sqlite3.Connection:
         """获取数据库连接"""
         conn = sqlite3.connect(self.db_path)
@@ -74,7 +85,7 @@ class PortfolioStore:
             # 兼容旧数据库
             self._ensure_columns(conn)
         except Exception as e:
-            logger.error(f"数据库初始化失败: {e}")
+            logger.error("数据库初始化失败: %s", e)
         finally:
             conn.close()
 
@@ -123,7 +134,7 @@ class PortfolioStore:
             conn.commit()
             return cursor.lastrowid
         except Exception as e:
-            logger.error(f"添加持仓失败: {e}")
+            logger.error("添加持仓失败: %s", e)
             return None
         finally:
             conn.close()
@@ -143,7 +154,7 @@ class PortfolioStore:
                 ).fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            logger.error(f"获取持仓失败: {e}")
+            logger.error("获取持仓失败: %s", e)
             return []
         finally:
             conn.close()
@@ -166,7 +177,7 @@ class PortfolioStore:
             conn.commit()
             return True
         except Exception as e:
-            logger.error(f"关闭持仓失败: {e}")
+            logger.error("关闭持仓失败: %s", e)
             return False
         finally:
             conn.close()
@@ -179,7 +190,7 @@ class PortfolioStore:
             conn.commit()
             return True
         except Exception as e:
-            logger.error(f"删除持仓失败: {e}")
+            logger.error("删除持仓失败: %s", e)
             return False
         finally:
             conn.close()
@@ -198,7 +209,7 @@ class PortfolioStore:
                            new_state: str) -> bool:
         """更新 Wheel 策略状态"""
         if new_state not in self.WHEEL_STATES:
-            logger.warning(f"无效的 Wheel 状态: {new_state}")
+            logger.warning("无效的 Wheel 状态: %s", new_state)
             return False
         conn = self._get_conn()
         try:
@@ -210,7 +221,7 @@ class PortfolioStore:
             conn.commit()
             return True
         except Exception as e:
-            logger.error(f"更新 Wheel 状态失败: {e}")
+            logger.error("更新 Wheel 状态失败: %s", e)
             return False
         finally:
             conn.close()
@@ -226,7 +237,7 @@ class PortfolioStore:
             """).fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            logger.error(f"获取 Wheel 持仓失败: {e}")
+            logger.error("获取 Wheel 持仓失败: %s", e)
             return []
         finally:
             conn.close()
@@ -249,7 +260,7 @@ class PortfolioStore:
             conn.commit()
             return True
         except Exception as e:
-            logger.error(f"更新 Greeks 失败: {e}")
+            logger.error("更新 Greeks 失败: %s", e)
             return False
         finally:
             conn.close()
@@ -258,37 +269,25 @@ class PortfolioStore:
         """聚合所有 open 持仓的 Greeks"""
         conn = self._get_conn()
         try:
+            # 按标的在 SQL 中聚合（每张合约 100 股），Python 只处理每个标的一行
             rows = conn.execute("""
-                SELECT symbol, strategy_type, contracts, delta, theta,
-                       gamma, vega
+                SELECT symbol,
+                       SUM(delta * contracts * 100) AS delta,
+                       SUM(theta * contracts * 100) AS theta,
+                       SUM(gamma * contracts * 100) AS gamma,
+                       SUM(vega * contracts * 100) AS vega
                 FROM positions WHERE status = 'open'
+                GROUP BY symbol
             """).fetchall()
 
-            total_delta = 0.0
-            total_theta = 0.0
-            total_gamma = 0.0
-            total_vega = 0.0
-            by_symbol: Dict[str, Dict] = {}
-
-            for row in rows:
-                contracts = row['contracts']
-                d = row['delta'] * contracts * 100
-                t = row['theta'] * contracts * 100
-                g = row['gamma'] * contracts * 100
-                v = row['vega'] * contracts * 100
-                total_delta += d
-                total_theta += t
-                total_gamma += g
-                total_vega += v
-
-                sym = row['symbol']
-                if sym not in by_symbol:
-                    by_symbol[sym] = {'delta': 0, 'theta': 0,
-                                      'gamma': 0, 'vega': 0}
-                by_symbol[sym]['delta'] += d
-                by_symbol[sym]['theta'] += t
-                by_symbol[sym]['gamma'] += g
-                by_symbol[sym]['vega'] += v
+            by_symbol: Dict[str, Dict] = {
+                row['symbol']: {k: row[k] or 0 for k in ('delta', 'theta', 'gamma', 'vega')}
+                for row in rows
+            }
+            total_delta = sum(v['delta'] for v in by_symbol.values())
+            total_theta = sum(v['theta'] for v in by_symbol.values())
+            total_gamma = sum(v['gamma'] for v in by_symbol.values())
+            total_vega = sum(v['vega'] for v in by_symbol.values())
 
             return {
                 'total_delta': round(total_delta, 2),
@@ -301,7 +300,7 @@ class PortfolioStore:
                 },
             }
         except Exception as e:
-            logger.error(f"聚合 Greeks 失败: {e}")
+            logger.error("聚合 Greeks 失败: %s", e)
             return {'total_delta': 0, 'total_theta': 0,
                     'total_gamma': 0, 'total_vega': 0, 'by_symbol': {}}
         finally:
@@ -352,7 +351,7 @@ class PortfolioStore:
                 'symbol_distribution': symbols,
             }
         except Exception as e:
-            logger.error(f"获取组合汇总失败: {e}")
+            logger.error("获取组合汇总失败: %s", e)
             return {}
         finally:
             conn.close()
@@ -392,7 +391,7 @@ class PortfolioStore:
             conn.commit()
             return cursor.lastrowid
         except Exception as e:
-            logger.error(f"保存分析历史失败: {e}")
+            logger.error("保存分析历史失败: %s", e)
             return None
         finally:
             conn.close()
@@ -410,7 +409,7 @@ class PortfolioStore:
             """, (limit,)).fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            logger.error(f"获取分析历史失败: {e}")
+            logger.error("获取分析历史失败: %s", e)
             return []
         finally:
             conn.close()
@@ -433,7 +432,86 @@ class PortfolioStore:
                 return result
             return None
         except Exception as e:
-            logger.error(f"获取分析详情失败: {e}")
+            logger.error("获取分析详情失败: %s", e)
             return None
         finally:
             conn.close()
+
+
+class AnalysisSnapshotStore:
+    """分析结果磁盘快照：按 (代码, 筛选配置, 日期) 缓存，新会话可直接恢复"""
+
+    # 可重新派生的键（标签等）不落盘
+    PERSISTED_KEYS = ('market_context', 'symbols_data', 'opportunities', 'timestamp')
+
+    def __init__(self, cache_dir: str = "data/cache/analysis", max_files: int = 16):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(symbols: List[str], config: Dict, as_of: Optional[date] = None) -> str:
+        """生成快照键"""
+        payload = json.dumps({
+            'symbols': sorted(symbols),
+            'config': config,
+            'date': (as_of or date.today()).isoformat(),
+        }, sort_keys=True, default=str)
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        """快照文件路径 (pickle, parquet)"""
+        base = os.path.join(self.cache_dir, f"opps_{key}")
+        return f"{base}.pkl", f"{base}.parquet"
+
+    def save(self, key: str, results: Dict) -> bool:
+        """保存分析结果（机会表写 parquet，其余字段 pickle）"""
+        pkl_path, parquet_path = self._paths(key)
+        try:
+            frame = results.get('opportunities_df')
+            if isinstance(frame, pd.DataFrame) and not frame.empty:
+                try:
+                    frame.to_parquet(parquet_path, compression='zstd', index=False)
+                except Exception as e:
+                    # 列类型混杂时跳过，加载后由机会列表重新生成
+                    logger.debug("机会表 parquet 写入失败，跳过: %s", e)
+            with open(pkl_path, 'wb') as f:
+                pickle.dump({k: results.get(k) for k in self.PERSISTED_KEYS}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            self._evict()
+            return True
+        except Exception as e:
+            logger.error("保存分析快照失败: %s", e)
+            return False
+
+    def load(self, key: str) -> Optional[Dict]:
+        """读取分析快照，不存在或损坏时返回 None"""
+        pkl_path, parquet_path = self._paths(key)
+        if not os.path.exists(pkl_path):
+            return None
+        try:
+            with open(pkl_path, 'rb') as f:
+                results = pickle.load(f)
+            if os.path.exists(parquet_path):
+                results['opportunities_df'] = pd.read_parquet(parquet_path)
+            # 刷新访问时间，供 LRU 淘汰使用
+            os.utime(pkl_path)
+            return results
+        except Exception as e:
+            logger.warning("读取分析快照失败: %s", e)
+            return None
+
+    def _evict(self):
+        """仅保留最近使用的 max_files 份快照"""
+        snapshots = sorted(
+            (entry for entry in os.scandir(self.cache_dir)
+             if entry.name.startswith('opps_') and entry.name.endswith('.pkl')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        for entry in snapshots[self.max_files:]:
+            for path in self._paths(entry.name[len('opps_'):-len('.pkl')]):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -13,6 +13,8 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 import logging
 
+from config.config import COLOR_BG, COLOR_LOSS, COLOR_NEUTRAL, COLOR_PROFIT
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
 plt.rcParams['axes.unicode_minus'] = False
@@ -31,11 +33,11 @@ class OptionsVisualizer:
         """获取颜色方案"""
         if self.style == "dark":
             return {
-                'background': '#2F3136',
+                'background': COLOR_BG,
                 'text': '#FFFFFF',
-                'profit': '#00CC96',
-                'loss': '#FF6692',
-                'neutral': '#FFA15A',
+                'profit': COLOR_PROFIT,
+                'loss': COLOR_LOSS,
+                'neutral': COLOR_NEUTRAL,
                 'grid': '#444444',
                 'accent': '#7C4DFF'
             }
@@ -119,7 +121,7 @@ class OptionsVisualizer:
             return fig
             
         except Exception as e:
-            logger.error(f"Error creating payoff diagram: {e}")
+            logger.error("Error creating payoff diagram: %s", e)
             return go.Figure()
     
     def plot_risk_metrics_radar(self, opportunities: List[Dict]) -> go.Figure:
@@ -162,7 +164,7 @@ class OptionsVisualizer:
             return fig
             
         except Exception as e:
-            logger.error(f"Error creating radar chart: {e}")
+            logger.error("Error creating radar chart: %s", e)
             return go.Figure()
     
     def plot_iv_rank_distribution(self, symbols_data: Dict) -> go.Figure:
@@ -223,7 +225,7 @@ class OptionsVisualizer:
             return fig
             
         except Exception as e:
-            logger.error(f"Error creating IV rank distribution: {e}")
+            logger.error("Error creating IV rank distribution: %s", e)
             return go.Figure()
 
     def _estimate_iv_rank(self, stock_data: Dict) -> float:
@@ -231,11 +233,16 @@ class OptionsVisualizer:
         try:
             current_volatility = stock_data.get('current_volatility', 0)
             historical_data = stock_data.get('historical_data', {})
-            vol_map = historical_data.get('Volatility', {}) if isinstance(historical_data, dict) else {}
-            if current_volatility <= 0 or not isinstance(vol_map, dict) or not vol_map:
+            if isinstance(historical_data, pd.DataFrame):
+                vol_values = historical_data['Volatility'] if 'Volatility' in historical_data.columns else None
+            else:
+                # 兼容旧的 {列: {索引: 值}} 字典格式
+                vol_map = historical_data.get('Volatility', {}) if isinstance(historical_data, dict) else {}
+                vol_values = pd.Series(list(vol_map.values())) if isinstance(vol_map, dict) and vol_map else None
+            if current_volatility <= 0 or vol_values is None or len(vol_values) == 0:
                 return 50.0
 
-            vol_series = pd.to_numeric(pd.Series(list(vol_map.values())), errors='coerce').dropna()
+            vol_series = pd.to_numeric(vol_values, errors='coerce').dropna()
             vol_series = vol_series[vol_series > 0]
             if vol_series.empty:
                 return 50.0
@@ -243,7 +250,7 @@ class OptionsVisualizer:
             rank = float((vol_series < current_volatility).sum()) / float(len(vol_series)) * 100
             return max(0.0, min(100.0, rank))
         except Exception as e:
-            logger.warning(f"Failed to estimate IV rank: {e}")
+            logger.warning("Failed to estimate IV rank: %s", e)
             return 50.0
     
     def plot_portfolio_risk_analysis(self, portfolio_metrics: Dict) -> go.Figure:
@@ -310,7 +317,7 @@ class OptionsVisualizer:
             return fig
             
         except Exception as e:
-            logger.error(f"Error creating portfolio risk analysis: {e}")
+            logger.error("Error creating portfolio risk analysis: %s", e)
             return go.Figure()
     
     def plot_greeks_heatmap(self, opportunities: List[Dict]) -> go.Figure:
@@ -371,7 +378,7 @@ class OptionsVisualizer:
             return fig
             
         except Exception as e:
-            logger.error(f"Error creating Greeks heatmap: {e}")
+            logger.error("Error creating Greeks heatmap: %s", e)
             return go.Figure()
     
     def plot_time_decay_analysis(self, strategy_analysis: Dict) -> go.Figure:
@@ -423,7 +430,7 @@ class OptionsVisualizer:
             return fig
             
         except Exception as e:
-            logger.error(f"Error creating time decay analysis: {e}")
+            logger.error("Error creating time decay analysis: %s", e)
             return go.Figure()
     
     def _calculate_payoffs(self, strategy_analysis: Dict, prices: np.ndarray) -> np.ndarray:
@@ -5,14 +5,31 @@ Basic tests for the options tool
 import unittest
 import sys
 import os
+import glob
+import json
+import tempfile
+from collections import OrderedDict
+import time
+from datetime import datetime
+from unittest import mock
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import numpy as np
+import pandas as pd
 from src.option_analytics.pricing import BlackScholesCalculator, ProbabilityCalculator, OptionAnalyzer
+from src.option_analytics.bs_kernel import greeks, score_batch
 from src.risk_management.risk_manager import RiskCalculator, PositionSizer, RiskManager
 from src.screening.screener import OptionsScreener
 from src.visualization.charts import OptionsVisualizer
 from src.data_collector.github_pools import GitHubStockPoolProvider
+import src.data_collector.github_pools as github_pools_module
+from src.data_collector.data_manager import DataManager
+from src.utils.persistence import AnalysisSnapshotStore
+import src.data_collector.base as base_module
+import src.data_collector.cache as cache_module
+from src.data_collector.occ import parse_occ_symbol, parse_occ_symbols
+from src.data_collector.cache import FileCache, calculate_options_ttl, INTRADAY_TTL, OVERNIGHT_TTL, WEEKEND_TTL
+from src.utils.fast_stats import hist_and_centers, rolling_annual_vol
 
 class TestBlackScholesCalculator(unittest.TestCase):
     """测试Black-Scholes计算器"""
@@ -68,6 +85,37 @@ class TestBlackScholesCalculator(unittest.TestCase):
         )
         self.assertAlmostEqual(price, 0, places=2)
 
+    def test_batch_kernel_matches_scalar(self):
+        """测试批量内核与逐个计算结果一致"""
+        S = np.array([100.0, 100.0, 110.0])
+        K = np.array([105.0, 95.0, 100.0])
+        T = np.array([0.25, 0.1, 0.0])
+        iv = np.array([0.2, 0.3, 0.2])
+        cp_flag = np.array([1, -1, 1])
+        premium = np.array([1.5, 1.0, 0.0])
+        delta, gamma, theta, vega, pop = score_batch(S, K, T, 0.05, iv, cp_flag, premium)
+        
+        for i, option_type in enumerate(['call', 'put', 'call']):
+            greeks = self.bs_calc.calculate_greeks(S[i], K[i], T[i], 0.05, iv[i], option_type)
+            self.assertAlmostEqual(delta[i], greeks['delta'], places=6)
+            self.assertAlmostEqual(gamma[i], greeks['gamma'], places=6)
+            self.assertAlmostEqual(theta[i], greeks['theta'], places=6)
+            self.assertAlmostEqual(vega[i], greeks['vega'], places=6)
+            prob = ProbabilityCalculator.prob_profit_short_option(
+                S[i], K[i], premium[i], T[i], iv[i], option_type)
+            self.assertAlmostEqual(pop[i], prob, places=6)
+
+    def test_greeks_matches_scalar(self):
+        """测试批量 Greeks 与逐个计算结果一致"""
+        K = [105.0, 95.0]
+        T = [0.25, 0.1]
+        iv = [0.2, 0.3]
+        batch = greeks([100.0, 100.0], K, T, 0.05, iv, [True, False])
+        for i, option_type in enumerate(['call', 'put']):
+            expected = self.bs_calc.calculate_greeks(100.0, K[i], T[i], 0.05, iv[i], option_type)
+            for name in ('delta', 'gamma', 'theta', 'vega'):
+                self.assertAlmostEqual(batch[name][i], expected[name], places=6)
+
 class TestProbabilityCalculator(unittest.TestCase):
     """测试概率计算器"""
     
@@ -326,6 +374,18 @@ class TestOptionsScreenerConfigEnforcement(unittest.TestCase):
         self.assertIn('bear_call_spread', types)
         self.assertIn('cash_secured_put', types)
 
+    def test_vectorized_liquidity_filter_matches_scalar(self):
+        contracts = [
+            {'strike': 100, 'volume': 500, 'openInterest': 1000, 'bid': 1.0, 'ask': 1.1},
+            {'strike': 105, 'volume': 10, 'openInterest': 1000, 'bid': 1.0, 'ask': 1.1},
+            {'strike': 110, 'volume': 500, 'openInterest': 20, 'bid': 1.0, 'ask': 1.1},
+            {'strike': 115, 'volume': 500, 'openInterest': 1000, 'bid': 1.0, 'ask': 2.0},
+            {'strike': 120, 'volume': float('nan'), 'openInterest': 1000, 'bid': 0, 'ask': 0.1},
+        ]
+        expected = [c for c in contracts if self.screener._validate_option_liquidity(c)]
+        self.assertEqual(self.screener._filter_liquid_contracts(contracts), expected)
+        self.assertEqual([c['strike'] for c in expected], [100, 120])
+
 
 class TestStrategySchemaConsistency(unittest.TestCase):
     """测试策略输出字段一致性"""
@@ -414,6 +474,21 @@ class TestGitHubStockPoolProvider(unittest.TestCase):
         )
         self.assertEqual(symbols, ["AAPL", "MSFT", "BRK.B"])
 
+    def test_normalize_symbols_table(self):
+        cases = [
+            ([], []),
+            ([None, float("nan"), pd.NA, np.nan], []),
+            # 字符串形式的空值标记不是有效代码
+            (["nan", "NaN", "None", "NONE", " "], []),
+            ([" brk.b ", "BRK.B", "brk.b"], ["BRK.B"]),
+            (["TOOLONG", "AB-C", "A.BC", "123", 123, "A1"], []),
+            (["msft", "aapl", "MSFT", "goog", "AAPL"], ["MSFT", "AAPL", "GOOG"]),
+            (pd.Series(["x", None, "y", "x"]), ["X", "Y"]),
+        ]
+        for raw, expected in cases:
+            with self.subTest(raw=raw):
+                self.assertEqual(GitHubStockPoolProvider._normalize_symbols(raw), expected)
+
     def test_curated_prefers_popular_symbols(self):
         cfg = {
             "sources": {
@@ -435,6 +510,169 @@ class TestGitHubStockPoolProvider(unittest.TestCase):
         self.assertEqual(curated, ["MSFT", "AAPL", "GOOGL"])
 
 
+@unittest.skipUnless(github_pools_module._HAS_REQUESTS, "requests 未安装")
+class TestIndexCsvFetch(unittest.TestCase):
+    """测试指数 CSV 条件请求与本地副本"""
+
+    URL = "https://example.com/constituents.csv"
+    BODY = b"Symbol,Name\nAAPL,Apple\nMSFT,Microsoft\n"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.provider = GitHubStockPoolProvider(
+            {"sources": {"x": {"url": self.URL, "symbol_columns": ["Symbol"]}}},
+            cache_dir=self.tmp_dir.name,
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _response(status_code, content=b"", headers=None):
+        response = mock.Mock(status_code=status_code, content=content, headers=headers or {})
+        response.raise_for_status.return_value = None
+        return response
+
+    def _get(self, response):
+        return mock.patch.object(github_pools_module._SESSION, 'get', **(
+            {'side_effect': response} if isinstance(response, Exception) else {'return_value': response}))
+
+    def test_200_then_304_uses_local_copy(self):
+        headers = {"ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2026 00:00:00 GMT"}
+        with self._get(self._response(200, self.BODY, headers)) as get:
+            self.assertEqual(self.provider._fetch_csv(self.URL).read(), self.BODY)
+        self.assertEqual(get.call_args.kwargs['headers'], {})
+
+        meta_files = glob.glob(os.path.join(self.tmp_dir.name, "*.meta.json"))
+        self.assertEqual(len(meta_files), 1)
+        with open(meta_files[0], encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["etag"], '"abc"')
+
+        with self._get(self._response(304)) as get:
+            self.assertEqual(self.provider._fetch_csv(self.URL).read(), self.BODY)
+        self.assertEqual(get.call_args.kwargs['headers'], {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 01 Jan 2026 00:00:00 GMT",
+        })
+
+    def test_network_error_falls_back_to_local_copy(self):
+        with self._get(self._response(200, self.BODY)):
+            self.provider._fetch_csv(self.URL)
+        with self._get(ConnectionError("offline")):
+            self.assertEqual(self.provider.get_index_symbols("x"), ["AAPL", "MSFT"])
+
+    def test_network_error_without_local_copy_raises(self):
+        with self._get(ConnectionError("offline")):
+            with self.assertRaises(ConnectionError):
+                self.provider._fetch_csv(self.URL)
+
+    def test_non_http_source_is_passed_through(self):
+        self.assertEqual(self.provider._fetch_csv("/tmp/local.csv"), "/tmp/local.csv")
+
+
+class TestOptionsCacheTTL(unittest.TestCase):
+    """测试期权链缓存有效期随交易时段变化"""
+
+    def test_ttl_by_market_session(self):
+        from datetime import datetime
+        self.assertEqual(calculate_options_ttl(datetime(2024, 6, 3, 10, 0)), INTRADAY_TTL)
+        self.assertEqual(calculate_options_ttl(datetime(2024, 6, 3, 18, 0)), OVERNIGHT_TTL)
+        self.assertEqual(calculate_options_ttl(datetime(2024, 6, 8, 10, 0)), WEEKEND_TTL)
+
+
+class TestOptionsCachePruning(unittest.TestCase):
+    """测试期权链缓存按交易日目录清理"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.options_dir = os.path.join(self.tmp_dir.name, "options")
+        self.today = cache_module._market_now().strftime("%Y%m%d")
+        for rel in (("AAPL", "20200101"), ("AAPL", self.today), ("MSFT", "20200102")):
+            os.makedirs(os.path.join(self.options_dir, *rel))
+            open(os.path.join(self.options_dir, *rel, "chain.parquet"), "wb").close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _remaining(self):
+        return sorted(os.path.relpath(p, self.options_dir)
+                      for p in glob.glob(os.path.join(self.options_dir, "*", "*")))
+
+    def test_prune_removes_old_trading_dates(self):
+        self.assertEqual(FileCache(self.options_dir).prune(), 2)
+        self.assertEqual(self._remaining(), [os.path.join("AAPL", self.today)])
+        # 空的标的目录一并删除
+        self.assertFalse(os.path.exists(os.path.join(self.options_dir, "MSFT")))
+
+    def test_first_write_of_the_day_prunes(self):
+        cache = FileCache(self.options_dir)
+        cache.set("SPY", "2026-01-16", pd.DataFrame({'strike': [100.0]}))
+        self.assertEqual(self._remaining(), [os.path.join("AAPL", self.today), os.path.join("SPY", self.today)])
+
+    def test_collector_gc_walks_options_tree(self):
+        with mock.patch.object(base_module.DataCollector, '_start_cache_gc'):
+            collector = base_module.DataCollector(self.tmp_dir.name)
+        collector._gc_cache()
+        self.assertEqual(self._remaining(), [os.path.join("AAPL", self.today)])
+
+
+class TestOCCSymbolParser(unittest.TestCase):
+    """测试 OCC 期权代码解析"""
+
+    def test_parse_occ_symbol(self):
+        from datetime import date
+        parsed = parse_occ_symbol('AAPL240119C00150000')
+        self.assertEqual(parsed.root, 'AAPL')
+        self.assertEqual(parsed.expiry, date(2024, 1, 19))
+        self.assertEqual(parsed.option_type, 'call')
+        self.assertAlmostEqual(parsed.strike, 150.0)
+
+        self.assertEqual(parse_occ_symbol('SPY241220P00450500').strike, 450.5)
+        self.assertIsNone(parse_occ_symbol('INVALID'))
+
+    def test_vectorized_parser_matches_scalar(self):
+        raw_symbols = [
+            'AAPL240119C00150000', ' spy241220p00450500 ', 'BRK.B250321C00400000',
+            'INVALID', '', None, 'AAPL240230C00150000', 'AAPL240119X00150000', 'AAPL240119C0015000',
+        ]
+        parsed = parse_occ_symbols(pd.Series(raw_symbols, dtype=object))
+        self.assertEqual(list(parsed.columns), ['root', 'expiry', 'option_type', 'strike'])
+        for i, raw in enumerate(raw_symbols):
+            with self.subTest(symbol=raw):
+                expected = parse_occ_symbol(raw)
+                row = parsed.loc[i]
+                if expected is None:
+                    self.assertTrue(row.isna().all())
+                else:
+                    self.assertEqual(row['root'], expected.root)
+                    self.assertEqual(row['expiry'].date(), expected.expiry)
+                    self.assertEqual(row['option_type'], expected.option_type)
+                    self.assertAlmostEqual(row['strike'], expected.strike)
+
+
+class TestFastStats(unittest.TestCase):
+    """测试直方图工具与 np.histogram 口径一致"""
+
+    def test_hist_and_centers_matches_numpy(self):
+        rng = np.random.default_rng(7)
+        values = rng.normal(20.0, 8.0, 500)
+        counts, centers = hist_and_centers(values, 10)
+        expected, edges = np.histogram(values, bins=10)
+        np.testing.assert_array_equal(counts, expected)
+        np.testing.assert_allclose(centers, (edges[:-1] + edges[1:]) / 2)
+
+        counts, centers = hist_and_centers(np.full(3, 5.0), 10)
+        self.assertEqual(counts.sum(), 3)
+        self.assertEqual(len(centers), 10)
+
+    def test_rolling_annual_vol_matches_pandas(self):
+        rng = np.random.default_rng(11)
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.02, 120))
+        expected = pd.Series(close).pct_change().rolling(window=20).std() * np.sqrt(252)
+        np.testing.assert_allclose(rolling_annual_vol(close, 20), expected.to_numpy(), equal_nan=True)
+        self.assertTrue(np.isnan(rolling_annual_vol(close[:10], 20)).all())
+
+
 class TestSpreadPairOrdering(unittest.TestCase):
     """测试价差配对在常见升序链表下可正常产出机会"""
 
@@ -503,6 +741,232 @@ class TestSpreadPairOrdering(unittest.TestCase):
         self.assertGreater(len(results), 0)
 
 
+class TestAnalysisSnapshotStore(unittest.TestCase):
+    """测试分析结果磁盘快照"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = AnalysisSnapshotStore(cache_dir=self.tmp_dir.name)
+        self.results = {
+            'market_context': {'vix_level': 18.0},
+            'symbols_data': {'AAPL': {'stock_data': {'current_volatility': 0.3}}},
+            'opportunities': [{'symbol': 'AAPL', 'score': 80.0}],
+            'opportunities_df': pd.DataFrame({'symbol': ['AAPL'], 'score': [80.0]}),
+            'opportunity_labels': ['AAPL'],
+            'timestamp': datetime(2026, 1, 2, 10, 0),
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        key = AnalysisSnapshotStore.make_key(['MSFT', 'AAPL'], {'min_volume': 50})
+        # 代码顺序不影响快照键
+        self.assertEqual(key, AnalysisSnapshotStore.make_key(['AAPL', 'MSFT'], {'min_volume': 50}))
+        self.assertTrue(self.store.save(key, self.results))
+        loaded = self.store.load(key)
+        for name in AnalysisSnapshotStore.PERSISTED_KEYS:
+            self.assertEqual(loaded[name], self.results[name])
+        pd.testing.assert_frame_equal(loaded['opportunities_df'], self.results['opportunities_df'])
+        # 可重新派生的键不落盘
+        self.assertNotIn('opportunity_labels', loaded)
+        self.assertIsNone(self.store.load('missing'))
+
+    def test_evicts_least_recently_used(self):
+        keys = [f"k{i:02d}" for i in range(18)]
+        base_time = time.time() - 1000
+        for i, key in enumerate(keys[:16]):
+            self.store.save(key, self.results)
+            for path in self.store._paths(key):
+                if os.path.exists(path):
+                    os.utime(path, (base_time + i, base_time + i))
+        # 读取会刷新访问时间，k00 不再是最旧的
+        self.assertIsNotNone(self.store.load(keys[0]))
+        for key in keys[16:]:
+            self.store.save(key, self.results)
+        remaining = {name[len('opps_'):-len('.pkl')]
+                     for name in os.listdir(self.tmp_dir.name) if name.endswith('.pkl')}
+        self.assertEqual(len(remaining), 16)
+        self.assertEqual(set(keys) - remaining, {'k01', 'k02'})
+        self.assertFalse(os.path.exists(self.store._paths('k01')[1]))
+
+    def test_parquet_failure_falls_back_to_pickle(self):
+        with mock.patch.object(pd.DataFrame, 'to_parquet', side_effect=ValueError('mixed types')):
+            self.assertTrue(self.store.save('k', self.results))
+        loaded = self.store.load('k')
+        self.assertEqual(loaded['opportunities'], self.results['opportunities'])
+        self.assertNotIn('opportunities_df', loaded)
+
+
+class TestIncrementalHistory(unittest.TestCase):
+    """测试历史行情增量拼接"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.collector = base_module.StockDataCollector(self.tmp_dir.name)
+        index = pd.date_range('2025-01-01', periods=400, freq='B', tz='America/New_York')
+        rng = np.random.default_rng(3)
+        self.full = pd.DataFrame({
+            'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400))),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0,
+        }, index=index)
+        self.cache_path = self.collector._get_cache_path('ZZHIST', 'history_1y', ext='parquet')
+        prior = self.collector._add_indicators(self.full.iloc[:395].copy())
+        self.collector._save_df_cache(prior, self.cache_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _ticker(self, frame):
+        ticker = mock.Mock()
+        ticker.history.side_effect = lambda start=None, **_: frame[
+            frame.index >= pd.Timestamp(start, tz='America/New_York')].copy()
+        return ticker
+
+    def test_extend_matches_full_recompute(self):
+        out = self.collector._extend_cached_history('ZZHIST', '1y', self._ticker(self.full), self.cache_path)
+        expected = self.collector._add_indicators(self.full.copy())
+        expected = expected[expected.index >= expected.index[-1] - pd.DateOffset(years=1)]
+        self.assertTrue(out.index.equals(expected.index))
+        for col in ('SMA_20', 'SMA_50', 'Volatility'):
+            np.testing.assert_allclose(out[col].to_numpy(float), expected[col].to_numpy(float),
+                                       rtol=1e-6, equal_nan=True)
+
+    def test_split_in_tail_forces_full_refetch(self):
+        split = self.full.copy()
+        split.iloc[:397, split.columns.get_loc('Close')] /= 10
+        split.iloc[397, split.columns.get_loc('Stock Splits')] = 10.0
+        self.assertIsNone(
+            self.collector._extend_cached_history('ZZHIST', '1y', self._ticker(split), self.cache_path))
+
+    def test_readjusted_closes_force_full_refetch(self):
+        # 无分红/拆股标记但历史收盘价已被重新复权
+        adjusted = self.full.copy()
+        adjusted['Close'] *= 0.98
+        self.assertIsNone(
+            self.collector._extend_cached_history('ZZHIST', '1y', self._ticker(adjusted), self.cache_path))
+
+    def test_unsupported_period_skips_incremental(self):
+        self.assertIsNone(base_module._period_offset('max'))
+        self.assertEqual(base_module._period_offset('6mo'), pd.DateOffset(months=6))
+        ticker = self._ticker(self.full)
+        self.assertIsNone(self.collector._extend_cached_history('ZZHIST', 'max', ticker, self.cache_path))
+        ticker.history.assert_not_called()
+
+
+class TestMemoryCache(unittest.TestCase):
+    """测试进程级内存缓存的 LRU 容量与过期清理"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with mock.patch.object(base_module.DataCollector, '_start_cache_gc'):
+            self.collector = base_module.DataCollector(self.tmp_dir.name)
+        patcher = mock.patch.object(base_module.DataCollector, '_MEMORY_CACHE', OrderedDict())
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lru_eviction(self):
+        with mock.patch.object(base_module, '_MEMORY_CACHE_MAX_ENTRIES', 2):
+            self.collector._memory_set('a', 1)
+            self.collector._memory_set('b', 2)
+            # 读取 a 使其成为最近使用，写入 c 时淘汰 b
+            self.assertEqual(self.collector._memory_get('a', 60), 1)
+            self.collector._memory_set('c', 3)
+        self.assertEqual(list(self.cache), ['a', 'c'])
+
+    def test_expired_entries_are_removed(self):
+        self.collector._memory_set('old', 1, inserted_at=time.time() - 120)
+        self.assertIsNone(self.collector._memory_get('old', 60))
+        self.assertNotIn('old', self.cache)
+
+
+class TestCachedChainScan(unittest.TestCase):
+    """测试跨标的扫描已缓存期权链"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with mock.patch.object(base_module.DataCollector, '_start_cache_gc'):
+            self.collector = base_module.OptionsDataCollector(self.tmp_dir.name)
+        for symbol, volumes in (('AAPL', [10, 500]), ('MSFT', [800, 900])):
+            self.collector.chain_cache.set(symbol, '2026-01-16', pd.DataFrame({
+                'type': ['call', 'put'],
+                'strike': [100.0, 95.0],
+                'volume': volumes,
+                'openInterest': [1000, 1000],
+            }))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_pandas_fallback_without_duckdb(self):
+        with mock.patch.object(base_module, '_HAS_DUCKDB', False):
+            self.assertIsNone(base_module.DataCollector.query_cache("SELECT 1"))
+            result = self.collector.scan_cached_liquid_contracts(min_volume=50, min_open_interest=100)
+        self.assertEqual(sorted(zip(result['symbol'], result['volume'])),
+                         [('AAPL', 500), ('MSFT', 800), ('MSFT', 900)])
+        self.assertNotIn('filename', result.columns)
+
+    def test_file_list_is_bound_parameter(self):
+        with mock.patch.object(base_module.DataCollector, 'query_cache', return_value=None) as query:
+            self.collector.scan_cached_liquid_contracts(['AAPL'])
+        sql, params = query.call_args[0]
+        self.assertIn('read_parquet(?', sql)
+        self.assertNotIn(self.tmp_dir.name, sql)
+        self.assertEqual(params[0], self.collector.chain_cache.list_files(['AAPL']))
+
+
+class TestSymbolValidation(unittest.TestCase):
+    """测试批量报价与代码校验"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manager = DataManager(cache_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_batch_validation_caches_only_valid_and_falls_back_for_missing(self):
+        collector = self.manager.stock_collector
+        with mock.patch.object(collector, 'get_quote_prices', return_value={'ZZGOOD': 10.0, 'ZZZERO': 0.0}), \
+                mock.patch.object(self.manager, 'validate_symbols', return_value={'ZZMISS': True}) as fallback:
+            results = self.manager.validate_symbols_batch(['ZZGOOD', 'ZZZERO', 'ZZMISS'])
+        self.assertEqual(results, {'ZZGOOD': True, 'ZZZERO': False, 'ZZMISS': True})
+        # 响应中缺失的代码走逐个验证
+        fallback.assert_called_once_with(['ZZMISS'])
+        # 只缓存有效结果
+        self.assertEqual(set(self.manager._validation_cache), {'ZZGOOD'})
+        self.manager.clear_caches()
+        self.assertEqual(self.manager._validation_cache, {})
+
+    def test_quote_prices_parses_batch_response(self):
+        payload = {'quoteResponse': {'result': [
+            {'symbol': 'aapl', 'regularMarketPrice': 190.5},
+            {'symbol': 'ZZZERO', 'regularMarketPrice': None},
+            {'regularMarketPrice': 1.0},
+        ]}}
+        with mock.patch.object(base_module, '_HAS_YFDATA', True), \
+                mock.patch.object(base_module, 'YfData', create=True) as yf_data:
+            yf_data.return_value.get_raw_json.return_value = payload
+            prices = self.manager.stock_collector.get_quote_prices(['AAPL', 'ZZZERO'])
+        self.assertEqual(prices, {'AAPL': 190.5, 'ZZZERO': 0.0})
+        _, kwargs = yf_data.return_value.get_raw_json.call_args
+        self.assertEqual(kwargs['params']['symbols'], 'AAPL,ZZZERO')
+
+    def test_quote_prices_returns_none_when_unavailable(self):
+        collector = self.manager.stock_collector
+        with mock.patch.object(base_module, '_HAS_YFDATA', True), \
+                mock.patch.object(base_module, 'YfData', create=True) as yf_data:
+            yf_data.return_value.get_raw_json.side_effect = RuntimeError('401 Unauthorized')
+            self.assertIsNone(collector.get_quote_prices(['AAPL']))
+        with mock.patch.object(base_module, '_HAS_YFDATA', False):
+            self.assertIsNone(collector.get_quote_prices(['AAPL']))
+        self.assertEqual(collector.get_quote_prices([]), {})
+
+
 def run_all_tests():
     """运行所有测试"""
     print("运行期权工具基础测试...")
@@ -519,7 +983,17 @@ def run_all_tests():
         TestStrategySchemaConsistency,
         TestOptionsVisualizer,
         TestGitHubStockPoolProvider,
-        TestSpreadPairOrdering
+        TestIndexCsvFetch,
+        TestOptionsCacheTTL,
+        TestOptionsCachePruning,
+        TestOCCSymbolParser,
+        TestFastStats,
+        TestSpreadPairOrdering,
+        TestAnalysisSnapshotStore,
+        TestIncrementalHistory,
+        TestMemoryCache,
+        TestCachedChainScan,
+        TestSymbolValidation
     ]
     
     total_tests = 0